@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import APIRouter, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from engines import (
+    Argon2Hasher,
+    BcryptHasher,
+    CalibrationResult,
+    HashingEngine,
+    PasswordHashers,
+    PostgresEngine,
+    ScryptHasher,
+    calibrate,
+)
+from metrics import MetricsRegistry, StatsCollector
+from repositories import (
+    USER_WARMUP_STATEMENTS,
+    CachedUserRepository,
+    RevocationRepository,
+    SessionRepository,
+    UserRepository,
+)
+from routers import (
+    create_auth_router,
+    create_health_router,
+    create_metrics_router,
+    create_well_known_router,
+)
+from routers.decorators import AdmissionLimiter
+from routers.middlewares import LoggingMiddleware, SessionMiddleware
+from services import (
+    AuthService,
+    KeyRing,
+    LoginThrottle,
+    RevocationList,
+    TokenVersionCache,
+)
+from settings import Settings
+
+
+def worker_pool_limits(settings: Settings) -> tuple[int, int]:
+    """Return (pool_size, max_overflow) for one worker process.
+
+    POSTGRES_MAX_CONNECTIONS is split evenly between APP_WORKERS, less the
+    dedicated LISTEN connection each worker keeps. POSTGRES_POOL_SIZE stays
+    the steady-state size and overflow gets whatever the share leaves.
+    """
+    if settings.POSTGRES_MAX_CONNECTIONS is None:
+        return settings.POSTGRES_POOL_SIZE, settings.POSTGRES_POOL_IDLE_CONS
+    per_worker = settings.POSTGRES_MAX_CONNECTIONS // settings.APP_WORKERS - 1
+    if per_worker < 1:
+        raise ValueError(
+            f"POSTGRES_MAX_CONNECTIONS={settings.POSTGRES_MAX_CONNECTIONS} is too"
+            f" small for {settings.APP_WORKERS} workers."
+        )
+    pool_size = min(settings.POSTGRES_POOL_SIZE, per_worker)
+    return pool_size, min(settings.POSTGRES_POOL_IDLE_CONS, per_worker - pool_size)
+
+
+def create_hashers(settings: Settings) -> PasswordHashers:
+    hashers = {
+        "bcrypt": BcryptHasher(rounds=settings.HASHING_BCRYPT_ROUNDS),
+        "argon2id": Argon2Hasher(
+            time_cost=settings.HASHING_ARGON2_TIME_COST,
+            memory_cost=settings.HASHING_ARGON2_MEMORY_COST,
+            parallelism=settings.HASHING_ARGON2_PARALLELISM,
+        ),
+        "scrypt": ScryptHasher(
+            log_n=settings.HASHING_SCRYPT_LOG_N,
+            r=settings.HASHING_SCRYPT_R,
+            p=settings.HASHING_SCRYPT_P,
+        ),
+    }
+    return PasswordHashers(
+        default=hashers[settings.HASHING_SCHEME], hashers=list(hashers.values())
+    )
+
+
+def calibrate_hashing(
+    settings: Settings, hashers: PasswordHashers
+) -> CalibrationResult:
+    result = calibrate(
+        hashers.default,
+        target_ms=settings.HASHING_CALIBRATION_TARGET_MS,
+        samples=settings.HASHING_CALIBRATION_SAMPLES,
+    )
+    measurements = ", ".join(f"{cost}={p95:.0f}ms" for cost, p95 in result.measurements)
+    if result.met_target:
+        logging.info(
+            f"Hashing cost calibrated: {result.hasher.scheme} cost={result.hasher.cost}"
+            f" p95={result.p95_ms:.0f}ms (target {result.target_ms:.0f}ms;"
+            f" measured {measurements})"
+        )
+    else:
+        logging.warning(
+            f"Hashing target {result.target_ms:.0f}ms is unreachable on this host:"
+            f" {result.hasher.scheme} cost={result.hasher.cost}"
+            f" p95={result.p95_ms:.0f}ms"
+        )
+    return result
+
+
+def register_collectors(
+    metrics: MetricsRegistry,
+    hashing_engine: HashingEngine,
+    user_repository: UserRepository,
+    auth_service: AuthService,
+    admission_limiters: tuple[AdmissionLimiter, ...] = (),
+) -> None:
+    metrics.register_collector(
+        StatsCollector(
+            "hashing",
+            hashing_engine.stats,
+            "Password hashing pool",
+            counters=("submitted", "completed", "rejected"),
+        )
+    )
+    cache_counters = ("hits", "misses", "evictions")
+    metrics.register_collector(
+        StatsCollector(
+            "jwt_verify_cache",
+            auth_service.verify_cache_stats,
+            "Verified token cache",
+            counters=cache_counters,
+        )
+    )
+    if isinstance(user_repository, CachedUserRepository):
+        metrics.register_collector(
+            StatsCollector(
+                "user_cache",
+                user_repository.stats,
+                "User record cache",
+                counters=cache_counters,
+            )
+        )
+    if admission_limiters:
+        metrics.register_collector(
+            StatsCollector(
+                "admission",
+                lambda: {
+                    limiter.name: limiter.stats() for limiter in admission_limiters
+                },
+                "Endpoint admission",
+                counters=("rejected",),
+                label="endpoint",
+            )
+        )
+    return None
+
+
+async def warmup(
+    settings: Settings,
+    postgres_engine: PostgresEngine,
+    hashing_engine: HashingEngine,
+    pool_size: int,
+) -> None:
+    """Pay connection, statement and worker start-up costs before serving.
+
+    Failures are logged, not raised: a cold worker is better than none.
+    """
+    started = time.perf_counter()
+    connections = settings.POSTGRES_WARMUP_CONNECTIONS
+    if connections is None:
+        connections = pool_size
+    if connections > 0:
+        try:
+            warmed = await postgres_engine.warmup(connections, USER_WARMUP_STATEMENTS)
+            logging.info(f"Warmed {warmed} PostgreSQL connection(s).")
+        except Exception as e:
+            logging.warning(f"PostgreSQL warmup failed: {e}")
+    if settings.HASHING_WARMUP:
+        try:
+            await hashing_engine.warmup()
+        except Exception as e:
+            logging.warning(f"Hashing warmup failed: {e}")
+    logging.info("Warmup finished in %.0f ms.", (time.perf_counter() - started) * 1000)
+    return None
+
+
+def create_app(settings: Settings) -> FastAPI:
+    metrics = None
+    if settings.METRICS_ENABLED:
+        # Each worker has its own registry and any of them may answer a
+        # scrape; the label keeps their counters apart.
+        metrics = MetricsRegistry(
+            const_labels={"worker": str(os.getpid())}
+            if settings.APP_WORKERS > 1
+            else None
+        )
+    postgres_engine = PostgresEngine(metrics=metrics)
+    hashing_engine = HashingEngine(
+        mode=settings.HASHING_MODE,
+        workers=settings.HASHING_WORKERS,
+        queue_size=settings.HASHING_QUEUE_SIZE,
+        hashers=create_hashers(settings),
+    )
+    if settings.JWT_PRIVATE_KEY_FILES:
+        key_ring = KeyRing.from_pem_files(
+            settings.JWT_PRIVATE_KEY_FILES, active_kid=settings.JWT_ACTIVE_KID
+        )
+    else:
+        key_ring = KeyRing.from_secret(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+    if settings.USER_CACHE_ENABLED:
+        user_repository = CachedUserRepository(
+            postgres_engine,
+            max_size=settings.USER_CACHE_SIZE,
+            ttl=settings.USER_CACHE_TTL_SECONDS,
+            negative_ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS,
+        )
+    else:
+        user_repository = UserRepository(postgres_engine)
+    revocation_list = RevocationList(
+        RevocationRepository(postgres_engine),
+        postgres_engine,
+        capacity=settings.JWT_REVOCATION_BLOOM_CAPACITY,
+        error_rate=settings.JWT_REVOCATION_BLOOM_ERROR_RATE,
+    )
+    # A bump only has to outlive the access tokens issued before it.
+    token_versions = TokenVersionCache(
+        user_repository, postgres_engine, max_age=settings.JWT_EXPIRE_SECONDS
+    )
+    login_throttle = None
+    if settings.LOGIN_THROTTLE_ENABLED:
+        login_throttle = LoginThrottle(
+            username_burst=settings.LOGIN_THROTTLE_USERNAME_BURST,
+            username_per_minute=settings.LOGIN_THROTTLE_USERNAME_PER_MINUTE,
+            client_burst=settings.LOGIN_THROTTLE_CLIENT_BURST,
+            client_per_minute=settings.LOGIN_THROTTLE_CLIENT_PER_MINUTE,
+            lockout_threshold=settings.LOGIN_THROTTLE_LOCKOUT_THRESHOLD,
+            lockout_base=settings.LOGIN_THROTTLE_LOCKOUT_BASE_SECONDS,
+            lockout_max=settings.LOGIN_THROTTLE_LOCKOUT_MAX_SECONDS,
+            max_entries=settings.LOGIN_THROTTLE_MAX_ENTRIES,
+        )
+    auth_service = AuthService(
+        repository=user_repository,
+        jwt_secret=settings.JWT_SECRET,
+        jwt_exp=settings.JWT_EXPIRE_SECONDS,
+        hashing_engine=hashing_engine,
+        verify_cache_size=settings.JWT_VERIFY_CACHE_SIZE,
+        key_ring=key_ring,
+        session_repository=SessionRepository(postgres_engine),
+        refresh_exp=settings.REFRESH_TOKEN_EXPIRE_SECONDS,
+        revocation_list=revocation_list,
+        token_versions=token_versions,
+        login_throttle=login_throttle,
+        postgres_engine=postgres_engine,
+        rehash_on_login=settings.HASHING_REHASH_ON_LOGIN,
+    )
+    login_admission = AdmissionLimiter(
+        name="login",
+        max_in_flight=settings.ADMISSION_LOGIN_MAX_IN_FLIGHT,
+        max_queue=settings.ADMISSION_LOGIN_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+    register_admission = AdmissionLimiter(
+        name="register",
+        max_in_flight=settings.ADMISSION_REGISTER_MAX_IN_FLIGHT,
+        max_queue=settings.ADMISSION_REGISTER_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+    auth_router = create_auth_router(
+        auth_service,
+        postgres_engine,
+        login_admission=login_admission,
+        register_admission=register_admission,
+        transaction_retries=settings.POSTGRES_TRANSACTION_RETRIES,
+    )
+
+    pool_size, max_overflow = worker_pool_limits(settings)
+    ready = asyncio.Event()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        await postgres_engine.connect(
+            dsn=settings.DATABASE_DSN,
+            pool_size=pool_size,
+            pool_max_idle_cons=max_overflow,
+            replica_dsns=settings.DATABASE_REPLICA_DSNS,
+            replica_strategy=settings.POSTGRES_REPLICA_STRATEGY,
+            sticky_seconds=settings.POSTGRES_READ_YOUR_WRITES_SECONDS,
+            listen_ping_seconds=settings.POSTGRES_LISTEN_PING_SECONDS,
+        )
+        logging.info("Connected to PostgreSQL.")
+        if settings.HASHING_CALIBRATE:
+            result = await asyncio.to_thread(
+                calibrate_hashing, settings, hashing_engine.hashers
+            )
+            hashing_engine.hashers = hashing_engine.hashers.with_default(result.hasher)
+        hashing_engine.start()
+        await warmup(settings, postgres_engine, hashing_engine, pool_size)
+        await revocation_list.start(settings.JWT_REVOCATION_REFRESH_SECONDS)
+        await token_versions.start(settings.JWT_TOKEN_VERSION_REFRESH_SECONDS)
+        ready.set()
+        yield
+        ready.clear()
+        await auth_service.drain()
+        await token_versions.stop()
+        await revocation_list.stop()
+        await hashing_engine.stop()
+        logging.info("Hashing engine stopped.")
+        await postgres_engine.disconnect()
+        logging.info("PostgreSQL connection closed.")
+
+    app = FastAPI(
+        title=settings.APP_TITLE,
+        version=settings.APP_VERSION,
+        debug=settings.APP_DEBUG,
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(SessionMiddleware, engine=postgres_engine)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ALLOW_ORIGINS,
+        allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
+        allow_methods=settings.CORS_ALLOW_METHODS,
+        allow_headers=settings.CORS_ALLOW_HEADERS,
+    )
+    app.add_middleware(
+        LoggingMiddleware,
+        metrics=metrics,
+        sample_rate=settings.APP_LOG_SAMPLE_RATE,
+        slow_ms=settings.APP_LOG_SLOW_REQUEST_MS,
+    )
+
+    router = APIRouter(prefix=settings.APP_API_PREFIX)
+    router.include_router(auth_router)
+    app.include_router(router)
+    app.include_router(
+        create_well_known_router(key_ring, settings.JWT_JWKS_MAX_AGE_SECONDS)
+    )
+    app.include_router(create_health_router(ready))
+
+    if metrics is not None:
+        register_collectors(
+            metrics,
+            hashing_engine,
+            user_repository,
+            auth_service,
+            (login_admission, register_admission),
+        )
+        app.include_router(create_metrics_router(metrics))
+
+    return app
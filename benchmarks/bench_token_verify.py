@@ -0,0 +1,77 @@
+"""Compare per-token /auth/verify calls with /auth/verify/batch.
+
+Run with ``python -m benchmarks.bench_token_verify``. Requests go through
+the real router over an in-process ASGI transport, so the numbers include
+routing, validation and serialization but no network.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from routers import create_auth_router
+from services import AuthService
+
+SECRET = "bench_secret_with_at_least_32_bytes!"
+
+
+def make_tokens(count: int) -> list[str]:
+    exp = int(time.time()) + 3600
+    return [
+        jwt.encode({"sub": str(uuid.uuid4()), "exp": exp}, SECRET, algorithm="HS256")
+        for _ in range(count)
+    ]
+
+
+def make_client() -> AsyncClient:
+    auth_service = AuthService(AsyncMock(), jwt_secret=SECRET)
+    app = FastAPI()
+    app.include_router(create_auth_router(auth_service, MagicMock()))
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+async def bench_single(tokens: list[str]) -> float:
+    async with make_client() as client:
+        started = time.perf_counter()
+        for token in tokens:
+            response = await client.post("/auth/verify", json={"token": token})
+            assert response.json()["active"]
+        return time.perf_counter() - started
+
+
+async def bench_batch(tokens: list[str], batch_size: int) -> float:
+    async with make_client() as client:
+        started = time.perf_counter()
+        for i in range(0, len(tokens), batch_size):
+            batch = tokens[i : i + batch_size]
+            response = await client.post("/auth/verify/batch", json={"tokens": batch})
+            assert all(r["active"] for r in response.json()["results"])
+        return time.perf_counter() - started
+
+
+def report(label: str, tokens: int, elapsed: float) -> None:
+    print(f"{label:<16} {tokens / elapsed:>10.0f} tokens/s {elapsed * 1000:>9.1f} ms")
+
+
+async def run(count: int, batch_size: int) -> None:
+    tokens = make_tokens(count)
+    report("single", count, await bench_single(tokens))
+    report(f"batch[{batch_size}]", count, await bench_batch(tokens, batch_size))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
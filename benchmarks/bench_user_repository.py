@@ -0,0 +1,77 @@
+"""Compare the ORM read path of UserRepository with the lean record path.
+
+Run with ``python -m benchmarks.bench_user_repository [--dsn DSN]``. The
+default DSN is an in-memory SQLite database; pass a PostgreSQL DSN to
+measure the asyncpg prepared-statement path as it runs in production.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from engines import PostgresEngine
+from repositories import UserRepository
+from repositories.models import Base, UserDB
+
+
+async def seed(engine: PostgresEngine, users: int) -> list[str]:
+    async with engine.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    usernames = [f"bench_user_{i}" for i in range(users)]
+    async with engine.session_scope() as session:
+        session.add_all(
+            UserDB(username=username, password_hash="$2b$12$" + "x" * 53)
+            for username in usernames
+        )
+    return usernames
+
+
+async def measure(label: str, lookup, usernames: list[str], rounds: int) -> None:
+    started = time.perf_counter()
+    for i in range(rounds):
+        await lookup(username=usernames[i % len(usernames)])
+    elapsed = time.perf_counter() - started
+
+    samples = min(rounds, 1000)
+    tracemalloc.start()
+    for i in range(samples):
+        await lookup(username=usernames[i % len(usernames)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<12} {rounds / elapsed:>10.0f} ops/s "
+        f"{elapsed / rounds * 1e6:>8.1f} us/op {peak / 1024:>8.1f} KiB peak"
+    )
+
+
+async def run(dsn: str, users: int, rounds: int) -> None:
+    engine = PostgresEngine()
+    await engine.connect(dsn=dsn)
+    repository = UserRepository(engine)
+    try:
+        usernames = await seed(engine, users)
+        # Warm both paths so statement compilation is not part of the numbers.
+        await repository.get(username=usernames[0])
+        await repository.get_record(username=usernames[0])
+
+        await measure("orm get", repository.get, usernames, rounds)
+        await measure("get_record", repository.get_record, usernames, rounds)
+    finally:
+        engine.reset_context()
+        await engine.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.dsn, args.users, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from .bloom import BloomFilter
+from .lru import MISSING, CacheStats, TTLCache
+
+__all__ = ("MISSING", "BloomFilter", "CacheStats", "TTLCache")
@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU mapping whose entries expire after a per-entry TTL.
+
+    ``get`` returns ``MISSING`` on a miss so that ``None`` can be cached as a
+    regular (negative) value.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | _Missing:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl: float | None = None,
+        expires_at: float | None = None,
+    ) -> None:
+        """Store a value; ``expires_at`` is on the cache clock and overrides ttl."""
+        if expires_at is None:
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | _Missing:
+        entry = self._entries.pop(key, None)
+        return MISSING if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,27 @@
+from caches import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert bloom.count == 1000
+
+
+def test_false_positive_rate_is_bounded():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+
+    assert false_positives / 10_000 < 0.03
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(capacity=10)
+
+    assert "anything" not in bloom
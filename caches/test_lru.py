@@ -0,0 +1,76 @@
+from caches import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_missing_then_value():
+    cache = TTLCache(max_size=2, ttl=10)
+
+    assert cache.get("a") is MISSING
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+
+def test_none_is_cached_as_a_value():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("ghost", None)
+
+    assert cache.get("ghost") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+
+    clock.now = 5
+    assert cache.get("a") == 1
+    assert cache.get("b") is MISSING
+
+    clock.now = 10
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_expires_at_overrides_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1, expires_at=100)
+
+    clock.now = 99
+    assert cache.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+def test_pop_and_clear():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is MISSING
+
+    cache.clear()
+    assert len(cache) == 0
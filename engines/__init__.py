@@ -1,3 +1,34 @@
-from .postgres import PostgresEngine, postgres_engine
+from .calibration import CalibrationResult, calibrate
+from .hashers import (
+    Argon2Hasher,
+    BcryptHasher,
+    PasswordHasher,
+    PasswordHashers,
+    ScryptHasher,
+)
+from .hashing import HashingEngine, HashingQueueFullError, HashingStats
+from .postgres import (
+    PoolStats,
+    PostgresEngine,
+    SessionStats,
+    postgres_engine,
+    timed_query,
+)
 
-__all__ = ("PostgresEngine", "postgres_engine")
+__all__ = (
+    "Argon2Hasher",
+    "BcryptHasher",
+    "CalibrationResult",
+    "HashingEngine",
+    "HashingQueueFullError",
+    "HashingStats",
+    "PasswordHasher",
+    "PasswordHashers",
+    "PoolStats",
+    "PostgresEngine",
+    "ScryptHasher",
+    "SessionStats",
+    "calibrate",
+    "postgres_engine",
+    "timed_query",
+)
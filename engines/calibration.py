@@ -0,0 +1,77 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from engines.hashers import PasswordHasher
+
+log = logging.getLogger(__name__)
+
+_PASSWORD = b"calibration-Passw0rd!"
+
+
+@dataclass(frozen=True, slots=True)
+class CalibrationResult:
+    hasher: PasswordHasher
+    target_ms: float
+    p95_ms: float
+    met_target: bool
+    # p95 in milliseconds for every cost that was measured, in order.
+    measurements: tuple[tuple[int, float], ...]
+
+
+def _p95(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def calibrate(
+    hasher: PasswordHasher,
+    target_ms: float,
+    samples: int = 5,
+    clock: Callable[[], float] = time.perf_counter,
+) -> CalibrationResult:
+    """Pick the highest cost whose p95 hash time fits ``target_ms`` on this host.
+
+    Costs are tried upwards from the scheme's minimum. Every step roughly
+    doubles the work, so the walk stops at the first cost over the target.
+    If even the minimum is too slow it is still returned, with
+    ``met_target=False``. This is CPU-bound and blocking: call it from a
+    thread, before the hashing pool starts taking traffic.
+    """
+    measurements: list[tuple[int, float]] = []
+    best: tuple[PasswordHasher, float] | None = None
+
+    for cost in range(hasher.min_cost, hasher.max_cost + 1):
+        candidate = hasher.with_cost(cost)
+        timings = []
+        for _ in range(samples):
+            started = clock()
+            candidate.hash(_PASSWORD)
+            timings.append((clock() - started) * 1000)
+        p95 = _p95(timings)
+        measurements.append((cost, p95))
+        log.debug("Calibration %s cost=%s: p95=%.1f ms", hasher.scheme, cost, p95)
+
+        if p95 > target_ms:
+            break
+        best = (candidate, p95)
+
+    if best is None:
+        cost, p95 = measurements[0]
+        return CalibrationResult(
+            hasher=hasher.with_cost(cost),
+            target_ms=target_ms,
+            p95_ms=p95,
+            met_target=False,
+            measurements=tuple(measurements),
+        )
+
+    return CalibrationResult(
+        hasher=best[0],
+        target_ms=target_ms,
+        p95_ms=best[1],
+        met_target=True,
+        measurements=tuple(measurements),
+    )
@@ -0,0 +1,234 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+from dataclasses import dataclass, replace
+from typing import ClassVar, Protocol
+
+
+class PasswordHasher(Protocol):
+    """One password hashing scheme.
+
+    Implementations are plain picklable objects so their bound methods can run
+    in a process pool.
+    """
+
+    scheme: str
+    # Bounds of the tunable work factor, see cost / with_cost().
+    min_cost: ClassVar[int]
+    max_cost: ClassVar[int]
+
+    @property
+    def cost(self) -> int: ...
+
+    def with_cost(self, cost: int) -> "PasswordHasher": ...
+
+    def hash(self, password: bytes) -> str: ...
+
+    def verify(self, password: bytes, password_hash: str) -> bool: ...
+
+    def identify(self, password_hash: str) -> bool: ...
+
+    def needs_rehash(self, password_hash: str) -> bool: ...
+
+
+@dataclass(frozen=True, slots=True)
+class BcryptHasher:
+    rounds: int = 12
+    scheme: str = "bcrypt"
+    min_cost: ClassVar[int] = 4
+    max_cost: ClassVar[int] = 20
+
+    @property
+    def cost(self) -> int:
+        return self.rounds
+
+    def with_cost(self, cost: int) -> "BcryptHasher":
+        return replace(self, rounds=cost)
+
+    def hash(self, password: bytes) -> str:
+        import bcrypt
+
+        return bcrypt.hashpw(password, bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password: bytes, password_hash: str) -> bool:
+        import bcrypt
+
+        return bcrypt.checkpw(password, password_hash.encode())
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # $2b$12$<salt+hash>
+        try:
+            return int(password_hash[4:6]) != self.rounds
+        except ValueError:
+            return True
+
+
+_ARGON2_PARAMS = re.compile(r"^\$argon2id\$v=\d+\$m=(\d+),t=(\d+),p=(\d+)\$")
+
+
+@dataclass(frozen=True, slots=True)
+class Argon2Hasher:
+    """argon2id via the optional argon2-cffi package, imported on first use."""
+
+    time_cost: int = 3
+    memory_cost: int = 65536
+    parallelism: int = 4
+    scheme: str = "argon2id"
+    min_cost: ClassVar[int] = 1
+    max_cost: ClassVar[int] = 20
+
+    @property
+    def cost(self) -> int:
+        """Tuned via time_cost; memory_cost stays as configured."""
+        return self.time_cost
+
+    def with_cost(self, cost: int) -> "Argon2Hasher":
+        return replace(self, time_cost=cost)
+
+    def hash(self, password: bytes) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, password: bytes, password_hash: str) -> bool:
+        from argon2.exceptions import InvalidHashError, VerificationError
+
+        try:
+            return self._hasher().verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith("$argon2id$")
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        match = _ARGON2_PARAMS.match(password_hash)
+        if match is None:
+            return True
+        params = tuple(int(value) for value in match.groups())
+        return params != (self.memory_cost, self.time_cost, self.parallelism)
+
+    def _hasher(self):
+        try:
+            from argon2 import PasswordHasher as Argon2PasswordHasher
+        except ImportError as e:
+            raise RuntimeError(
+                "argon2id hashing requires the argon2-cffi package."
+            ) from e
+        return Argon2PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+        )
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+@dataclass(frozen=True, slots=True)
+class ScryptHasher:
+    """hashlib scrypt stored as ``$scrypt$ln=<log2 n>,r=<r>,p=<p>$<salt>$<hash>``."""
+
+    log_n: int = 15
+    r: int = 8
+    p: int = 1
+    scheme: str = "scrypt"
+    min_cost: ClassVar[int] = 10
+    # ln=18 with r=8 already needs 256 MiB per hash.
+    max_cost: ClassVar[int] = 18
+
+    @property
+    def cost(self) -> int:
+        return self.log_n
+
+    def with_cost(self, cost: int) -> "ScryptHasher":
+        return replace(self, log_n=cost)
+
+    def hash(self, password: bytes) -> str:
+        salt = os.urandom(16)
+        digest = self._derive(password, salt, self.log_n, self.r, self.p)
+        return (
+            f"$scrypt$ln={self.log_n},r={self.r},p={self.p}"
+            f"${_b64encode(salt)}${_b64encode(digest)}"
+        )
+
+    def verify(self, password: bytes, password_hash: str) -> bool:
+        try:
+            (log_n, r, p), salt, expected = self._parse(password_hash)
+        except ValueError:
+            return False
+        digest = self._derive(password, salt, log_n, r, p, len(expected))
+        return hmac.compare_digest(digest, expected)
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith("$scrypt$")
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        try:
+            params, _, _ = self._parse(password_hash)
+        except ValueError:
+            return True
+        return params != (self.log_n, self.r, self.p)
+
+    @staticmethod
+    def _parse(password_hash: str) -> tuple[tuple[int, int, int], bytes, bytes]:
+        _, scheme, params, salt, digest = password_hash.split("$")
+        if scheme != "scrypt":
+            raise ValueError(f"Not an scrypt hash: {scheme!r}.")
+        values = dict(param.split("=", 1) for param in params.split(","))
+        try:
+            cost = (int(values["ln"]), int(values["r"]), int(values["p"]))
+        except (KeyError, TypeError) as e:
+            # Callers only expect ValueError for a malformed hash.
+            raise ValueError(f"Malformed scrypt parameters: {params!r}.") from e
+        return cost, _b64decode(salt), _b64decode(digest)
+
+    @staticmethod
+    def _derive(
+        password: bytes, salt: bytes, log_n: int, r: int, p: int, dklen: int = 32
+    ) -> bytes:
+        n = 1 << log_n
+        return hashlib.scrypt(
+            password, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=dklen
+        )
+
+
+class PasswordHashers:
+    """Registry of known schemes; new hashes always use ``default``.
+
+    Stored hashes are matched to a scheme by their prefix, so users hashed
+    under an older policy keep logging in until they are rehashed.
+    """
+
+    def __init__(
+        self,
+        default: PasswordHasher | None = None,
+        hashers: list[PasswordHasher] | None = None,
+    ) -> None:
+        self.default = default or BcryptHasher()
+        self._hashers = {self.default.scheme: self.default}
+        for hasher in hashers or (BcryptHasher(), Argon2Hasher(), ScryptHasher()):
+            self._hashers.setdefault(hasher.scheme, hasher)
+
+    def with_default(self, default: PasswordHasher) -> "PasswordHashers":
+        return PasswordHashers(default, list(self._hashers.values()))
+
+    def identify(self, password_hash: str) -> PasswordHasher | None:
+        for hasher in self._hashers.values():
+            if hasher.identify(password_hash):
+                return hasher
+        return None
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash is not in the default scheme with current parameters."""
+        if not self.default.identify(password_hash):
+            return True
+        return self.default.needs_rehash(password_hash)
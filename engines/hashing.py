@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, TypeVar
+
+from engines.hashers import PasswordHashers
+
+log = logging.getLogger(__name__)
+R = TypeVar("R")
+
+HashingMode = Literal["thread", "process"]
+
+# Not fork: by the time the pool starts, the parent runs the log listener and
+# event loop threads, and a child forked while one of them holds a lock
+# deadlocks on it.
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class HashingQueueFullError(Exception):
+    """Raised when the hashing queue is at capacity and the job is rejected."""
+
+
+@dataclass(frozen=True, slots=True)
+class HashingStats:
+    mode: str
+    workers: int
+    in_flight: int
+    queue_depth: int
+    queue_size: int
+    submitted: int
+    completed: int
+    rejected: int
+    wait_ms_avg: float
+    wait_ms_max: float
+
+
+class HashingEngine:
+    """Runs CPU-bound password hashing off the event loop in a bounded pool."""
+
+    def __init__(
+        self,
+        mode: HashingMode = "thread",
+        workers: int | None = None,
+        queue_size: int = 128,
+        hashers: PasswordHashers | None = None,
+    ) -> None:
+        self.mode = mode
+        self.hashers = hashers or PasswordHashers()
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self) -> None:
+        if self.executor is not None:
+            return None
+        if self.mode == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(_START_METHOD),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="hashing"
+            )
+        self._slots = asyncio.Semaphore(self.workers)
+        log.info("Hashing engine started: mode=%s, workers=%s", self.mode, self.workers)
+        return None
+
+    async def stop(self) -> None:
+        if self.executor is None:
+            log.warning("stop() called but hashing engine was not started.")
+            return None
+        executor, self.executor = self.executor, None
+        self._slots = None
+        try:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        except Exception as e:
+            log.exception(f"Error shutting down hashing executor: {e}")
+        return None
+
+    async def warmup(self) -> None:
+        """Start the pool and run one cheap hash per worker.
+
+        Process workers are spawned and import the hashing libraries here
+        rather than on the first logins.
+        """
+        self.start()
+        cheap = self.hashers.default.with_cost(self.hashers.default.min_cost)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, cheap.hash, b"warmup")
+                for _ in range(self.workers)
+            )
+        )
+        return None
+
+    async def hash_password(self, password: str) -> str:
+        return await self._submit(self.hashers.default.hash, password.encode())
+
+    async def check_password(self, password: str, password_hash: str) -> bool:
+        hasher = self.hashers.identify(password_hash)
+        if hasher is None:
+            log.warning("Unrecognised password hash scheme, rejecting login.")
+            return False
+        return await self._submit(hasher.verify, password.encode(), password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.hashers.needs_rehash(password_hash)
+
+    def stats(self) -> HashingStats:
+        return HashingStats(
+            mode=self.mode,
+            workers=self.workers,
+            in_flight=self._in_flight,
+            queue_depth=self._waiting,
+            queue_size=self.queue_size,
+            submitted=self._submitted,
+            completed=self._completed,
+            rejected=self._rejected,
+            wait_ms_avg=(
+                self._wait_total / self._completed * 1000 if self._completed else 0.0
+            ),
+            wait_ms_max=self._wait_max * 1000,
+        )
+
+    async def _submit(self, func: Callable[..., R], *args: Any) -> R:
+        if self.executor is None:
+            self.start()
+
+        if self._in_flight >= self.workers and self._waiting >= self.queue_size:
+            self._rejected += 1
+            raise HashingQueueFullError("Hashing queue is full.")
+
+        slots = self._slots
+        self._submitted += 1
+        self._waiting += 1
+        enqueued_at = time.perf_counter()
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        wait = time.perf_counter() - enqueued_at
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            slots.release()
@@ -1,28 +1,153 @@
+import asyncio
+import functools
 import logging
+import time
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Literal,
+    Sequence,
+    TypeVar,
+)
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Executable
+
+from caches import TTLCache
+from metrics import MetricsRegistry, StatsCollector
 
 log = logging.getLogger(__name__)
 
+NotifyCallback = Callable[[str], None]
+ResetCallback = Callable[[], None]
+ReplicaStrategy = Literal["round_robin", "least_busy"]
+R = TypeVar("R")
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+
+
+@dataclass(frozen=True, slots=True)
+class SessionStats:
+    open: int
+    opened: int
+    closed: int
+
+
+def timed_query(func: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
+    """Report a repository method's latency to its engine's query histogram."""
+    method = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> R:
+        started = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self._engine.observe_query(method, time.perf_counter() - started)
+
+    return wrapper
+
+
+class _SessionSlot:
+    """Mutable per-scope holder, so a session opened in a child task is still
+    seen (and closed) by the scope that created the slot.
+
+    ``session`` is the writable session on the primary; ``reader`` is the
+    read-only one, on a replica unless the read had to stay on the primary.
+    """
+
+    __slots__ = ("session", "reader", "reader_on_primary")
+
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+        self.reader: AsyncSession | None = None
+        self.reader_on_primary = False
+
 
 class PostgresEngine:
-    """Manages async PostgreSQL engine and session lifecycle."""
+    """Manages async PostgreSQL engine and session lifecycle.
+
+    Writes go to the primary. Reads made outside a write transaction go to a
+    replica when any are configured, picked round-robin or by fewest
+    checked-out connections. Keys passed to stick() keep their reads on the
+    primary for ``sticky_seconds``, so a client reads its own writes.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, metrics: MetricsRegistry | None = None) -> None:
         self.engine: AsyncEngine | None = None
+        self.replicas: list[AsyncEngine] = []
         self.session_factory: async_sessionmaker[AsyncSession] | None = None
-        self._session_context: ContextVar[AsyncSession | None] = ContextVar(
+        self.readonly_session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._readonly_binds: list[AsyncEngine] = []
+        self._replica_strategy: ReplicaStrategy = "round_robin"
+        self._next_replica = 0
+        self._sticky: TTLCache[Hashable, bool] | None = None
+        self._session_context: ContextVar[_SessionSlot | None] = ContextVar(
             "postgres_session_context", default=None
         )
+        self._listeners: dict[
+            str, list[tuple[NotifyCallback, ResetCallback | None]]
+        ] = {}
+        self._listen_task: asyncio.Task | None = None
+        self._sessions_opened = 0
+        self._sessions_closed = 0
+        self._checkout_seconds = None
+        self._query_seconds = None
+        if metrics is not None:
+            self._checkout_seconds = metrics.histogram(
+                "db_pool_checkout_seconds",
+                "Time spent waiting for a pooled connection.",
+                ("pool",),
+            )
+            self._query_seconds = metrics.histogram(
+                "db_query_duration_seconds",
+                "Latency of repository methods.",
+                ("method",),
+            )
+            metrics.register_collector(
+                StatsCollector(
+                    "db_pool", self.pool_stats, "Connection pool", label="pool"
+                )
+            )
+            metrics.register_collector(
+                StatsCollector(
+                    "db_sessions",
+                    self.session_stats,
+                    "Database sessions",
+                    counters=("opened", "closed"),
+                )
+            )
 
     async def connect(
-        self, dsn: str, pool_size: int = 10, pool_max_idle_cons: int = 20
+        self,
+        dsn: str,
+        pool_size: int = 10,
+        pool_max_idle_cons: int = 20,
+        replica_dsns: list[str] | None = None,
+        replica_strategy: ReplicaStrategy = "round_robin",
+        sticky_seconds: float = 0.0,
+        sticky_max_keys: int = 10_000,
+        listen_ping_seconds: float = 30.0,
     ) -> None:
         try:
             engine_args = {"echo": False, "future": True}
@@ -31,42 +156,399 @@ class PostgresEngine:
                     {"pool_size": pool_size, "max_overflow": pool_max_idle_cons}
                 )
 
-            self.engine = create_async_engine(dsn, **engine_args)
+            self.engine = create_async_engine(
+                dsn, **self._pool_args(dsn, "primary"), **engine_args
+            )
+            self.replicas = [
+                create_async_engine(
+                    replica_dsn,
+                    **self._pool_args(replica_dsn, f"replica-{i}"),
+                    **engine_args,
+                )
+                for i, replica_dsn in enumerate(replica_dsns or (), start=1)
+            ]
             self.session_factory = async_sessionmaker(
                 bind=self.engine, class_=AsyncSession, expire_on_commit=False
             )
+            # Read-only sessions run their transactions as READ ONLY; SQLite
+            # has no such mode.
+            self._readonly_binds = [
+                engine
+                if dsn.startswith("sqlite")
+                else engine.execution_options(postgresql_readonly=True)
+                for engine in [self.engine, *self.replicas]
+            ]
+            self.readonly_session_factory = async_sessionmaker(
+                bind=self._readonly_binds[0],
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            self._replica_strategy = replica_strategy
+            self._sticky = (
+                TTLCache(max_size=sticky_max_keys, ttl=sticky_seconds)
+                if self.replicas and sticky_seconds > 0
+                else None
+            )
+            if self.replicas:
+                log.info(
+                    "Routing reads to %s replica(s) (%s)",
+                    len(self.replicas),
+                    replica_strategy,
+                )
+            if self._listeners and not dsn.startswith("sqlite"):
+                self._listen_task = asyncio.create_task(
+                    self._listen_forever(dsn, listen_ping_seconds)
+                )
         except Exception as e:
             log.error("Error initializing PostgreSQL engine: %s", e, exc_info=True)
 
+    def _pool_args(self, dsn: str, name: str) -> dict:
+        if self._checkout_seconds is None or dsn.startswith("sqlite"):
+            return {}
+        observe = self._checkout_seconds.labels(name).observe
+
+        class TimedPool(AsyncAdaptedQueuePool):
+            # _do_get is where QueuePool blocks for a free connection.
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                finally:
+                    observe(time.perf_counter() - started)
+
+        return {"poolclass": TimedPool}
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        engines = {"primary": self.engine} if self.engine else {}
+        engines.update(
+            (f"replica-{i}", engine) for i, engine in enumerate(self.replicas, start=1)
+        )
+        stats = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            if not isinstance(pool, AsyncAdaptedQueuePool):
+                continue
+            stats[name] = PoolStats(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return stats
+
+    def session_stats(self) -> SessionStats:
+        """``open`` only grows if sessions leak past their scope."""
+        return SessionStats(
+            open=self._sessions_opened - self._sessions_closed,
+            opened=self._sessions_opened,
+            closed=self._sessions_closed,
+        )
+
+    def observe_query(self, method: str, seconds: float) -> None:
+        if self._query_seconds is not None:
+            self._query_seconds.labels(method).observe(seconds)
+        return None
+
+    async def warmup(
+        self,
+        connections: int,
+        statements: Sequence[tuple[Executable, dict]] = (),
+    ) -> int:
+        """Open up to ``connections`` pooled connections to every server and
+        run ``statements`` on each, so the asyncpg dialect has them prepared.
+
+        Connections are held at the same time so the pool really grows, then
+        returned to it. Returns the number of connections warmed.
+        """
+        if not self.engine:
+            log.error("Attempted to warm up before engine initialization.")
+            return 0
+
+        async def prepare(connection: AsyncConnection) -> None:
+            for stmt, params in statements:
+                await connection.execute(stmt, params)
+            await connection.rollback()
+
+        warmed = 0
+        for bind in self._readonly_binds:
+            size = getattr(bind.pool, "size", lambda: 1)()
+            opened = await asyncio.gather(
+                *(bind.connect().start() for _ in range(min(connections, size))),
+                return_exceptions=True,
+            )
+            live = [c for c in opened if isinstance(c, AsyncConnection)]
+            try:
+                for error in opened:
+                    if isinstance(error, BaseException):
+                        raise error
+                await asyncio.gather(*(prepare(c) for c in live))
+            finally:
+                await asyncio.gather(*(c.close() for c in live))
+            warmed += len(live)
+        return warmed
+
     async def disconnect(self) -> None:
         if not self.engine:
             log.warning("disconnect() called but engine was not initialized.")
             return None
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
         try:
-            await self.engine.dispose()
+            for engine in [self.engine, *self.replicas]:
+                await engine.dispose()
         except Exception as e:
             log.exception(f"Error closing PostgreSQL connection: {e}")
         finally:
             self.engine = None
+            self.replicas = []
             self.session_factory = None
+            self.readonly_session_factory = None
+            self._readonly_binds = []
+            self._sticky = None
             self._session_context.set(None)
         return None
 
-    async def get_session(self) -> AsyncSession | None:
+    async def get_session(
+        self, readonly: bool = True, sticky_key: Hashable | None = None
+    ) -> AsyncSession | None:
+        """Return the current scope's session, creating it on first use.
+
+        A read-only request is served by the writable session once that has
+        begun a transaction (reads inside a write transaction see its
+        writes), otherwise by a separate read-only session on a replica, or
+        on the primary if ``sticky_key`` was written recently. A read that
+        lands on the primary reuses the writable session if the scope has
+        one. No connection is checked out until a session runs its first
+        statement; see read_session() for giving it back after a read.
+        """
         if self.session_factory is None:
             log.error("Attempted to get session before engine initialization.")
             return None
         try:
-            session = self._session_context.get()
-            if session is None:
-                new_session = self.session_factory()
-                self._session_context.set(new_session)
-                return new_session
-            return session
+            slot = self._session_context.get()
+            if slot is None:
+                slot = _SessionSlot()
+                self._session_context.set(slot)
+
+            if not readonly:
+                if slot.session is None:
+                    slot.session = self.session_factory()
+                    self._sessions_opened += 1
+                return slot.session
+
+            if slot.session is not None and slot.session.in_transaction():
+                return slot.session
+
+            on_primary = not self.replicas or self._is_sticky(sticky_key)
+            # A second session on the primary would take a second connection
+            # from the same pool for one request.
+            if on_primary and slot.session is not None:
+                return slot.session
+            if slot.reader is not None and on_primary and not slot.reader_on_primary:
+                await slot.reader.close()
+                self._sessions_closed += 1
+                slot.reader = None
+            if slot.reader is None:
+                bind = self._readonly_binds[0] if on_primary else self._pick_replica()
+                slot.reader = self.readonly_session_factory(bind=bind)
+                slot.reader_on_primary = on_primary
+                self._sessions_opened += 1
+            return slot.reader
         except Exception as e:
             log.exception(f"Error creating or retrieving session: {e}")
             return None
 
+    @asynccontextmanager
+    async def read_session(
+        self, sticky_key: Hashable | None = None
+    ) -> AsyncIterator[AsyncSession | None]:
+        """Session for one read (see get_session).
+
+        If the read began the session's transaction, it is ended afterwards,
+        so the connection goes back to the pool instead of sitting idle in
+        transaction while the caller does other work (e.g. hashing). A read
+        inside an ongoing write transaction leaves that transaction alone.
+        """
+        session = await self.get_session(sticky_key=sticky_key)
+        began = session is not None and not session.in_transaction()
+        try:
+            yield session
+        except BaseException:
+            if began:
+                await session.rollback()
+            raise
+        if began and session.in_transaction():
+            await session.commit()
+
+    def stick(self, *keys: Hashable) -> None:
+        """Keep reads for these keys on the primary for a while (read-your-writes).
+
+        Stickiness is per process: another worker may still read a replica.
+        """
+        if self._sticky is None:
+            return None
+        for key in keys:
+            if key is not None:
+                self._sticky.set(key, True)
+        return None
+
+    def _is_sticky(self, key: Hashable | None) -> bool:
+        if key is None or self._sticky is None:
+            return False
+        return self._sticky.get(key) is True
+
+    def _pick_replica(self) -> AsyncEngine:
+        binds = self._readonly_binds[1:]
+        if self._replica_strategy == "least_busy":
+            return min(binds, key=lambda bind: bind.pool.checkedout())
+        bind = binds[self._next_replica % len(binds)]
+        self._next_replica += 1
+        return bind
+
+    async def close_session(self) -> None:
+        """Close the current scope's sessions and return their connections."""
+        slot = self._session_context.get()
+        if slot is None:
+            return None
+        sessions = [slot.session, slot.reader]
+        slot.session = slot.reader = None
+        for session in sessions:
+            if session is None:
+                continue
+            self._sessions_closed += 1
+            try:
+                await session.close()
+            except Exception as e:
+                log.warning(f"Failed to close session: {e}")
+        return None
+
+    @asynccontextmanager
+    async def request_scope(self) -> AsyncIterator[None]:
+        """Session scope of one request: whatever session the request opens is
+        closed when it ends, on every path."""
+        token = self._session_context.set(_SessionSlot())
+        try:
+            yield
+        finally:
+            await self.close_session()
+            self._session_context.reset(token)
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Unit of work outside a request (background tasks): commit on success,
+        roll back on error, always close the session.
+        """
+        if self.session_factory is None:
+            raise RuntimeError(
+                "Attempted to open session before engine initialization."
+            )
+
+        session = self.session_factory()
+        self._sessions_opened += 1
+        token = self._session_context.set(_SessionSlot(session))
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await self.close_session()
+            self._session_context.reset(token)
+
+    def listen(
+        self,
+        channel: str,
+        on_notify: NotifyCallback,
+        on_reset: ResetCallback | None = None,
+    ) -> None:
+        """Subscribe to NOTIFY payloads on a channel.
+
+        Must be called before connect(). ``on_reset`` runs whenever the LISTEN
+        connection is (re)established, since notifications sent while it was
+        down are lost.
+        """
+        self._listeners.setdefault(channel, []).append((on_notify, on_reset))
+
+    async def _listen_forever(self, dsn: str, ping_seconds: float = 30.0) -> None:
+        """Hold one LISTEN connection, reconnecting (and resetting listeners,
+        which may have missed notifications) whenever it is lost.
+
+        A half-open connection (idle timeout on a NAT or load balancer,
+        failover without a reset) never reports termination, so the
+        connection is also pinged every ``ping_seconds``; a ping that does
+        not answer within that time counts as a lost connection.
+        """
+        import asyncpg
+
+        url = make_url(dsn).set(drivername="postgresql")
+        raw_dsn = url.render_as_string(hide_password=False)
+        delay = 0.5
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(raw_dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                for channel in self._listeners:
+                    await connection.add_listener(channel, self._dispatch)
+
+                log.info("Listening on channels: %s", ", ".join(self._listeners))
+                self._reset_listeners()
+                delay = 0.5
+                if await self._wait_until_lost(connection, lost, ping_seconds):
+                    log.warning("LISTEN connection lost, reconnecting.")
+                else:
+                    log.warning("LISTEN connection stopped answering, reconnecting.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"LISTEN connection failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    @staticmethod
+    async def _wait_until_lost(
+        connection, lost: asyncio.Event, ping_seconds: float
+    ) -> bool:
+        """Return True once the connection terminates, False once a ping fails."""
+        while True:
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=ping_seconds)
+                return True
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await connection.fetchval("SELECT 1", timeout=ping_seconds)
+            except Exception:
+                # close() would wait on the dead socket; drop it instead.
+                connection.terminate()
+                return False
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for on_notify, _ in self._listeners.get(channel, ()):
+            try:
+                on_notify(payload)
+            except Exception as e:
+                log.exception(f"Error handling notification on {channel}: {e}")
+
+    def _reset_listeners(self) -> None:
+        for callbacks in self._listeners.values():
+            for _, on_reset in callbacks:
+                if on_reset is None:
+                    continue
+                try:
+                    on_reset()
+                except Exception as e:
+                    log.exception(f"Error resetting listener: {e}")
+
     def reset_context(self) -> None:
         try:
             self._session_context.set(None)
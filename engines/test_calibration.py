@@ -0,0 +1,57 @@
+from dataclasses import dataclass, replace
+from typing import ClassVar
+
+from engines import BcryptHasher, calibrate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+CLOCK = FakeClock()
+
+
+@dataclass(frozen=True)
+class DoublingHasher:
+    """Every cost step doubles the (fake) time a hash takes: 2**cost ms."""
+
+    cost: int = 1
+    scheme: str = "fake"
+    min_cost: ClassVar[int] = 1
+    max_cost: ClassVar[int] = 12
+
+    def with_cost(self, cost: int) -> "DoublingHasher":
+        return replace(self, cost=cost)
+
+    def hash(self, password: bytes) -> str:
+        CLOCK.now += 2**self.cost / 1000
+        return f"fake${self.cost}"
+
+
+def test_picks_highest_cost_within_target():
+    result = calibrate(DoublingHasher(), target_ms=300, samples=3, clock=CLOCK)
+
+    assert result.hasher.cost == 8
+    assert result.p95_ms == 256
+    assert result.met_target is True
+    # Stops at the first cost over the target.
+    assert [cost for cost, _ in result.measurements] == list(range(1, 10))
+
+
+def test_returns_minimum_cost_when_target_is_unreachable():
+    result = calibrate(DoublingHasher(), target_ms=1, samples=1, clock=CLOCK)
+
+    assert result.hasher.cost == 1
+    assert result.met_target is False
+    assert len(result.measurements) == 1
+
+
+def test_calibrates_real_bcrypt():
+    result = calibrate(BcryptHasher(rounds=12), target_ms=50, samples=1)
+
+    assert result.hasher.rounds >= BcryptHasher.min_cost
+    assert result.met_target is True
@@ -0,0 +1,107 @@
+import pickle
+
+import bcrypt
+import pytest
+
+from engines import (
+    Argon2Hasher,
+    BcryptHasher,
+    HashingEngine,
+    PasswordHashers,
+    ScryptHasher,
+)
+
+
+@pytest.mark.parametrize(
+    "hasher",
+    [
+        BcryptHasher(rounds=4),
+        ScryptHasher(log_n=4),
+        Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1),
+    ],
+    ids=["bcrypt", "scrypt", "argon2id"],
+)
+def test_hash_verify_round_trip(hasher):
+    if hasher.scheme == "argon2id":
+        pytest.importorskip("argon2")
+
+    password_hash = hasher.hash(b"StrongPass1!")
+
+    assert hasher.identify(password_hash)
+    assert hasher.verify(b"StrongPass1!", password_hash) is True
+    assert hasher.verify(b"WrongPass1!", password_hash) is False
+    assert hasher.needs_rehash(password_hash) is False
+
+
+def test_registry_identifies_scheme_by_prefix():
+    hashers = PasswordHashers()
+    scrypt_hash = ScryptHasher(log_n=4).hash(b"pw")
+    bcrypt_hash = bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()
+
+    assert hashers.identify(bcrypt_hash).scheme == "bcrypt"
+    assert hashers.identify(scrypt_hash).scheme == "scrypt"
+    assert hashers.identify("$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$aGFzaA").scheme == (
+        "argon2id"
+    )
+    assert hashers.identify("plaintext") is None
+
+
+def test_registry_needs_rehash_on_scheme_or_cost_change():
+    hashers = PasswordHashers(BcryptHasher(rounds=5))
+    cheap = bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()
+    current = bcrypt.hashpw(b"pw", bcrypt.gensalt(5)).decode()
+
+    assert hashers.needs_rehash(cheap) is True
+    assert hashers.needs_rehash(current) is False
+    assert hashers.needs_rehash(ScryptHasher(log_n=4).hash(b"pw")) is True
+
+
+def test_argon2_needs_rehash_reads_parameters():
+    hasher = Argon2Hasher(time_cost=3, memory_cost=65536, parallelism=4)
+
+    assert not hasher.needs_rehash("$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$aGFzaA")
+    assert hasher.needs_rehash("$argon2id$v=19$m=65536,t=2,p=4$c2FsdA$aGFzaA")
+
+
+@pytest.mark.parametrize(
+    "password_hash",
+    [
+        "$scrypt$r=8,p=1$AAAA$BBBB",
+        "$scrypt$ln=4,r=8$AAAA$BBBB",
+        "$scrypt$ln=x,r=8,p=1$AAAA$BBBB",
+        "$scrypt$ln4$AAAA$BBBB",
+        "$scrypt$ln=4,r=8,p=1$AAAA",
+    ],
+    ids=["no-ln", "no-p", "non-int", "no-equals", "no-digest"],
+)
+def test_scrypt_malformed_hash_fails_verification(password_hash):
+    hasher = ScryptHasher(log_n=4)
+
+    assert hasher.verify(b"StrongPass1!", password_hash) is False
+    assert hasher.needs_rehash(password_hash) is True
+
+
+def test_hashers_are_picklable():
+    for hasher in (BcryptHasher(), Argon2Hasher(), ScryptHasher()):
+        assert pickle.loads(pickle.dumps(hasher.verify)).__self__ == hasher
+
+
+@pytest.mark.asyncio
+async def test_engine_process_mode_uses_configured_hasher():
+    engine = HashingEngine(
+        mode="process", workers=1, hashers=PasswordHashers(ScryptHasher(log_n=4))
+    )
+
+    password_hash = await engine.hash_password("StrongPass1!")
+
+    assert password_hash.startswith("$scrypt$ln=4,r=8,p=1$")
+    assert await engine.check_password("StrongPass1!", password_hash) is True
+    await engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_engine_rejects_unknown_scheme():
+    engine = HashingEngine(workers=1)
+
+    assert await engine.check_password("StrongPass1!", "plaintext") is False
+    assert engine.stats().submitted == 0
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import bcrypt
+import pytest
+
+from engines import HashingEngine, HashingQueueFullError
+
+
+@pytest.fixture
+def fast_gensalt(monkeypatch):
+    """Use the minimal bcrypt cost so thread-mode tests stay fast."""
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr("bcrypt.gensalt", lambda rounds=12: gensalt(4))
+
+
+@pytest.mark.asyncio
+async def test_hash_and_check_password_thread_mode(fast_gensalt):
+    engine = HashingEngine(mode="thread", workers=2)
+    engine.start()
+
+    password_hash = await engine.hash_password("StrongPass1!")
+
+    assert password_hash.startswith("$2")
+    assert await engine.check_password("StrongPass1!", password_hash) is True
+    assert await engine.check_password("WrongPass1!", password_hash) is False
+
+    await engine.stop()
+    assert engine.executor is None
+
+
+@pytest.mark.asyncio
+async def test_check_password_process_mode():
+    engine = HashingEngine(mode="process", workers=1)
+    engine.start()
+    password_hash = bcrypt.hashpw(b"StrongPass1!", bcrypt.gensalt(4)).decode()
+
+    assert await engine.check_password("StrongPass1!", password_hash) is True
+
+    await engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_starts_engine_lazily(fast_gensalt):
+    engine = HashingEngine(workers=1)
+
+    await engine.hash_password("StrongPass1!")
+
+    assert engine.executor is not None
+    await engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_full_rejects_job():
+    engine = HashingEngine(workers=1, queue_size=1)
+    engine.start()
+    release = threading.Event()
+
+    running = asyncio.create_task(engine._submit(release.wait))
+    queued = asyncio.create_task(engine._submit(release.wait))
+    await asyncio.sleep(0.05)
+
+    stats = engine.stats()
+    assert stats.in_flight == 1
+    assert stats.queue_depth == 1
+
+    with pytest.raises(HashingQueueFullError):
+        await engine._submit(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    stats = engine.stats()
+    assert stats.submitted == 2
+    assert stats.completed == 2
+    assert stats.rejected == 1
+    assert stats.wait_ms_max > 0
+
+    await engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_without_start(caplog):
+    engine = HashingEngine()
+    await engine.stop()
+
+    assert "stop() called but hashing engine was not started." in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_warmup_starts_pool_without_counting_jobs():
+    engine = HashingEngine(mode="process", workers=2)
+
+    await engine.warmup()
+
+    assert engine.executor is not None
+    assert len(engine.executor._processes) == 2
+    assert engine.stats().submitted == 0
+
+    await engine.stop()
+
+
+def test_process_pool_does_not_fork():
+    engine = HashingEngine(mode="process", workers=1)
+    engine.start()
+
+    # Forking a process that already runs threads can deadlock the child.
+    assert engine.executor._mp_context.get_start_method() in ("forkserver", "spawn")
+
+    engine.executor.shutdown()
@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from engines import PostgresEngine
+from engines import PostgresEngine, SessionStats, timed_query
+from metrics import MetricsRegistry
 
 
 @pytest.fixture(scope="session")
@@ -60,9 +64,351 @@ async def test_reset_context_clears_session(sqlite_dsn):
     await engine.connect(dsn=sqlite_dsn)
 
     session = await engine.get_session()
-    assert engine._session_context.get() is session
+    assert engine._session_context.get().reader is session
 
     engine.reset_context()
     assert engine._session_context.get() is None
 
     await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_listen_dispatches_payloads_and_resets():
+    engine = PostgresEngine()
+    received = []
+    resets = []
+    engine.listen("users_changed", received.append, lambda: resets.append(True))
+
+    engine._dispatch(None, 1, "users_changed", "payload")
+    engine._dispatch(None, 1, "other_channel", "ignored")
+    engine._reset_listeners()
+
+    assert received == ["payload"]
+    assert resets == [True]
+
+
+@pytest.mark.asyncio
+async def test_listen_callback_errors_are_logged(caplog):
+    engine = PostgresEngine()
+
+    def failing(payload):
+        raise RuntimeError("boom")
+
+    engine.listen("users_changed", failing)
+    engine._dispatch(None, 1, "users_changed", "payload")
+
+    assert "Error handling notification on users_changed" in caplog.text
+
+
+class _HalfOpenConnection:
+    """asyncpg connection whose peer vanished: no termination, no answers."""
+
+    def __init__(self) -> None:
+        self.terminated = False
+
+    def add_termination_listener(self, callback) -> None:
+        pass
+
+    async def add_listener(self, channel, callback) -> None:
+        pass
+
+    async def fetchval(self, query, timeout=None):
+        await asyncio.sleep(timeout)
+        raise asyncio.TimeoutError
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+    def is_closed(self) -> bool:
+        return self.terminated
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_when_ping_goes_unanswered(monkeypatch):
+    asyncpg = pytest.importorskip("asyncpg")
+    connections = []
+
+    async def connect(dsn):
+        connections.append(_HalfOpenConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    engine = PostgresEngine()
+    resets = []
+    engine.listen("users_changed", lambda payload: None, lambda: resets.append(1))
+
+    task = asyncio.create_task(
+        engine._listen_forever("postgresql://u:p@db/auth", ping_seconds=0.01)
+    )
+    while len(resets) < 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    # The silent connection was dropped and the caches were reset again.
+    assert connections[0].terminated
+    assert len(connections) >= 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_connect_does_not_start_listener(sqlite_dsn):
+    engine = PostgresEngine()
+    engine.listen("users_changed", lambda payload: None)
+    await engine.connect(dsn=sqlite_dsn)
+
+    assert engine._listen_task is None
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_session_scope_binds_and_closes_session(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+
+    async with engine.session_scope() as session:
+        assert await engine.get_session(readonly=False) is session
+        await session.execute(text("SELECT 1"))
+        assert await engine.get_session() is session
+
+    assert engine._session_context.get() is None
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_session_scope_rolls_back_on_error(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+
+    with pytest.raises(ValueError):
+        async with engine.session_scope():
+            raise ValueError("boom")
+
+    assert engine._session_context.get() is None
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_reads_on_primary_reuse_writable_session(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+
+    async with engine.request_scope():
+        readonly = await engine.get_session()
+        writable = await engine.get_session(readonly=False)
+
+        assert writable is not readonly
+        assert await engine.get_session() is writable
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_read_then_write_holds_one_connection(tmp_path):
+    engine = PostgresEngine()
+    await engine.connect(dsn=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    pool = engine.engine.pool
+
+    async with engine.request_scope():
+        writable = await engine.get_session(readonly=False)
+        async with engine.read_session() as session:
+            assert session is writable
+            await session.execute(text("SELECT 1"))
+            assert pool.checkedout() == 1
+
+        # The read's connection is back in the pool while e.g. hashing runs.
+        assert pool.checkedout() == 0
+        await writable.execute(text("SELECT 2"))
+        assert pool.checkedout() == 1
+
+    assert pool.checkedout() == 0
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_read_session_keeps_ongoing_write_transaction(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+
+    async with engine.request_scope():
+        writable = await engine.get_session(readonly=False)
+        await writable.execute(text("SELECT 1"))
+        async with engine.read_session() as session:
+            await session.execute(text("SELECT 2"))
+
+        assert session is writable
+        assert writable.in_transaction()
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_readonly_sessions_use_readonly_transactions():
+    engine = PostgresEngine()
+    await engine.connect(dsn="postgresql+asyncpg://user:pw@localhost/db")
+
+    readonly_bind = engine.readonly_session_factory.kw["bind"]
+    assert readonly_bind.get_execution_options()["postgresql_readonly"] is True
+    assert "postgresql_readonly" not in engine.engine.get_execution_options()
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_request_scope_closes_session_opened_in_child_task(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+    opened = []
+
+    async def query():
+        session = await engine.get_session()
+        await session.execute(text("SELECT 1"))
+        opened.append(session)
+
+    async with engine.request_scope():
+        await asyncio.create_task(query())
+        assert engine._session_context.get().reader is opened[0]
+
+    assert engine._session_context.get() is None
+    assert not opened[0].in_transaction()
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_close_session_returns_connection(sqlite_dsn):
+    engine = PostgresEngine()
+    await engine.connect(dsn=sqlite_dsn)
+
+    async with engine.request_scope():
+        session = await engine.get_session()
+        await session.execute(text("SELECT 1"))
+        assert session.in_transaction()
+
+        await engine.close_session()
+
+        assert not session.in_transaction()
+        assert await engine.get_session() is not session
+
+    await engine.disconnect()
+
+
+@pytest.fixture
+async def replicated_engine():
+    engine = PostgresEngine()
+    await engine.connect(
+        dsn="postgresql+asyncpg://user:pw@primary/db",
+        replica_dsns=[
+            "postgresql+asyncpg://user:pw@replica-1/db",
+            "postgresql+asyncpg://user:pw@replica-2/db",
+        ],
+        sticky_seconds=5,
+    )
+    yield engine
+    await engine.disconnect()
+
+
+def _host(session) -> str:
+    return session.bind.url.host
+
+
+@pytest.mark.asyncio
+async def test_reads_are_routed_round_robin_to_replicas(replicated_engine):
+    hosts = []
+    for _ in range(3):
+        async with replicated_engine.request_scope():
+            hosts.append(_host(await replicated_engine.get_session()))
+            writable = await replicated_engine.get_session(readonly=False)
+            assert _host(writable) == "primary"
+
+    assert hosts == ["replica-1", "replica-2", "replica-1"]
+
+
+@pytest.mark.asyncio
+async def test_least_busy_picks_replica_with_fewest_checked_out(replicated_engine):
+    replicated_engine._replica_strategy = "least_busy"
+    busy, idle = replicated_engine.replicas
+    busy.pool.checkedout = lambda: 3
+    idle.pool.checkedout = lambda: 1
+
+    async with replicated_engine.request_scope():
+        assert _host(await replicated_engine.get_session()) == "replica-2"
+
+
+@pytest.mark.asyncio
+async def test_sticky_keys_read_from_primary(replicated_engine):
+    replicated_engine.stick("user:alice")
+
+    async with replicated_engine.request_scope():
+        other = await replicated_engine.get_session(sticky_key="user:bob")
+        assert _host(other) == "replica-1"
+        sticky = await replicated_engine.get_session(sticky_key="user:alice")
+
+    assert _host(sticky) == "primary"
+    assert sticky is not other
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_pool_and_session_stats():
+    registry = MetricsRegistry()
+    engine = PostgresEngine(metrics=registry)
+    await engine.connect(dsn="postgresql+asyncpg://user:pw@primary/db", pool_size=3)
+
+    async with engine.request_scope():
+        await engine.get_session()
+        assert engine.session_stats().open == 1
+
+    assert type(engine.engine.pool).__name__ == "TimedPool"
+    assert engine.pool_stats()["primary"].size == 3
+    assert engine.session_stats() == SessionStats(open=0, opened=1, closed=1)
+    text = registry.render()
+    assert 'db_pool_size{pool="primary"} 3.0' in text
+    assert "db_sessions_closed_total 1.0" in text
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_timed_query_reports_method_latency():
+    registry = MetricsRegistry()
+    engine = PostgresEngine(metrics=registry)
+
+    class Repository:
+        def __init__(self, engine):
+            self._engine = engine
+
+        @timed_query
+        async def find(self):
+            return "row"
+
+    assert await Repository(engine).find() == "row"
+    assert '<locals>.Repository.find"} 1.0' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_connections_and_runs_statements(tmp_path):
+    engine = PostgresEngine()
+    await engine.connect(dsn=f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}")
+    executed = []
+
+    @event.listens_for(engine.engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    warmed = await engine.warmup(3, [(text("SELECT :x"), {"x": 1})])
+
+    assert warmed == 3
+    assert engine.engine.pool.checkedin() == 3
+    assert executed == ["SELECT ?"] * 3
+
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_warmup_without_connect_logs_error(caplog):
+    engine = PostgresEngine()
+
+    assert await engine.warmup(2) == 0
+    assert "Attempted to warm up before engine initialization." in caplog.text
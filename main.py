@@ -1,62 +1,109 @@
 import argparse
+import asyncio
+import atexit
+import importlib
+import json
 import logging
-from contextlib import asynccontextmanager
+import logging.handlers
+import os
+import queue
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import AsyncIterator, Literal
+from typing import Iterator
+
+from settings import Settings
+
+# Only the CLI, settings and logging are imported eagerly. The app stack
+# (FastAPI, SQLAlchemy, JWT, hashing) is imported on the serving path, and
+# uvicorn only when serving, so --calibrate, --help and the multi-worker
+# supervisor do not pay for it; see --profile-startup.
+
+# Worker processes started by uvicorn read the env file path from here.
+ENV_FILE_VAR = "AUTH_ENV_FILE"
+
+# Third-party modules timed one by one by --profile-startup, in the order the
+# app would import them; "app" then covers the project's own modules.
+PROFILED_IMPORTS = (
+    "fastapi",
+    "sqlalchemy.ext.asyncio",
+    "sqlalchemy.dialects.postgresql.asyncpg",
+    "jwt",
+    "bcrypt",
+    "app",
+)
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+    | {"message", "asctime", "taskName"}
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """Hands records to a QueueListener thread instead of writing them inline.
+
+    Only the message and traceback are rendered on the caller's thread, so
+    the listener's formatter still sees ``extra`` fields and ``exc_text``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class StartupProfile:
+    """Wall-clock time of each named startup phase."""
+
+    def __init__(self) -> None:
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
 
-import uvicorn
-from fastapi import APIRouter, FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import ConfigDict, computed_field
-from pydantic_settings import BaseSettings
-
-from engines import PostgresEngine
-from repositories import UserRepository
-from routers import create_auth_router
-from services import AuthService
-
-
-class Settings(BaseSettings):
-    model_config = ConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-    )
-
-    APP_TITLE: str = "Auth Service"
-    APP_HOST: str = "0.0.0.0"
-    APP_PORT: int = 8000
-    APP_WORKERS: int = 1
-    APP_DEBUG: bool = False
-    APP_LOG_LEVEL: Literal[
-        "CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"
-    ] = "INFO"
-    APP_API_PREFIX: str = "/api/v1"
-    APP_VERSION: str = "1.0.0"
-
-    POSTGRES_USER: str = "test_user"
-    POSTGRES_PASSWORD: str = "test_password"
-    POSTGRES_DB: str = "test_db"
-    POSTGRES_HOST: str = "localhost"
-    POSTGRES_PORT: int = 5432
-    POSTGRES_POOL_SIZE: int = 5
-    POSTGRES_POOL_IDLE_CONS: int = 10
-
-    JWT_SECRET: str = "test_secret"
-    JWT_EXPIRE_SECONDS: int = 60 * 60 * 24  # 1 day
-
-    CORS_ALLOW_ORIGINS: list[str] = ["*"]
-    CORS_ALLOW_METHODS: list[str] = ["*"]
-    CORS_ALLOW_HEADERS: list[str] = ["*"]
-    CORS_ALLOW_CREDENTIALS: bool = True
-
-    @computed_field(return_type=str)
     @property
-    def DATABASE_DSN(self) -> str:
-        """Return formatted async DSN string for PostgreSQL."""
-        return (
-            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
-            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
-        )
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self) -> str:
+        width = max(len(name) for name, _ in self.phases)
+        lines = [
+            f"{name:<{width}}  {seconds * 1000:8.1f} ms"
+            for name, seconds in self.phases
+        ]
+        lines.append(f"{'total':<{width}}  {self.total * 1000:8.1f} ms")
+        return "\n".join(lines)
 
 
 def parse_args() -> argparse.Namespace:
@@ -67,6 +114,16 @@ def parse_args() -> argparse.Namespace:
         default=Path(".env"),
         help="Path to environment file (default: .env)",
     )
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Benchmark the hashing cost on this host, print the result and exit",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Time imports, app creation and lifespan startup per phase and exit",
+    )
     return parser.parse_args()
 
 
@@ -74,73 +131,122 @@ def parse_env_file(env_file: Path) -> Settings:
     return Settings(_env_file=env_file)
 
 
-def configure_logger(settings: Settings):
+def configure_logger(settings: Settings) -> logging.handlers.QueueListener:
+    """Route all logging through a queue; the returned listener does the I/O.
+
+    The caller starts the listener and stops it on exit to flush the queue.
+    """
+    handler = logging.StreamHandler()
+    if settings.APP_LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
+        )
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
     logging.basicConfig(
         level=getattr(logging, settings.APP_LOG_LEVEL.upper(), logging.INFO),
-        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[QueueLogHandler(log_queue)],
+        force=True,
     )
+    return logging.handlers.QueueListener(log_queue, handler)
 
 
-def create_app(settings: Settings) -> FastAPI:
-    postgres_engine = PostgresEngine()
-    user_repository = UserRepository(postgres_engine)
-    auth_service = AuthService(
-        repository=user_repository,
-        jwt_secret=settings.JWT_SECRET,
-        jwt_exp=settings.JWT_EXPIRE_SECONDS,
-    )
-    auth_router = create_auth_router(auth_service, postgres_engine)
-
-    @asynccontextmanager
-    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-        await postgres_engine.connect(
-            dsn=settings.DATABASE_DSN,
-            pool_size=settings.POSTGRES_POOL_SIZE,
-            pool_max_idle_cons=settings.POSTGRES_POOL_IDLE_CONS,
-        )
-        logging.info("Connected to PostgreSQL.")
-        yield
-        await postgres_engine.disconnect()
-        logging.info("PostgreSQL connection closed.")
-
-    app = FastAPI(
-        title=settings.APP_TITLE,
-        version=settings.APP_VERSION,
-        debug=settings.APP_DEBUG,
-        lifespan=lifespan,
-    )
+def profile_startup(settings: Settings, lifespan: bool = True) -> StartupProfile:
+    """Run the serving path up to the first request, timing every phase.
 
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.CORS_ALLOW_ORIGINS,
-        allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
-        allow_methods=settings.CORS_ALLOW_METHODS,
-        allow_headers=settings.CORS_ALLOW_HEADERS,
-    )
+    Meant for a fresh interpreter: modules imported earlier cost nothing
+    here. Lifespan startup needs the database; if it fails, the phase is
+    still reported and the error logged.
+    """
+    profile = StartupProfile()
+    for module in PROFILED_IMPORTS:
+        with profile.phase(f"import {module}"):
+            importlib.import_module(module)
+
+    from app import create_app
+
+    with profile.phase("create_app"):
+        app = create_app(settings)
+
+    async def start_and_stop() -> None:
+        context = app.router.lifespan_context(app)
+        with profile.phase("lifespan startup"):
+            await context.__aenter__()
+        await context.__aexit__(None, None, None)
+
+    if lifespan:
+        try:
+            asyncio.run(start_and_stop())
+        except Exception as e:
+            logging.error(f"Lifespan startup failed: {e}")
+    return profile
+
+
+def create_app_from_env():
+    """App factory for uvicorn worker processes.
+
+    Each worker is a fresh interpreter: it reads its settings from the env
+    file named in ENV_FILE_VAR and sets up its own logging and pools.
+    """
+    from app import create_app
+
+    settings = parse_env_file(Path(os.environ.get(ENV_FILE_VAR, ".env")))
+    listener = configure_logger(settings)
+    listener.start()
+    atexit.register(listener.stop)
+    return create_app(settings)
 
-    router = APIRouter(prefix=settings.APP_API_PREFIX)
-    router.include_router(auth_router)
-    app.include_router(router)
 
-    return app
+def run_uvicorn(settings: Settings, env_file: Path) -> None:
+    import uvicorn
 
+    multiprocess = settings.APP_WORKERS > 1
+    if multiprocess:
+        # Workers cannot be handed an app object; they import the factory.
+        os.environ[ENV_FILE_VAR] = str(env_file.resolve())
+        app = "main:create_app_from_env"
+    else:
+        from app import create_app
 
-def run_uvicorn(app: FastAPI, settings: Settings) -> None:
+        app = create_app(settings)
     uvicorn.run(
         app,
+        factory=multiprocess,
         host=settings.APP_HOST,
         port=settings.APP_PORT,
+        uds=settings.APP_UDS,
         workers=settings.APP_WORKERS,
+        timeout_graceful_shutdown=settings.APP_GRACEFUL_SHUTDOWN_SECONDS,
+        limit_max_requests=settings.APP_LIMIT_MAX_REQUESTS,
+        limit_max_requests_jitter=settings.APP_LIMIT_MAX_REQUESTS_JITTER,
         log_level=settings.APP_LOG_LEVEL.lower(),
+        # Access logging is handled, and sampled, by LoggingMiddleware.
+        access_log=False,
     )
 
 
 def main():
     args = parse_args()
-    settings = parse_env_file(args.env_file)
-    configure_logger(settings)
-    app = create_app(settings)
-    run_uvicorn(app, settings)
+    profile = StartupProfile()
+    with profile.phase("settings"):
+        settings = parse_env_file(args.env_file)
+    with profile.phase("logging"):
+        listener = configure_logger(settings)
+        listener.start()
+    try:
+        if args.profile_startup:
+            profile.phases.extend(profile_startup(settings).phases)
+            print(profile.report())
+            return None
+        if args.calibrate:
+            from app import calibrate_hashing, create_hashers
+
+            calibrate_hashing(settings, create_hashers(settings))
+            return None
+        run_uvicorn(settings, args.env_file)
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
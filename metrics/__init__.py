@@ -0,0 +1,9 @@
+from .registry import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    StatsCollector,
+)
+
+__all__ = ("Counter", "Gauge", "Histogram", "MetricsRegistry", "StatsCollector")
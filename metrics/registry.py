@@ -0,0 +1,276 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dataclasses import fields
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Sample = tuple[str, Mapping[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_sample(name: str, labels: Mapping[str, str], value: float) -> str:
+    if labels:
+        pairs = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{pairs}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: object) -> Any:
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {values}."
+            )
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Value holder for one label combination."""
+
+    @abstractmethod
+    def _samples(self, child: Any, labels: dict[str, str]) -> Iterator[Sample]:
+        """Samples of one child, in exposition order."""
+
+    def collect(self) -> Iterator[Sample]:
+        for values, child in self._children.items():
+            yield from self._samples(child, dict(zip(self.labelnames, values)))
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self, child: _Value, labels: dict[str, str]) -> Iterator[Sample]:
+        yield self.name, labels, child.value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _samples(self, child: _Value, labels: dict[str, str]) -> Iterator[Sample]:
+        yield self.name, labels, child.value
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(
+        self, child: _HistogramValue, labels: dict[str, str]
+    ) -> Iterator[Sample]:
+        cumulative = 0
+        for bound, count in zip(child.buckets, child.counts):
+            cumulative += count
+            yield (
+                f"{self.name}_bucket",
+                {**labels, "le": _format_value(bound)},
+                cumulative,
+            )
+        yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, child.count
+        yield f"{self.name}_sum", labels, child.sum
+        yield f"{self.name}_count", labels, child.count
+
+
+class StatsCollector:
+    """Exposes the numeric fields of a stats dataclass (``HashingStats``,
+    ``CacheStats``...) read at scrape time.
+
+    ``func`` returns one stats object, or a mapping of ``label`` value to
+    stats object. Fields listed in ``counters`` are exported as counters,
+    the rest as gauges.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        func: Callable[[], Any],
+        documentation: str,
+        counters: Iterable[str] = (),
+        label: str | None = None,
+    ) -> None:
+        self.prefix = prefix
+        self.func = func
+        self.documentation = documentation
+        self.counters = frozenset(counters)
+        self.label = label
+
+    def collect(self) -> list[_Metric]:
+        stats = self.func()
+        if self.label is None:
+            stats = {None: stats}
+
+        metrics: dict[str, _Metric] = {}
+        for label_value, item in stats.items():
+            for field in fields(item):
+                value = getattr(item, field.name)
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = metrics.get(field.name)
+                if metric is None:
+                    is_counter = field.name in self.counters
+                    metric = metrics[field.name] = (Counter if is_counter else Gauge)(
+                        f"{self.prefix}_{field.name}"
+                        + ("_total" if is_counter else ""),
+                        f"{self.documentation}: {field.name.replace('_', ' ')}.",
+                        (self.label,) if self.label else (),
+                    )
+                child = metric.labels(label_value) if self.label else metric.labels()
+                if isinstance(metric, Counter):
+                    child.inc(value)
+                else:
+                    child.set(value)
+        return list(metrics.values())
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    ``const_labels`` are added to every sample, e.g. a ``worker`` label so
+    the scrapes of several processes behind one socket stay separate series.
+    """
+
+    def __init__(self, const_labels: Mapping[str, str] | None = None) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[StatsCollector] = []
+        self._const_labels = dict(const_labels or {})
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: StatsCollector) -> None:
+        self._collectors.append(collector)
+        return None
+
+    def render(self) -> str:
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector.collect())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.collect():
+                labels = {**self._const_labels, **labels}
+                lines.append(_format_sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
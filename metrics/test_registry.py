@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+
+import pytest
+
+from metrics import MetricsRegistry, StatsCollector
+from metrics.registry import _Metric
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    requests.labels("/login").inc()
+    requests.labels("/login").inc(2)
+    registry.gauge("temperature", "Temp.").set(21.5)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/login"} 3.0' in text
+    assert "# TYPE temperature gauge" in text
+    assert "temperature 21.5" in text
+
+
+def test_const_labels_are_added_to_every_sample():
+    registry = MetricsRegistry(const_labels={"worker": "101"})
+    registry.counter("logins_total", "Logins.", ("result",)).labels("ok").inc()
+    registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).labels().observe(
+        0.5
+    )
+
+    output = registry.render()
+
+    assert 'logins_total{worker="101",result="ok"} 1.0' in output
+    assert 'latency_seconds_bucket{worker="101",le="1.0"} 1.0' in output
+    assert 'latency_seconds_count{worker="101"} 1.0' in output
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2.0' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3.0' in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "latency_seconds_count 3.0" in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("c_total", "C.", ("path",)).labels('a"b\\c').inc()
+
+    assert 'c_total{path="a\\"b\\\\c"} 1.0' in registry.render()
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+
+    first = registry.counter("c_total", "C.")
+    assert registry.counter("c_total", "C.") is first
+    with pytest.raises(ValueError):
+        registry.gauge("c_total", "C.")
+
+
+def test_labels_must_match_labelnames():
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        registry.counter("c_total", "C.", ("a", "b")).labels("only-one")
+
+
+@dataclass(frozen=True)
+class FakeStats:
+    mode: str
+    size: int
+    hits: int
+
+
+def test_metric_types_must_implement_children_and_samples():
+    class Incomplete(_Metric):
+        def _new_child(self):
+            return 0
+
+    with pytest.raises(TypeError, match="_samples"):
+        Incomplete("incomplete", "Missing _samples.")
+
+
+def test_stats_collector_reads_dataclass_at_scrape_time():
+    registry = MetricsRegistry()
+    stats = {"primary": FakeStats("x", 1, 10), "replica-1": FakeStats("x", 2, 20)}
+    registry.register_collector(
+        StatsCollector("pool", lambda: stats, "Pool", counters=("hits",), label="pool")
+    )
+
+    text = registry.render()
+    stats["primary"] = FakeStats("x", 5, 11)
+    updated = registry.render()
+
+    assert "# TYPE pool_size gauge" in text
+    assert "# TYPE pool_hits_total counter" in text
+    assert 'pool_hits_total{pool="replica-1"} 20.0' in text
+    assert "pool_mode" not in text
+    assert 'pool_size{pool="primary"} 5.0' in updated
@@ -0,0 +1,23 @@
+CREATE OR REPLACE FUNCTION notify_users_changed() RETURNS trigger AS $$
+DECLARE
+    row users%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row := OLD;
+    ELSE
+        row := NEW;
+    END IF;
+
+    PERFORM pg_notify(
+        'users_changed',
+        json_build_object('user_uuid', row.user_uuid, 'username', row.username)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_changed ON users;
+
+CREATE TRIGGER users_changed
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_users_changed();
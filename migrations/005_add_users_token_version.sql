@@ -0,0 +1,4 @@
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS users_token_version_idx ON users (user_uuid, token_version)
+    WHERE token_version > 0;
@@ -0,0 +1,5 @@
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version_changed_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS users_token_version_changed_at_idx
+    ON users (token_version_changed_at)
+    WHERE token_version_changed_at IS NOT NULL;
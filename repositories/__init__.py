@@ -1,3 +1,13 @@
-from .user import UserRepository
+from .cached_user import CachedUserRepository
+from .revocation import RevocationRepository
+from .session import SessionRepository
+from .user import USER_WARMUP_STATEMENTS, UserRepository
 
-__all__ = ("UserRepository", "user_repository")
+__all__ = (
+    "CachedUserRepository",
+    "RevocationRepository",
+    "SessionRepository",
+    "USER_WARMUP_STATEMENTS",
+    "UserRepository",
+    "user_repository",
+)
@@ -0,0 +1,117 @@
+import json
+import logging
+import uuid
+
+from caches import MISSING, CacheStats, TTLCache
+from engines import PostgresEngine
+from repositories.models import UserRecord
+from repositories.user import USERS_CHANNEL, UserRepository, _user_key
+
+log = logging.getLogger(__name__)
+
+
+class CachedUserRepository(UserRepository):
+    """UserRepository that serves get_record lookups from an in-process cache.
+
+    Misses are cached too (for ``negative_ttl`` seconds), so repeated lookups
+    of unknown usernames stop reaching the database. Local writes evict the
+    user immediately; writes from other processes arrive via LISTEN/NOTIFY.
+    Either way the user's next lookup reads the primary for a while, so a
+    lagging replica cannot put the old row back into the cache.
+    """
+
+    def __init__(
+        self,
+        engine: PostgresEngine,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+    ) -> None:
+        super().__init__(engine)
+        self._negative_ttl = negative_ttl
+        self._cache: TTLCache[tuple[str, object], UserRecord | None] = TTLCache(
+            max_size=max_size, ttl=ttl
+        )
+        engine.listen(USERS_CHANNEL, self._on_users_changed, self.clear)
+
+    async def create(self, *, username: str, password_hash: str) -> dict | None:
+        user = await super().create(username=username, password_hash=password_hash)
+        self.invalidate(username=username)
+        return user
+
+    async def upsert(self, *, username: str, password_hash: str) -> dict | None:
+        user = await super().upsert(username=username, password_hash=password_hash)
+        self.invalidate(
+            username=username, user_uuid=user["user_uuid"] if user else None
+        )
+        return user
+
+    async def update_password_hash(
+        self,
+        *,
+        user_uuid: uuid.UUID,
+        old_hash: str,
+        new_hash: str,
+    ) -> bool:
+        updated = await super().update_password_hash(
+            user_uuid=user_uuid, old_hash=old_hash, new_hash=new_hash
+        )
+        self.invalidate(user_uuid=user_uuid)
+        return updated
+
+    async def bump_token_version(self, *, user_uuid: uuid.UUID) -> int | None:
+        version = await super().bump_token_version(user_uuid=user_uuid)
+        self.invalidate(user_uuid=user_uuid)
+        return version
+
+    async def get_record(
+        self,
+        *,
+        user_uuid: uuid.UUID | None = None,
+        username: str | None = None,
+    ) -> UserRecord | None:
+        key = ("username", username) if username else ("user_uuid", user_uuid)
+        cached = self._cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        record = await super().get_record(user_uuid=user_uuid, username=username)
+        if record is None:
+            self._cache.set(key, None, ttl=self._negative_ttl)
+        else:
+            self._cache.set(("username", record.username), record)
+            self._cache.set(("user_uuid", record.user_uuid), record)
+        return record
+
+    def invalidate(
+        self,
+        *,
+        username: str | None = None,
+        user_uuid: uuid.UUID | None = None,
+    ) -> None:
+        for key in (("username", username), ("user_uuid", user_uuid)):
+            if key[1] is None:
+                continue
+            record = self._cache.pop(key)
+            if record is not MISSING and record is not None:
+                self._cache.pop(("username", record.username))
+                self._cache.pop(("user_uuid", record.user_uuid))
+
+    def _on_users_changed(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            user_uuid = uuid.UUID(data["user_uuid"])
+            username = data["username"]
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning(f"Malformed {USERS_CHANNEL} payload {payload!r}: {e}")
+            self.clear()
+            return None
+        self._engine.stick(_user_key(username), _user_key(user_uuid))
+        self.invalidate(username=username, user_uuid=user_uuid)
+        return None
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
@@ -1,4 +1,6 @@
 from .base import Base
-from .user import UserDB
+from .revoked_token import RevokedTokenDB
+from .session import SessionDB
+from .user import UserDB, UserRecord
 
-__all__ = ("Base", "UserDB")
+__all__ = ("Base", "RevokedTokenDB", "SessionDB", "UserDB", "UserRecord")
@@ -1,6 +1,8 @@
 import uuid
+from dataclasses import dataclass
+from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import DateTime, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -24,3 +26,24 @@ class UserDB(Base):
         String(255),
         nullable=False,
     )
+    token_version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # When token_version was last bumped; lets caches read only recent bumps.
+    token_version_changed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    """Immutable projection of the user columns needed on the login path."""
+
+    user_uuid: uuid.UUID
+    username: str
+    password_hash: str
+    token_version: int = 0
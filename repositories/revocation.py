@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from engines import PostgresEngine, timed_query
+from repositories.models import RevokedTokenDB
+
+
+class RevocationRepository:
+    """Denylist of revoked token ids (jti), kept until the token would expire."""
+
+    def __init__(self, engine: PostgresEngine) -> None:
+        self._engine = engine
+
+    @timed_query
+    async def add(self, *, jti: str, expires_at: datetime) -> None:
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            insert(RevokedTokenDB)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedTokenDB.jti])
+        )
+
+        await session.execute(stmt)
+        return None
+
+    @timed_query
+    async def list_since(
+        self, *, revoked_after: datetime | None = None
+    ) -> list[tuple[str, datetime, datetime]]:
+        """Return unexpired (jti, expires_at, revoked_at) rows, oldest first."""
+        stmt = select(
+            RevokedTokenDB.jti, RevokedTokenDB.expires_at, RevokedTokenDB.revoked_at
+        ).where(RevokedTokenDB.expires_at > func.now())
+        if revoked_after is not None:
+            stmt = stmt.where(RevokedTokenDB.revoked_at > revoked_after)
+        stmt = stmt.order_by(RevokedTokenDB.revoked_at)
+
+        async with self._engine.read_session() as session:
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+
+revocation_repository: RevocationRepository | None = None
@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from engines import PostgresEngine, timed_query
+from repositories.models import SessionDB
+
+
+class SessionRepository:
+    """Refresh-token sessions, addressed by the SHA-256 digest of the token."""
+
+    def __init__(self, engine: PostgresEngine) -> None:
+        self._engine = engine
+
+    @timed_query
+    async def create(
+        self,
+        *,
+        user_uuid: uuid.UUID,
+        token_hash: str,
+        expires_at: datetime,
+    ) -> uuid.UUID | None:
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            insert(SessionDB)
+            .values(user_uuid=user_uuid, token_hash=token_hash, expires_at=expires_at)
+            .returning(SessionDB.session_uuid)
+        )
+
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @timed_query
+    async def rotate(
+        self,
+        *,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> uuid.UUID | None:
+        """Revoke a live session and open its successor in one statement.
+
+        Returns the session owner's user_uuid, or None if the token is unknown,
+        expired or already used.
+        """
+        session = await self._engine.get_session(readonly=False)
+
+        revoked = (
+            update(SessionDB)
+            .where(
+                SessionDB.token_hash == token_hash,
+                SessionDB.revoked_at.is_(None),
+                SessionDB.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .returning(SessionDB.user_uuid)
+            .cte("revoked")
+        )
+        stmt = (
+            insert(SessionDB)
+            .from_select(
+                ["user_uuid", "token_hash", "expires_at"],
+                select(
+                    revoked.c.user_uuid,
+                    literal(new_token_hash),
+                    literal(expires_at, SessionDB.expires_at.type),
+                ),
+            )
+            .returning(SessionDB.user_uuid)
+        )
+
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @timed_query
+    async def revoke_all(self, *, user_uuid: uuid.UUID) -> int:
+        """Revoke every live session of a user; return how many were revoked."""
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            update(SessionDB)
+            .where(
+                SessionDB.user_uuid == user_uuid,
+                SessionDB.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+        )
+
+        result = await session.execute(stmt)
+        return result.rowcount
+
+
+session_repository: SessionRepository | None = None
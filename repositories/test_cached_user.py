@@ -0,0 +1,205 @@
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from engines.postgres import PostgresEngine
+from repositories import CachedUserRepository, UserRepository
+from repositories.models import UserRecord
+
+
+@pytest.fixture
+def record():
+    return UserRecord(user_uuid=uuid.uuid4(), username="alice", password_hash="pw")
+
+
+@pytest.fixture
+def repo():
+    return CachedUserRepository(MagicMock(spec=PostgresEngine), max_size=10, ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_get_record_is_served_from_cache(repo, record):
+    with patch.object(
+        UserRepository, "get_record", AsyncMock(return_value=record)
+    ) as inner:
+        first = await repo.get_record(username="alice")
+        second = await repo.get_record(username="alice")
+        by_uuid = await repo.get_record(user_uuid=record.user_uuid)
+
+    assert first is second is by_uuid is record
+    inner.assert_awaited_once_with(user_uuid=None, username="alice")
+    assert repo.stats().hits == 2
+    assert repo.stats().misses == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_negatively_cached(repo):
+    with patch.object(
+        UserRepository, "get_record", AsyncMock(return_value=None)
+    ) as inner:
+        assert await repo.get_record(username="ghost") is None
+        assert await repo.get_record(username="ghost") is None
+
+    inner.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_invalidates_negative_entry(repo, record):
+    with (
+        patch.object(UserRepository, "get_record", AsyncMock(return_value=None)),
+        patch.object(UserRepository, "create", AsyncMock(return_value={})),
+    ):
+        await repo.get_record(username="alice")
+        await repo.create(username="alice", password_hash="pw")
+
+    with patch.object(
+        UserRepository, "get_record", AsyncMock(return_value=record)
+    ) as inner:
+        assert await repo.get_record(username="alice") is record
+
+    inner.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_upsert_invalidates_both_keys(repo, record):
+    with patch.object(UserRepository, "get_record", AsyncMock(return_value=record)):
+        await repo.get_record(username="alice")
+
+    with patch.object(
+        UserRepository,
+        "upsert",
+        AsyncMock(return_value={"user_uuid": record.user_uuid, "username": "alice"}),
+    ):
+        await repo.upsert(username="alice", password_hash="new")
+
+    assert repo.stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_update_password_hash_invalidates_user(repo, record):
+    with patch.object(UserRepository, "get_record", AsyncMock(return_value=record)):
+        await repo.get_record(username="alice")
+
+    with patch.object(
+        UserRepository, "update_password_hash", AsyncMock(return_value=True)
+    ):
+        assert await repo.update_password_hash(
+            user_uuid=record.user_uuid, old_hash="pw", new_hash="new"
+        )
+
+    assert repo.stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_subscribes_to_users_channel():
+    engine = MagicMock(spec=PostgresEngine)
+    repo = CachedUserRepository(engine)
+
+    engine.listen.assert_called_once_with(
+        "users_changed", repo._on_users_changed, repo.clear
+    )
+
+
+@pytest.mark.asyncio
+async def test_notification_evicts_user(repo, record):
+    with patch.object(UserRepository, "get_record", AsyncMock(return_value=record)):
+        await repo.get_record(username="alice")
+
+    repo._on_users_changed(
+        f'{{"user_uuid": "{record.user_uuid}", "username": "alice"}}'
+    )
+
+    assert repo.stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_malformed_notification_clears_cache(repo, record):
+    with patch.object(UserRepository, "get_record", AsyncMock(return_value=record)):
+        await repo.get_record(username="alice")
+
+    repo._on_users_changed("not json")
+
+    assert repo.stats().size == 0
+
+
+_USERS_DDL = (
+    "CREATE TABLE users (user_uuid CHAR(32) PRIMARY KEY, username TEXT, "
+    "password_hash TEXT, token_version INTEGER DEFAULT 0, "
+    "token_version_changed_at TIMESTAMP, "
+    "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+    "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+)
+
+
+@pytest.fixture
+async def lagging_replica(tmp_path):
+    """Engine whose only replica is a separate database that never catches up."""
+    user_uuid = uuid.uuid4()
+    dsns = []
+    for name in ("primary", "replica"):
+        dsn = f"sqlite+aiosqlite:///{tmp_path / name}.db"
+        setup = create_async_engine(dsn)
+        async with setup.begin() as connection:
+            await connection.execute(text(_USERS_DDL))
+            await connection.execute(
+                text(
+                    "INSERT INTO users (user_uuid, username, password_hash) "
+                    "VALUES (:u, 'alice', 'old')"
+                ),
+                {"u": user_uuid.hex},
+            )
+        await setup.dispose()
+        dsns.append(dsn)
+
+    engine = PostgresEngine()
+    await engine.connect(dsn=dsns[0], replica_dsns=dsns[1:], sticky_seconds=5)
+    yield engine, user_uuid
+    await engine.disconnect()
+
+
+async def _lookup(engine, repo):
+    async with engine.request_scope():
+        return await repo.get_record(username="alice")
+
+
+@pytest.mark.asyncio
+async def test_rehash_refills_cache_from_primary(lagging_replica):
+    engine, user_uuid = lagging_replica
+    repo = CachedUserRepository(engine)
+    assert (await _lookup(engine, repo)).password_hash == "old"
+
+    async with engine.session_scope():
+        assert await repo.update_password_hash(
+            user_uuid=user_uuid, old_hash="old", new_hash="new"
+        )
+
+    assert (await _lookup(engine, repo)).password_hash == "new"
+
+
+@pytest.mark.asyncio
+async def test_token_version_bump_refills_cache_from_primary(lagging_replica):
+    engine, user_uuid = lagging_replica
+    repo = CachedUserRepository(engine)
+    assert (await _lookup(engine, repo)).token_version == 0
+
+    async with engine.session_scope():
+        assert await repo.bump_token_version(user_uuid=user_uuid) == 1
+
+    assert (await _lookup(engine, repo)).token_version == 1
+
+
+@pytest.mark.asyncio
+async def test_notified_change_refills_cache_from_primary(lagging_replica):
+    engine, user_uuid = lagging_replica
+    repo = CachedUserRepository(engine)
+    assert (await _lookup(engine, repo)).password_hash == "old"
+
+    # Another process changes the password; only the primary has it yet.
+    async with engine.session_scope() as session:
+        await session.execute(text("UPDATE users SET password_hash = 'changed'"))
+    repo._on_users_changed(f'{{"user_uuid": "{user_uuid}", "username": "alice"}}')
+
+    assert (await _lookup(engine, repo)).password_hash == "changed"
@@ -0,0 +1,57 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from engines.postgres import PostgresEngine
+from repositories.revocation import RevocationRepository
+
+
+def _read_session(session):
+    """Stand-in for PostgresEngine.read_session yielding ``session``."""
+
+    @asynccontextmanager
+    async def read_session(sticky_key=None):
+        yield session
+
+    return MagicMock(side_effect=read_session)
+
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock()
+
+
+@pytest.fixture
+def repo(mock_session):
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+    return RevocationRepository(mock_engine)
+
+
+@pytest.mark.asyncio
+async def test_add_ignores_duplicates(repo, mock_session):
+    await repo.add(jti="abc", expires_at=datetime.now(timezone.utc))
+
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (jti) DO NOTHING" in sql
+
+
+@pytest.mark.asyncio
+async def test_list_since_returns_rows(repo, mock_session):
+    now = datetime.now(timezone.utc)
+    mock_result = MagicMock()
+    mock_result.all.return_value = [("abc", now, now)]
+    mock_session.execute.return_value = mock_result
+
+    rows = await repo.list_since(revoked_after=now)
+
+    assert rows == [("abc", now, now)]
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "revoked_tokens.revoked_at >" in sql
+    assert "ORDER BY revoked_tokens.revoked_at" in sql
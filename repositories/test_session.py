@@ -0,0 +1,97 @@
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from engines.postgres import PostgresEngine
+from repositories.session import SessionRepository
+
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock()
+
+
+@pytest.fixture
+def repo(mock_session):
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    return SessionRepository(mock_engine)
+
+
+@pytest.mark.asyncio
+async def test_create_returns_session_uuid(repo, mock_session):
+    session_id = uuid.uuid4()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = session_id
+    mock_session.execute.return_value = mock_result
+
+    result = await repo.create(
+        user_uuid=uuid.uuid4(),
+        token_hash="a" * 64,
+        expires_at=datetime.now(timezone.utc),
+    )
+
+    assert result == session_id
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rotate_returns_owner(repo, mock_session):
+    user_id = uuid.uuid4()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = user_id
+    mock_session.execute.return_value = mock_result
+
+    result = await repo.rotate(
+        token_hash="a" * 64,
+        new_token_hash="b" * 64,
+        expires_at=datetime.now(timezone.utc),
+    )
+
+    assert result == user_id
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rotate_returns_none_for_unknown_token(repo, mock_session):
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute.return_value = mock_result
+
+    result = await repo.rotate(
+        token_hash="a" * 64,
+        new_token_hash="b" * 64,
+        expires_at=datetime.now(timezone.utc),
+    )
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_rotate_is_a_single_statement(repo, mock_session):
+    mock_session.execute.return_value = MagicMock()
+
+    await repo.rotate(
+        token_hash="a" * 64,
+        new_token_hash="b" * 64,
+        expires_at=datetime.now(timezone.utc),
+    )
+
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH revoked AS")
+    assert "UPDATE sessions SET revoked_at=now()" in sql
+    assert "sessions.revoked_at IS NULL" in sql
+    assert "INSERT INTO sessions" in sql
+
+
+@pytest.mark.asyncio
+async def test_revoke_all_returns_rowcount(repo, mock_session):
+    mock_result = MagicMock()
+    mock_result.rowcount = 3
+    mock_session.execute.return_value = mock_result
+
+    assert await repo.revoke_all(user_uuid=uuid.uuid4()) == 3
@@ -1,13 +1,26 @@
 import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from engines.postgres import PostgresEngine
-from repositories.models import UserDB
+from repositories.models import Base, UserDB, UserRecord
 from repositories.user import UserRepository
 
 
+def _read_session(session):
+    """Stand-in for PostgresEngine.read_session yielding ``session``."""
+
+    @asynccontextmanager
+    async def read_session(sticky_key=None):
+        yield session
+
+    return MagicMock(side_effect=read_session)
+
+
 @pytest.mark.asyncio
 async def test_upsert_returns_user_dict():
     mock_engine = MagicMock(spec=PostgresEngine)
@@ -20,6 +33,7 @@ async def test_upsert_returns_user_dict():
     mock_result.scalar_one_or_none.return_value = fake_user
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     repo = UserRepository(mock_engine)
     result = await repo.upsert(username="alice", password_hash="hash123")
@@ -39,6 +53,7 @@ async def test_upsert_returns_none_when_no_user():
     mock_result.scalar_one_or_none.return_value = None
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     repo = UserRepository(mock_engine)
     result = await repo.upsert(username="bob", password_hash="pw")
@@ -56,6 +71,7 @@ async def test_upsert_builds_insert_statement(monkeypatch):
     mock_result.scalar_one_or_none.return_value = fake_user
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     mock_insert = MagicMock(return_value=MagicMock())
     monkeypatch.setattr("repositories.user.insert", mock_insert)
@@ -67,6 +83,58 @@ async def test_upsert_builds_insert_statement(monkeypatch):
     mock_session.execute.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_create_returns_user_dict():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    fake_user = UserDB(user_uuid=uuid.uuid4(), username="dave", password_hash="pw")
+    mock_result.scalar_one_or_none.return_value = fake_user
+    mock_session.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    result = await repo.create(username="dave", password_hash="pw")
+
+    mock_session.execute.assert_awaited_once()
+    assert result["username"] == "dave"
+
+
+@pytest.mark.asyncio
+async def test_create_returns_none_on_conflict():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    result = await repo.create(username="dave", password_hash="pw")
+
+    assert result is None
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_does_not_update_on_conflict():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_session.execute.return_value = MagicMock()
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    await repo.create(username="dave", password_hash="pw")
+
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (username) DO NOTHING" in sql
+    assert "RETURNING" in sql
+
+
 @pytest.mark.asyncio
 async def test_get_by_uuid_returns_user_dict():
     mock_engine = MagicMock(spec=PostgresEngine)
@@ -77,11 +145,12 @@ async def test_get_by_uuid_returns_user_dict():
     mock_result.scalar_one_or_none.return_value = fake_user
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     repo = UserRepository(mock_engine)
     result = await repo.get(user_uuid=user_id)
 
-    mock_engine.get_session.assert_awaited_once()
+    mock_engine.read_session.assert_called_once()
     mock_session.execute.assert_awaited_once()
     assert isinstance(result, dict)
     assert result["user_uuid"] == user_id
@@ -96,11 +165,12 @@ async def test_get_by_username_returns_user_dict():
     mock_result.scalar_one_or_none.return_value = fake_user
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     repo = UserRepository(mock_engine)
     result = await repo.get(username="charlie")
 
-    mock_engine.get_session.assert_awaited_once()
+    mock_engine.read_session.assert_called_once()
     mock_session.execute.assert_awaited_once()
     assert result["username"] == "charlie"
 
@@ -113,9 +183,178 @@ async def test_get_returns_none_if_no_user():
     mock_result.scalar_one_or_none.return_value = None
     mock_session.execute.return_value = mock_result
     mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
 
     repo = UserRepository(mock_engine)
     result = await repo.get(username="ghost")
 
     assert result is None
     mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_record_by_username_returns_user_record():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_connection = AsyncMock()
+    mock_result = MagicMock()
+    user_id = uuid.uuid4()
+    mock_result.first.return_value = (user_id, "alice", "pw", 0)
+    mock_connection.execute.return_value = mock_result
+    mock_session.connection.return_value = mock_connection
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    result = await repo.get_record(username="alice")
+
+    mock_session.execute.assert_not_awaited()
+    mock_connection.execute.assert_awaited_once()
+    assert mock_connection.execute.await_args.args[1] == {"username": "alice"}
+    assert result == UserRecord(user_uuid=user_id, username="alice", password_hash="pw")
+
+
+@pytest.mark.asyncio
+async def test_get_record_returns_none_if_no_user():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_connection = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.first.return_value = None
+    mock_connection.execute.return_value = mock_result
+    mock_session.connection.return_value = mock_connection
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    result = await repo.get_record(user_uuid=uuid.uuid4())
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_record_requires_a_key():
+    repo = UserRepository(MagicMock(spec=PostgresEngine))
+
+    with pytest.raises(ValueError):
+        await repo.get_record()
+
+
+@pytest.mark.asyncio
+async def test_get_record_reads_from_database():
+    engine = PostgresEngine()
+    await engine.connect(dsn="sqlite+aiosqlite:///:memory:")
+    async with engine.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id = uuid.uuid4()
+    session = await engine.get_session()
+    session.add(UserDB(user_uuid=user_id, username="erin", password_hash="pw"))
+    await session.commit()
+
+    repo = UserRepository(engine)
+    by_username = await repo.get_record(username="erin")
+    by_uuid = await repo.get_record(user_uuid=user_id)
+    as_dict = await repo.get(username="erin")
+
+    assert by_username == UserRecord(
+        user_uuid=user_id, username="erin", password_hash="pw"
+    )
+    assert by_uuid == by_username
+    assert "_sa_instance_state" not in as_dict
+
+    engine.reset_context()
+    await engine.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_bump_token_version_returns_new_version():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.first.return_value = MagicMock(token_version=2, username="alice")
+    mock_session.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+    user_id = uuid.uuid4()
+
+    repo = UserRepository(mock_engine)
+    result = await repo.bump_token_version(user_uuid=user_id)
+
+    assert result == 2
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "token_version=(users.token_version + " in sql
+    assert "token_version_changed_at=now()" in sql
+    assert "RETURNING users.token_version, users.username" in sql
+    mock_engine.stick.assert_called_once_with(("user", "alice"), ("user", str(user_id)))
+
+
+@pytest.mark.asyncio
+async def test_update_password_hash_is_conditional_on_old_hash():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    result = await repo.update_password_hash(
+        user_uuid=uuid.uuid4(), old_hash="old", new_hash="new"
+    )
+
+    assert result is False
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "SET password_hash=" in sql
+    assert "users.password_hash = " in sql
+    mock_engine.stick.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_list_token_versions_returns_bumped_users():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    user_id = uuid.uuid4()
+    changed_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    mock_result.all.return_value = [(user_id, 1, changed_at)]
+    mock_session.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    rows = await repo.list_token_versions(changed_after=changed_at)
+
+    assert rows == [(user_id, 1, changed_at)]
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "users.token_version_changed_at > " in sql
+    assert "ORDER BY users.token_version_changed_at" in sql
+
+
+@pytest.mark.asyncio
+async def test_writes_use_primary_and_stick_reads_to_it():
+    mock_engine = MagicMock(spec=PostgresEngine)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    user_id = uuid.uuid4()
+    mock_result.scalar_one_or_none.return_value = UserDB(
+        user_uuid=user_id, username="alice", password_hash="pw"
+    )
+    mock_result.first.return_value = None
+    mock_session.execute.return_value = mock_result
+    mock_session.connection.return_value.execute.return_value = mock_result
+    mock_engine.get_session = AsyncMock(return_value=mock_session)
+    mock_engine.read_session = _read_session(mock_session)
+
+    repo = UserRepository(mock_engine)
+    await repo.upsert(username="alice", password_hash="pw")
+
+    mock_engine.get_session.assert_awaited_with(readonly=False)
+    mock_engine.stick.assert_called_once_with(("user", "alice"), ("user", str(user_id)))
+
+    await repo.get_record(username="alice")
+    mock_engine.read_session.assert_called_with(sticky_key=("user", "alice"))
@@ -1,23 +1,85 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import or_, select
+from sqlalchemy import bindparam, func, or_, select, update
 from sqlalchemy.dialects.postgresql import insert
 
-from engines import PostgresEngine
-from repositories.models import UserDB
+from engines import PostgresEngine, timed_query
+from repositories.models import UserDB, UserRecord
+
+# Trigger-driven channel (see migrations/002_notify_users_changed.sql): every
+# write to users publishes {"user_uuid", "username"} on it at commit.
+USERS_CHANNEL = "users_changed"
+
+# Column-only Core statements built once at import: SQLAlchemy reuses their
+# compiled form and the asyncpg dialect keeps them prepared per connection.
+_RECORD_COLUMNS = (
+    UserDB.user_uuid,
+    UserDB.username,
+    UserDB.password_hash,
+    UserDB.token_version,
+)
+_SELECT_RECORD_BY_USERNAME = select(*_RECORD_COLUMNS).where(
+    UserDB.username == bindparam("username")
+)
+_SELECT_RECORD_BY_UUID = select(*_RECORD_COLUMNS).where(
+    UserDB.user_uuid == bindparam("user_uuid")
+)
+
+# Run once per pooled connection at startup (see PostgresEngine.warmup) so the
+# login lookups are already prepared when traffic arrives.
+USER_WARMUP_STATEMENTS = (
+    (_SELECT_RECORD_BY_USERNAME, {"username": ""}),
+    (_SELECT_RECORD_BY_UUID, {"user_uuid": uuid.UUID(int=0)}),
+)
+
+
+def _user_key(value: object) -> tuple[str, str]:
+    """Read-your-writes key (see PostgresEngine.stick) for a username or uuid."""
+    return ("user", str(value))
+
+
+def _to_dict(user: UserDB) -> dict:
+    return {
+        attr.key: getattr(user, attr.key) for attr in UserDB.__mapper__.column_attrs
+    }
 
 
 class UserRepository:
     def __init__(self, engine: PostgresEngine) -> None:
         self._engine = engine
 
+    @timed_query
+    async def create(
+        self,
+        *,
+        username: str,
+        password_hash: str,
+    ) -> dict | None:
+        """Insert a user unless the username is taken; return None on conflict."""
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            insert(UserDB)
+            .values(username=username, password_hash=password_hash)
+            .on_conflict_do_nothing(index_elements=[UserDB.username])
+            .returning(UserDB)
+        )
+
+        result = await session.execute(stmt)
+        user = result.scalar_one_or_none()
+        if user:
+            self._engine.stick(_user_key(user.username), _user_key(user.user_uuid))
+        return _to_dict(user) if user else None
+
+    @timed_query
     async def upsert(
         self,
         *,
         username: str,
         password_hash: str,
     ) -> dict | None:
-        session = await self._engine.get_session()
+        session = await self._engine.get_session(readonly=False)
 
         stmt = (
             insert(UserDB)
@@ -31,16 +93,17 @@ class UserRepository:
 
         result = await session.execute(stmt)
         user = result.scalar_one_or_none()
-        return dict(user.__dict__) if user else None
+        if user:
+            self._engine.stick(_user_key(user.username), _user_key(user.user_uuid))
+        return _to_dict(user) if user else None
 
+    @timed_query
     async def get(
         self,
         *,
         user_uuid: uuid.UUID | None = None,
         username: str | None = None,
     ) -> dict | None:
-        session = await self._engine.get_session()
-
         conditions = []
         if user_uuid:
             conditions.append(UserDB.user_uuid == user_uuid)
@@ -48,10 +111,104 @@ class UserRepository:
             conditions.append(UserDB.username == username)
 
         stmt = select(UserDB).where(or_(*conditions))
+        async with self._engine.read_session(
+            sticky_key=_user_key(username or user_uuid)
+        ) as session:
+            result = await session.execute(stmt)
+            user = result.scalar_one_or_none()
+            return _to_dict(user) if user else None
+
+    @timed_query
+    async def get_record(
+        self,
+        *,
+        user_uuid: uuid.UUID | None = None,
+        username: str | None = None,
+    ) -> UserRecord | None:
+        """Fetch a user without the ORM: no identity map, only the login columns."""
+        if username:
+            stmt, params = _SELECT_RECORD_BY_USERNAME, {"username": username}
+        elif user_uuid:
+            stmt, params = _SELECT_RECORD_BY_UUID, {"user_uuid": user_uuid}
+        else:
+            raise ValueError("Either user_uuid or username must be provided.")
+
+        async with self._engine.read_session(
+            sticky_key=_user_key(username or user_uuid)
+        ) as session:
+            connection = await session.connection()
+            result = await connection.execute(stmt, params)
+            row = result.first()
+
+        return UserRecord(*row) if row else None
+
+    @timed_query
+    async def bump_token_version(self, *, user_uuid: uuid.UUID) -> int | None:
+        """Invalidate every token issued to the user; return the new version."""
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            update(UserDB)
+            .where(UserDB.user_uuid == user_uuid)
+            .values(
+                token_version=UserDB.token_version + 1,
+                token_version_changed_at=func.now(),
+            )
+            .returning(UserDB.token_version, UserDB.username)
+        )
+
         result = await session.execute(stmt)
-        user = result.scalar_one_or_none()
+        row = result.first()
+        if row is None:
+            return None
+        self._engine.stick(_user_key(row.username), _user_key(user_uuid))
+        return row.token_version
+
+    @timed_query
+    async def update_password_hash(
+        self,
+        *,
+        user_uuid: uuid.UUID,
+        old_hash: str,
+        new_hash: str,
+    ) -> bool:
+        """Replace the hash only if it is still ``old_hash``; return True if updated."""
+        session = await self._engine.get_session(readonly=False)
+
+        stmt = (
+            update(UserDB)
+            .where(UserDB.user_uuid == user_uuid, UserDB.password_hash == old_hash)
+            .values(password_hash=new_hash)
+            .returning(UserDB.username)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await session.execute(stmt)
+        username = result.scalar_one_or_none()
+        if username is None:
+            return False
+        self._engine.stick(_user_key(username), _user_key(user_uuid))
+        return True
+
+    @timed_query
+    async def list_token_versions(
+        self, *, changed_after: datetime
+    ) -> list[tuple[uuid.UUID, int, datetime]]:
+        """Return (user_uuid, token_version, changed_at) for versions bumped
+        after ``changed_after``, oldest first."""
+        stmt = (
+            select(
+                UserDB.user_uuid,
+                UserDB.token_version,
+                UserDB.token_version_changed_at,
+            )
+            .where(UserDB.token_version_changed_at > changed_after)
+            .order_by(UserDB.token_version_changed_at)
+        )
 
-        return dict(user.__dict__) if user else None
+        async with self._engine.read_session() as session:
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
 
 
 user_repository: UserRepository | None = None
@@ -1 +1,11 @@
-__all__ = "create_auth_router"
+from .auth import create_auth_router
+from .health import create_health_router
+from .metrics import create_metrics_router
+from .well_known import create_well_known_router
+
+__all__ = (
+    "create_auth_router",
+    "create_health_router",
+    "create_metrics_router",
+    "create_well_known_router",
+)
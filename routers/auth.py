@@ -1,26 +1,113 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 
 from engines import PostgresEngine
-from routers.decorators import transaction
-from schemas import LoginRequest, LoginResponse, RegisterRequest
+from routers.decorators import AdmissionLimiter, admission, transaction
+from schemas import (
+    LoginRequest,
+    LoginResponse,
+    LogoutAllRequest,
+    RefreshRequest,
+    RegisterRequest,
+    RevokeRequest,
+    VerifyBatchRequest,
+    VerifyBatchResponse,
+    VerifyRequest,
+    VerifyResponse,
+)
 from services import AuthService
 
 
 def create_auth_router(
     auth_service: AuthService,
     postgres_engine: PostgresEngine,
+    login_admission: AdmissionLimiter | None = None,
+    register_admission: AdmissionLimiter | None = None,
+    transaction_retries: int = 2,
 ) -> APIRouter:
     router = APIRouter(prefix="/auth", tags=["auth"])
 
     @router.post("/register", status_code=status.HTTP_201_CREATED)
-    @transaction(postgres_engine)
+    @admission(register_admission)
+    @transaction(postgres_engine, retries=transaction_retries)
     async def register(req: RegisterRequest) -> None:
         """Register a new user."""
         return await auth_service.register(req)
 
-    @router.post("/login", response_model=LoginResponse)
-    async def login(req: LoginRequest):
+    # Not retried: a rerun would take another throttle token and pay for
+    # another password check, and its only write (the refresh session
+    # insert) does not conflict with other transactions.
+    @admission(login_admission)
+    @transaction(postgres_engine, retries=0)
+    async def _login(req: LoginRequest, client_address: str | None):
+        return await auth_service.login(req, client_address=client_address)
+
+    @router.post(
+        "/login", response_model=LoginResponse, response_model_exclude_none=True
+    )
+    async def login(req: LoginRequest, request: Request):
         """Login user and return JWT token."""
-        return await auth_service.login(req)
+        client_address = request.client.host if request.client else None
+        # Throttled attempts are rejected before they take an admission slot.
+        auth_service.check_login_throttle(req.username, client_address)
+        return await _login(req, client_address)
+
+    @router.post(
+        "/refresh", response_model=LoginResponse, response_model_exclude_none=True
+    )
+    @transaction(postgres_engine, retries=transaction_retries)
+    async def refresh(req: RefreshRequest):
+        """Rotate a refresh token and return a new access/refresh token pair."""
+        return await auth_service.refresh(req)
+
+    @router.post("/verify", response_model=VerifyResponse)
+    async def verify(req: VerifyRequest):
+        """Introspect a JWT token and return its claims if it is valid."""
+        return await auth_service.verify(req)
+
+    @router.post("/verify/batch", response_model=VerifyBatchResponse)
+    async def verify_batch(req: VerifyBatchRequest):
+        """Introspect many JWT tokens in one call, preserving request order."""
+        return await auth_service.verify_batch(req)
+
+    @router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+    @transaction(postgres_engine, retries=transaction_retries)
+    async def revoke(req: RevokeRequest) -> None:
+        """Revoke an access token before it expires."""
+        return await auth_service.revoke(req)
+
+    @transaction(postgres_engine, retries=transaction_retries)
+    async def _logout_all(req: LogoutAllRequest) -> tuple[str, int]:
+        return await auth_service.logout_all(req)
+
+    @router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+    async def logout_all(req: LogoutAllRequest) -> None:
+        """Revoke every access and refresh token of the token's owner."""
+        user_uuid, version = await _logout_all(req)
+        # Only a committed bump may reject the user's tokens locally.
+        auth_service.apply_token_version(user_uuid, version)
+        return None
+
+    @router.get(
+        "/check",
+        status_code=status.HTTP_204_NO_CONTENT,
+        responses={status.HTTP_401_UNAUTHORIZED: {"description": "Invalid token"}},
+    )
+    async def check(request: Request) -> Response:
+        """auth_request-style subrequest: 204 with identity headers or 401."""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            result = auth_service.introspect(token)
+            if result.active:
+                return Response(
+                    status_code=status.HTTP_204_NO_CONTENT,
+                    headers={
+                        "X-Auth-Subject": result.sub,
+                        "X-Auth-Expires": str(result.exp),
+                    },
+                )
+        return Response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
     return router
@@ -1,3 +1,11 @@
-from .transaction import transaction
+from .admission import AdmissionLimiter, AdmissionStats, admission
+from .transaction import RETRYABLE_SQLSTATES, sqlstate, transaction
 
-__all__ = ("transaction",)
+__all__ = (
+    "AdmissionLimiter",
+    "AdmissionStats",
+    "RETRYABLE_SQLSTATES",
+    "admission",
+    "sqlstate",
+    "transaction",
+)
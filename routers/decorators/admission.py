@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+log = logging.getLogger(__name__)
+R = TypeVar("R")
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionStats:
+    max_in_flight: int
+    max_queue: int
+    in_flight: int
+    queued: int
+    rejected: int
+
+
+class AdmissionLimiter:
+    """Caps concurrent executions of an endpoint and sheds load past a queue.
+
+    Rejections are counted in stats(); the warning about them is logged at
+    most once per ``log_interval`` seconds, since they come in bursts exactly
+    when the process is saturated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int = 0,
+        queue_timeout: float | None = None,
+        retry_after: int = 1,
+        log_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.log_interval = log_interval
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._clock = clock
+        self._logged_at: float | None = None
+        self._unlogged = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            max_in_flight=self.max_in_flight,
+            max_queue=self.max_queue,
+            in_flight=self.in_flight,
+            queued=self.queued,
+            rejected=self.rejected,
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._slots.locked() and self.queued >= self.max_queue:
+            raise self._reject("queue full")
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue timeout")
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.rejected += 1
+        self._unlogged += 1
+        now = self._clock()
+        if self._logged_at is None or now - self._logged_at >= self.log_interval:
+            log.warning(
+                "Admission rejected %s request(s): endpoint=%s, reason=%s, "
+                "in_flight=%s, queued=%s",
+                self._unlogged,
+                self.name,
+                reason,
+                self.in_flight,
+                self.queued,
+            )
+            self._logged_at = now
+            self._unlogged = 0
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is overloaded, try again later.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+def admission(limiter: AdmissionLimiter | None):
+    def decorator(func: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
+        if limiter is None:
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> R:
+            async with limiter.admit():
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
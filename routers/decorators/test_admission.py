@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from metrics import MetricsRegistry, StatsCollector
+from routers.decorators import AdmissionLimiter, admission
+
+
+@pytest.mark.asyncio
+async def test_admission_passes_result_through():
+    """✅ Should run the endpoint and release the slot afterwards."""
+    limiter = AdmissionLimiter(name="test", max_in_flight=1)
+
+    @admission(limiter)
+    async def dummy_func(x):
+        return x * 2
+
+    assert await dummy_func(5) == 10
+    assert limiter.in_flight == 0
+    assert limiter.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_without_limiter_returns_original():
+    """✅ Should leave the endpoint untouched when no limiter is configured."""
+
+    async def dummy_func():
+        return "ok"
+
+    assert admission(None)(dummy_func) is dummy_func
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_queue_full():
+    """❌ Should fail fast with 503 and Retry-After when the queue is full."""
+    limiter = AdmissionLimiter(name="test", max_in_flight=1, max_queue=1, retry_after=3)
+    release = asyncio.Event()
+
+    @admission(limiter)
+    async def slow_func():
+        await release.wait()
+        return "ok"
+
+    running = asyncio.create_task(slow_func())
+    queued = asyncio.create_task(slow_func())
+    await asyncio.sleep(0)
+
+    assert limiter.in_flight == 1
+    assert limiter.queued == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await slow_func()
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "3"
+    assert limiter.rejected == 1
+
+    release.set()
+    assert await asyncio.gather(running, queued) == ["ok", "ok"]
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_on_queue_timeout():
+    """❌ Should reject a queued request that waits longer than queue_timeout."""
+    limiter = AdmissionLimiter(
+        name="test", max_in_flight=1, max_queue=1, queue_timeout=0.01
+    )
+    release = asyncio.Event()
+
+    @admission(limiter)
+    async def slow_func():
+        await release.wait()
+
+    running = asyncio.create_task(slow_func())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc:
+        await slow_func()
+
+    assert exc.value.status_code == 503
+    assert limiter.queued == 0
+
+    release.set()
+    await running
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rejections_are_logged_at_most_once_per_interval(caplog):
+    """🔇 Should summarise a burst of rejections instead of logging each one."""
+    clock = FakeClock()
+    limiter = AdmissionLimiter(
+        name="login", max_in_flight=1, log_interval=10, clock=clock
+    )
+
+    for _ in range(5):
+        limiter._reject("queue full")
+    clock.now += 10
+    for _ in range(3):
+        limiter._reject("queue full")
+
+    messages = [
+        r.getMessage()
+        for r in caplog.records
+        if r.name == "routers.decorators.admission"
+    ]
+    assert len(messages) == 2
+    assert messages[0].startswith("Admission rejected 1 request(s): endpoint=login")
+    assert messages[1].startswith("Admission rejected 5 request(s): endpoint=login")
+    assert limiter.rejected == 8
+
+
+def test_stats_are_exported_as_metrics():
+    """📈 Should expose in-flight, queued and rejected counts per endpoint."""
+    limiter = AdmissionLimiter(name="login", max_in_flight=4, max_queue=8)
+    limiter._reject("queue full")
+    registry = MetricsRegistry()
+    registry.register_collector(
+        StatsCollector(
+            "admission",
+            lambda: {limiter.name: limiter.stats()},
+            "Endpoint admission",
+            counters=("rejected",),
+            label="endpoint",
+        )
+    )
+
+    output = registry.render()
+
+    assert 'admission_rejected_total{endpoint="login"} 1.0' in output
+    assert 'admission_in_flight{endpoint="login"} 0.0' in output
+    assert 'admission_max_queue{endpoint="login"} 8.0' in output
@@ -1,10 +1,11 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
-from routers.decorators import transaction
+from routers.decorators import sqlstate, transaction
 
 
 @pytest.fixture
@@ -12,12 +13,13 @@ def mock_engine():
     """Mock PostgresEngine with async session."""
     engine = MagicMock()
     engine.get_session = AsyncMock()
-    engine.reset_context = MagicMock()
+    engine.close_session = AsyncMock()
 
     # Create an async session mock with async commit/rollback
     mock_session = AsyncMock()
     mock_session.commit = AsyncMock()
     mock_session.rollback = AsyncMock()
+    mock_session.info = {}
 
     # Default behavior: return our session
     engine.get_session.return_value = mock_session
@@ -26,7 +28,7 @@ def mock_engine():
 
 @pytest.mark.asyncio
 async def test_transaction_success(mock_engine):
-    """✅ Should commit and reset context on success."""
+    """✅ Should request a writable session, commit and close it on success."""
     mock_session = await mock_engine.get_session()
 
     @transaction(mock_engine)
@@ -36,9 +38,10 @@ async def test_transaction_success(mock_engine):
     result = await dummy_func(5)
 
     assert result == 10
+    mock_engine.get_session.assert_awaited_with(readonly=False)
     mock_session.commit.assert_awaited_once()
     mock_session.rollback.assert_not_awaited()
-    mock_engine.reset_context.assert_called_once()
+    mock_engine.close_session.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -57,7 +60,7 @@ async def test_transaction_sqlalchemy_error(mock_engine):
     assert "transaction failed" in exc.value.detail.lower()
     mock_session.rollback.assert_awaited_once()
     mock_session.commit.assert_not_awaited()
-    mock_engine.reset_context.assert_called_once()
+    mock_engine.close_session.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -74,7 +77,25 @@ async def test_transaction_generic_exception(mock_engine):
 
     mock_session.rollback.assert_awaited_once()
     mock_session.commit.assert_not_awaited()
-    mock_engine.reset_context.assert_called_once()
+    mock_engine.close_session.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_transaction_http_exception_is_not_logged(mock_engine, caplog):
+    """❌ Should rollback and re-raise HTTPException without logging it."""
+    mock_session = await mock_engine.get_session()
+
+    @transaction(mock_engine)
+    async def unauthorized():
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    with pytest.raises(HTTPException) as exc:
+        await unauthorized()
+
+    assert exc.value.status_code == 401
+    mock_session.rollback.assert_awaited_once()
+    mock_session.commit.assert_not_awaited()
+    assert not [r for r in caplog.records if r.name == "routers.decorators.transaction"]
 
 
 @pytest.mark.asyncio
@@ -91,4 +112,158 @@ async def test_transaction_no_session(mock_engine):
 
     assert exc.value.status_code == 500
     assert "session not available" in exc.value.detail.lower()
-    mock_engine.reset_context.assert_not_called()
+    mock_engine.close_session.assert_not_awaited()
+
+
+class _PgError(Exception):
+    """Stands in for the driver error; SQLAlchemy's asyncpg adapter sets sqlstate."""
+
+    def __init__(self, sqlstate: str) -> None:
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def _db_error(code: str) -> DBAPIError:
+    return DBAPIError("UPDATE users ...", {}, _PgError(code))
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return delays
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code", ["40001", "40P01"])
+async def test_transaction_retries_retryable_sqlstate(mock_engine, no_sleep, code):
+    """🔁 Should roll back and rerun on serialization failures and deadlocks."""
+    mock_session = await mock_engine.get_session()
+    calls = []
+
+    @transaction(mock_engine, retries=2, backoff=0.1)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _db_error(code)
+        return "ok"
+
+    assert await flaky() == "ok"
+    assert len(calls) == 3
+    assert mock_session.rollback.await_count == 2
+    mock_session.commit.assert_awaited_once()
+    assert 0 <= no_sleep[0] <= 0.1 and 0 <= no_sleep[1] <= 0.2
+    mock_engine.close_session.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_transaction_gives_up_with_503_after_retries(mock_engine, no_sleep):
+    """❌ Should answer 503 with Retry-After once retries are exhausted."""
+
+    @transaction(mock_engine, retries=1)
+    async def always_conflicts():
+        raise _db_error("40001")
+
+    with pytest.raises(HTTPException) as exc:
+        await always_conflicts()
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "1"}
+    assert len(no_sleep) == 1
+
+
+@pytest.mark.asyncio
+async def test_transaction_does_not_retry_other_sqlstates(mock_engine, no_sleep):
+    """❌ Should not rerun on non-transient errors such as unique violations."""
+    calls = []
+
+    @transaction(mock_engine)
+    async def duplicate():
+        calls.append(1)
+        raise _db_error("23505")
+
+    with pytest.raises(HTTPException) as exc:
+        await duplicate()
+
+    assert exc.value.status_code == 500
+    assert calls == [1]
+    assert no_sleep == []
+
+
+def test_sqlstate_reads_pgcode_and_wrapped_cause():
+    class PsycopgError(Exception):
+        pgcode = "40P01"
+
+    adapter_error = Exception("adapted")
+    adapter_error.__cause__ = _PgError("40001")
+
+    assert sqlstate(DBAPIError("SELECT 1", {}, PsycopgError())) == "40P01"
+    assert sqlstate(DBAPIError("SELECT 1", {}, adapter_error)) == "40001"
+    assert sqlstate(SQLAlchemyError("no driver error")) is None
+
+
+@pytest.mark.asyncio
+async def test_nested_transaction_uses_savepoint(mock_engine):
+    """🪆 Inner calls run in a savepoint; only the outer one commits."""
+    mock_session = await mock_engine.get_session()
+    mock_session.begin_nested = MagicMock()
+    savepoint = mock_session.begin_nested.return_value
+    savepoint.__aenter__ = AsyncMock()
+    savepoint.__aexit__ = AsyncMock(return_value=False)
+
+    @transaction(mock_engine)
+    async def inner():
+        return "inner"
+
+    @transaction(mock_engine)
+    async def outer():
+        return await inner()
+
+    assert await outer() == "inner"
+    mock_session.begin_nested.assert_called_once()
+    savepoint.__aexit__.assert_awaited_once()
+    mock_session.commit.assert_awaited_once()
+    mock_engine.close_session.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_background_task_transaction_commits_its_own_session(mock_engine):
+    """🧵 A task spawned inside a transaction still commits its own session."""
+    task_session = AsyncMock()
+    task_session.info = {}
+
+    @transaction(mock_engine)
+    async def background():
+        return "background"
+
+    @transaction(mock_engine)
+    async def endpoint():
+        # The task copies the context but opens a session of its own.
+        mock_engine.get_session.return_value = task_session
+        return await asyncio.create_task(background())
+
+    assert await endpoint() == "background"
+    task_session.commit.assert_awaited_once()
+    task_session.begin_nested.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_transaction_applies_isolation_level_and_read_only(mock_engine):
+    """⚙️ Should open the transaction with the route's execution options."""
+    mock_session = await mock_engine.get_session()
+
+    @transaction(mock_engine, isolation_level="SERIALIZABLE", read_only=True)
+    async def report():
+        return "ok"
+
+    assert await report() == "ok"
+    mock_session.connection.assert_awaited_once_with(
+        execution_options={
+            "isolation_level": "SERIALIZABLE",
+            "postgresql_readonly": True,
+        }
+    )
@@ -1,42 +1,137 @@
+import asyncio
 import functools
 import logging
-from typing import Any, Awaitable, Callable, TypeVar
+import random
+from typing import Any, Awaitable, Callable, Literal, TypeVar
 
 from fastapi import HTTPException
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
 from engines import PostgresEngine
 
 log = logging.getLogger(__name__)
 R = TypeVar("R")
 
+IsolationLevel = Literal["READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"]
+
+# serialization_failure and deadlock_detected: the transaction did nothing
+# wrong and succeeds if simply run again.
+RETRYABLE_SQLSTATES = frozenset({"40001", "40P01"})
+
+# Flag in session.info while a @transaction runs on that session, so inner
+# ones become savepoints. It lives on the session, not in a ContextVar: tasks
+# copy the context, and a background task's own session must still commit.
+_ACTIVE = "transaction_active"
+
+
+def sqlstate(error: SQLAlchemyError) -> str | None:
+    """SQLSTATE of the driver error behind ``error``, if there is one."""
+    if not isinstance(error, DBAPIError):
+        return None
+    orig = error.orig
+    # SQLAlchemy's asyncpg adapter copies it to sqlstate/pgcode; psycopg has
+    # pgcode; the raw asyncpg error is the adapter's __cause__.
+    for source in (orig, getattr(orig, "__cause__", None)):
+        code = getattr(source, "sqlstate", None) or getattr(source, "pgcode", None)
+        if code:
+            return code
+    return None
+
+
+def transaction(
+    engine: PostgresEngine,
+    retries: int = 2,
+    backoff: float = 0.05,
+    max_backoff: float = 1.0,
+    isolation_level: IsolationLevel | None = None,
+    read_only: bool = False,
+    retry_on: frozenset[str] = RETRYABLE_SQLSTATES,
+):
+    """Run the endpoint in one transaction, committed on success.
+
+    Failures with a SQLSTATE in ``retry_on`` are rolled back and the whole
+    call is run again, up to ``retries`` times, after a full-jitter backoff.
+    Only retry endpoints that are idempotent and cheap to rerun; pass
+    ``retries=0`` for the rest.
+    Only the outermost call retries and commits: a ``@transaction`` called
+    inside another runs in a savepoint, rolls back only its own work on
+    error and re-raises. ``isolation_level`` and ``read_only`` apply to the
+    outermost transaction.
+    """
+    execution_options: dict[str, Any] = {}
+    if isolation_level is not None:
+        execution_options["isolation_level"] = isolation_level
+    if read_only:
+        execution_options["postgresql_readonly"] = True
 
-def transaction(engine: PostgresEngine):
     def decorator(func: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> R:
-            session = await engine.get_session()
+            session = await engine.get_session(readonly=False)
             if session is None:
                 raise HTTPException(
                     status_code=500, detail="Database session not available."
                 )
 
+            if session.info.get(_ACTIVE):
+                async with session.begin_nested():
+                    return await func(*args, **kwargs)
+
+            session.info[_ACTIVE] = True
             try:
-                result = await func(*args, **kwargs)
-                await session.commit()
-                return result
-            except SQLAlchemyError as e:
-                await session.rollback()
-                log.warning(f"Transaction rolled back due to SQLAlchemyError: {e}")
-                raise HTTPException(
-                    status_code=500, detail="Database transaction failed."
-                )
-            except Exception as e:
-                await session.rollback()
-                log.exception(f"Unexpected error during transaction: {e}")
-                raise
+                for attempt in range(retries + 1):
+                    try:
+                        if execution_options:
+                            await session.connection(
+                                execution_options=execution_options
+                            )
+                        result = await func(*args, **kwargs)
+                        await session.commit()
+                        return result
+                    except SQLAlchemyError as e:
+                        await session.rollback()
+                        code = sqlstate(e)
+                        if code not in retry_on:
+                            log.warning(
+                                f"Transaction rolled back due to SQLAlchemyError: {e}"
+                            )
+                            raise HTTPException(
+                                status_code=500, detail="Database transaction failed."
+                            )
+                        if attempt == retries:
+                            log.warning(
+                                "Transaction failed with SQLSTATE %s after %s attempts.",
+                                code,
+                                attempt + 1,
+                            )
+                            raise HTTPException(
+                                status_code=503,
+                                detail="Database is busy, please retry.",
+                                headers={"Retry-After": "1"},
+                            )
+                        delay = random.uniform(
+                            0, min(max_backoff, backoff * 2**attempt)
+                        )
+                        log.info(
+                            "Retrying transaction after SQLSTATE %s in %.3fs (attempt %s).",
+                            code,
+                            delay,
+                            attempt + 1,
+                        )
+                        await asyncio.sleep(delay)
+                    except HTTPException:
+                        # 401, 409, 429 and the like: the request's outcome,
+                        # not a server fault, so nothing to log here.
+                        await session.rollback()
+                        raise
+                    except Exception as e:
+                        await session.rollback()
+                        log.exception(f"Unexpected error during transaction: {e}")
+                        raise
             finally:
-                engine.reset_context()
+                session.info.pop(_ACTIVE, None)
+                # Return the connection now rather than when the request ends.
+                await engine.close_session()
 
         return wrapper
 
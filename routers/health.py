@@ -0,0 +1,22 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+
+def create_health_router(ready: asyncio.Event) -> APIRouter:
+    """``/live`` answers while the process runs; ``/ready`` only once
+    startup (including warmup) has finished and until shutdown begins."""
+    router = APIRouter(tags=["health"])
+
+    @router.get("/live")
+    async def live() -> dict:
+        return {"status": "ok"}
+
+    @router.get("/ready")
+    async def readiness() -> JSONResponse:
+        if ready.is_set():
+            return JSONResponse({"status": "ready"})
+        return JSONResponse({"status": "starting"}, status_code=503)
+
+    return router
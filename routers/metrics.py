@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from metrics import MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def create_metrics_router(registry: MetricsRegistry) -> APIRouter:
+    router = APIRouter(tags=["metrics"])
+
+    @router.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Return process metrics in the Prometheus text format."""
+        return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+    return router
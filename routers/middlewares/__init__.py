@@ -1,3 +1,4 @@
 from .logging import LoggingMiddleware
+from .session import SessionMiddleware
 
-__all__ = ("LoggingMiddleware",)
+__all__ = ("LoggingMiddleware", "SessionMiddleware")
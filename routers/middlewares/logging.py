@@ -1,39 +1,133 @@
 import logging
+import random
 import time
 import uuid
+from typing import Callable
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import MetricsRegistry
 
 log = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+def _route_label(scope: Scope) -> str:
+    # The route template, not the raw path, keeps label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class LoggingMiddleware:
+    """Logs one structured record per request and records route metrics.
+
+    Successful requests are sampled with ``sample_rate``; client and server
+    errors, and requests slower than ``slow_ms``, are always logged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: MetricsRegistry | None = None,
+        sample_rate: float = 1.0,
+        slow_ms: float | None = None,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self.app = app
+        self._sample_rate = sample_rate
+        self._slow_ms = slow_ms
+        self._sampler = sampler
+        self._requests = self._duration = None
+        if metrics is not None:
+            self._requests = metrics.counter(
+                "http_requests_total",
+                "HTTP requests by route and status.",
+                ("method", "route", "status"),
+            )
+            self._duration = metrics.histogram(
+                "http_request_duration_seconds",
+                "HTTP request latency by route.",
+                ("method", "route"),
+            )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return None
+
         request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
         start_time = time.perf_counter()
+        status_code = 500
+        size = 0
 
-        request.state.request_id = request_id
-
-        log.info(
-            f"request_id={request_id}, method={request.method}, path={request.url.path}"
-        )
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode()),
+                ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
 
         try:
-            response: Response = await call_next(request)
-        except Exception as exc:
-            log.exception(f"request_id={request_id}, error={exc}")
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self._finish(scope, request_id, 500, size, start_time, exc_info=True)
             raise
 
-        duration = (time.perf_counter() - start_time) * 1000  # ms
-        size = response.headers.get("content-length") or "unknown"
+        self._finish(scope, request_id, status_code, size, start_time)
+        return None
+
+    def _finish(
+        self,
+        scope: Scope,
+        request_id: str,
+        status_code: int,
+        size: int,
+        start_time: float,
+        exc_info: bool = False,
+    ) -> None:
+        seconds = time.perf_counter() - start_time
+        method = scope["method"]
+        route = _route_label(scope)
+
+        if self._requests is not None:
+            self._requests.labels(method, route, status_code).inc()
+            self._duration.labels(method, route).observe(seconds)
 
-        response.headers["X-Request-ID"] = request_id
+        duration_ms = seconds * 1000
+        if not self._should_log(status_code, duration_ms):
+            return None
 
-        log.info(
-            f"request_id={request_id}, method={request.method}, path={request.url.path}, "
-            f"status_code={response.status_code}, size={size}, duration_ms={duration:.2f}"
+        log.log(
+            logging.ERROR if exc_info else logging.INFO,
+            "request_id=%s, method=%s, path=%s, status_code=%s, size=%s, "
+            "duration_ms=%.2f",
+            request_id,
+            method,
+            scope["path"],
+            status_code,
+            size,
+            duration_ms,
+            exc_info=exc_info,
+            extra={
+                "request_id": request_id,
+                "method": method,
+                "path": scope["path"],
+                "route": route,
+                "status_code": status_code,
+                "size": size,
+                "duration_ms": round(duration_ms, 2),
+            },
         )
+        return None
 
-        return response
+    def _should_log(self, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 400 or self._sample_rate >= 1.0:
+            return True
+        if self._slow_ms is not None and duration_ms >= self._slow_ms:
+            return True
+        return self._sampler() < self._sample_rate
@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from engines import PostgresEngine
+
+
+class SessionMiddleware:
+    """Gives every HTTP request its own session scope and closes whatever
+    session it opened once the response is sent, including on errors and
+    client disconnects.
+
+    Pure ASGI on purpose: the endpoint runs in the same task and context.
+    """
+
+    def __init__(self, app: ASGIApp, engine: PostgresEngine) -> None:
+        self.app = app
+        self.engine = engine
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return None
+
+        async with self.engine.request_scope():
+            await self.app(scope, receive, send)
+        return None
@@ -4,6 +4,7 @@ import pytest
 from fastapi import FastAPI, HTTPException
 from httpx import AsyncClient
 
+from metrics import MetricsRegistry
 from routers.middlewares import LoggingMiddleware
 
 
@@ -51,3 +52,71 @@ async def test_logging_middleware_error(app, caplog):
     logs = [rec.message for rec in caplog.records]
     assert any("status_code=400" in line for line in logs)
     assert any("request_id=" in line for line in logs)
+
+
+@pytest.mark.asyncio
+async def test_logging_middleware_records_route_metrics():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware, metrics=registry)
+
+    @app.get("/items/{item_id}")
+    async def item_route(item_id: int):
+        return {"item_id": item_id}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.get("/items/1")
+        await ac.get("/items/2")
+        await ac.get("/missing")
+
+    text = registry.render()
+    assert (
+        'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2.0'
+        in text
+    )
+    assert (
+        'http_requests_total{method="GET",route="unmatched",status="404"} 1.0' in text
+    )
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 2.0'
+        in text
+    )
+
+
+@pytest.mark.asyncio
+async def test_logging_middleware_samples_successful_requests(caplog):
+    caplog.set_level(logging.INFO)
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware, sample_rate=0.1, sampler=lambda: 0.5)
+
+    @app.get("/ok")
+    async def ok_route():
+        return {"message": "ok"}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        ok = await ac.get("/ok")
+        await ac.get("/missing")
+
+    assert "X-Request-ID" in ok.headers
+    (record,) = [r for r in caplog.records if r.name == "routers.middlewares.logging"]
+    assert record.status_code == 404
+    assert record.route == "unmatched"
+
+
+@pytest.mark.asyncio
+async def test_logging_middleware_logs_unhandled_errors(caplog):
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/boom")
+    async def boom_route():
+        raise RuntimeError("boom")
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        with pytest.raises(RuntimeError):
+            await ac.get("/boom")
+
+    (record,) = [r for r in caplog.records if r.name == "routers.middlewares.logging"]
+    assert record.levelno == logging.ERROR
+    assert record.status_code == 500
+    assert record.exc_info is not None
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from engines import PostgresEngine
+from routers.middlewares import SessionMiddleware
+
+
+@pytest.fixture
+async def engine():
+    engine = PostgresEngine()
+    await engine.connect(dsn="sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.disconnect()
+
+
+@pytest.fixture
+def app(engine):
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, engine=engine)
+    app.state.sessions = []
+
+    async def query():
+        session = await engine.get_session()
+        await session.execute(text("SELECT 1"))
+        app.state.sessions.append(session)
+
+    @app.get("/ok")
+    async def ok_route():
+        await query()
+        return {"message": "ok"}
+
+    @app.get("/error")
+    async def error_route():
+        await query()
+        raise HTTPException(status_code=400, detail="bad request")
+
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, status", [("/ok", 200), ("/error", 400)])
+async def test_session_is_closed_after_request(app, path, status):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get(path)
+
+    assert response.status_code == status
+    (session,) = app.state.sessions
+    assert not session.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_requests_do_not_share_sessions(app):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        await ac.get("/ok")
+        await ac.get("/ok")
+
+    first, second = app.state.sessions
+    assert first is not second
@@ -1,17 +1,22 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi import FastAPI, HTTPException, status
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
 from routers.auth import create_auth_router
-from schemas import LoginResponse
+from routers.decorators import AdmissionLimiter
+from schemas import LoginResponse, VerifyBatchResponse, VerifyResponse
 
 
 @pytest.fixture
 def mock_auth_service():
     """Mocked AuthService."""
     service = AsyncMock()
+    service.check_login_throttle = MagicMock(return_value=None)
+    service.apply_token_version = MagicMock(return_value=None)
     return service
 
 
@@ -24,12 +29,13 @@ def mock_postgres_engine():
     mock_session = AsyncMock()
     mock_session.commit = AsyncMock()
     mock_session.rollback = AsyncMock()
+    mock_session.info = {}
 
-    async def get_session():
+    async def get_session(readonly=True):
         return mock_session
 
     engine.get_session = get_session
-    engine.reset_context = MagicMock()
+    engine.close_session = AsyncMock()
 
     return engine
 
@@ -89,12 +95,13 @@ def test_login_success(client, mock_auth_service):
     assert response.status_code == 200
     assert response.json() == {"token": "fake_jwt_token"}
     mock_auth_service.login.assert_awaited_once()
+    assert mock_auth_service.login.await_args.kwargs["client_address"] == "testclient"
 
 
 def test_login_failure(client, mock_auth_service):
     """❌ Should return 401 if AuthService.login raises HTTPException."""
 
-    async def fail_login(req):
+    async def fail_login(req, client_address=None):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     mock_auth_service.login.side_effect = fail_login
@@ -105,3 +112,220 @@ def test_login_failure(client, mock_auth_service):
     assert response.status_code == 401
     assert "invalid" in response.json()["detail"].lower()
     mock_auth_service.login.assert_awaited_once()
+
+
+def test_login_is_not_retried_on_serialization_failure(client, mock_auth_service):
+    """❌ Should answer 503 after one attempt instead of rerunning the login."""
+
+    class SerializationFailure(Exception):
+        sqlstate = "40001"
+
+    mock_auth_service.login.side_effect = DBAPIError(
+        "INSERT INTO sessions ...", {}, SerializationFailure()
+    )
+
+    payload = {"username": "alice", "password": "StrongPass1!"}
+    response = client.post("/auth/login", json=payload)
+
+    assert response.status_code == 503
+    mock_auth_service.check_login_throttle.assert_called_once()
+    mock_auth_service.login.assert_awaited_once()
+
+
+def test_login_rejects_overlong_username(client, mock_auth_service):
+    """❌ Should return 422 before throttling or login for oversized usernames."""
+    payload = {"username": "a" * 51, "password": "StrongPass1!"}
+    response = client.post("/auth/login", json=payload)
+
+    assert response.status_code == 422
+    mock_auth_service.check_login_throttle.assert_not_called()
+    mock_auth_service.login.assert_not_awaited()
+
+
+def test_login_rejected_by_admission(mock_auth_service, mock_postgres_engine):
+    """❌ Should return 503 with Retry-After when login admission is saturated."""
+    limiter = AdmissionLimiter(name="login", max_in_flight=1, max_queue=0)
+    app = FastAPI()
+    app.include_router(
+        create_auth_router(
+            mock_auth_service, mock_postgres_engine, login_admission=limiter
+        )
+    )
+    limiter.in_flight = 1
+    limiter._slots = asyncio.Semaphore(0)
+
+    payload = {"username": "alice", "password": "StrongPass1!"}
+    response = TestClient(app).post("/auth/login", json=payload)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    mock_auth_service.login.assert_not_awaited()
+
+
+def test_login_throttled_before_admission(mock_auth_service, mock_postgres_engine):
+    """❌ Should answer 429 without waiting for a saturated login admission."""
+    limiter = AdmissionLimiter(name="login", max_in_flight=1, max_queue=0)
+    app = FastAPI()
+    app.include_router(
+        create_auth_router(
+            mock_auth_service, mock_postgres_engine, login_admission=limiter
+        )
+    )
+    limiter.in_flight = 1
+    limiter._slots = asyncio.Semaphore(0)
+    mock_auth_service.check_login_throttle.side_effect = HTTPException(
+        status_code=429,
+        detail="Too many login attempts.",
+        headers={"Retry-After": "30"},
+    )
+
+    payload = {"username": "alice", "password": "StrongPass1!"}
+    response = TestClient(app).post("/auth/login", json=payload)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert limiter.rejected == 0
+    mock_auth_service.check_login_throttle.assert_called_once_with(
+        "alice", "testclient"
+    )
+    mock_auth_service.login.assert_not_awaited()
+
+
+def test_verify_returns_claims(client, mock_auth_service):
+    """✅ Should return the introspection result from AuthService.verify."""
+    mock_auth_service.verify.return_value = VerifyResponse(
+        active=True, sub="uuid-123", exp=1735689600
+    )
+
+    response = client.post("/auth/verify", json={"token": "fake_jwt_token"})
+
+    assert response.status_code == 200
+    assert response.json() == {"active": True, "sub": "uuid-123", "exp": 1735689600}
+    mock_auth_service.verify.assert_awaited_once()
+
+
+def test_verify_batch_returns_results(client, mock_auth_service):
+    """✅ Should return per-token results from AuthService.verify_batch."""
+    mock_auth_service.verify_batch.return_value = VerifyBatchResponse(
+        results=[
+            VerifyResponse(active=True, sub="uuid-123", exp=1735689600),
+            VerifyResponse(active=False),
+        ]
+    )
+
+    response = client.post("/auth/verify/batch", json={"tokens": ["good", "bad"]})
+
+    assert response.status_code == 200
+    assert [r["active"] for r in response.json()["results"]] == [True, False]
+    mock_auth_service.verify_batch.assert_awaited_once()
+
+
+def test_verify_batch_rejects_empty_list(client, mock_auth_service):
+    """❌ Should return 422 for an empty token list."""
+    response = client.post("/auth/verify/batch", json={"tokens": []})
+
+    assert response.status_code == 422
+    mock_auth_service.verify_batch.assert_not_awaited()
+
+
+def test_check_valid_bearer_token(client, mock_auth_service):
+    """✅ Should return 204 with identity headers and no body."""
+    mock_auth_service.introspect = MagicMock(
+        return_value=VerifyResponse(active=True, sub="uuid-123", exp=1735689600)
+    )
+
+    response = client.get(
+        "/auth/check", headers={"Authorization": "Bearer fake_jwt_token"}
+    )
+
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["X-Auth-Subject"] == "uuid-123"
+    assert response.headers["X-Auth-Expires"] == "1735689600"
+    mock_auth_service.introspect.assert_called_once_with("fake_jwt_token")
+
+
+def test_check_invalid_token(client, mock_auth_service):
+    """❌ Should return 401 with WWW-Authenticate for an inactive token."""
+    mock_auth_service.introspect = MagicMock(return_value=VerifyResponse(active=False))
+
+    response = client.get("/auth/check", headers={"Authorization": "Bearer bad"})
+
+    assert response.status_code == 401
+    assert response.content == b""
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_check_missing_header(client, mock_auth_service):
+    """❌ Should return 401 without introspecting when no bearer token is sent."""
+    mock_auth_service.introspect = MagicMock()
+
+    response = client.get("/auth/check", headers={"Authorization": "Basic abc"})
+
+    assert response.status_code == 401
+    mock_auth_service.introspect.assert_not_called()
+
+
+def test_refresh_success(client, mock_auth_service):
+    """✅ Should return a new token pair from AuthService.refresh."""
+    mock_auth_service.refresh.return_value = LoginResponse(
+        token="new_jwt", refresh_token="new_refresh", expires_in=900
+    )
+
+    response = client.post("/auth/refresh", json={"refresh_token": "old_refresh"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "token": "new_jwt",
+        "refresh_token": "new_refresh",
+        "expires_in": 900,
+    }
+    mock_auth_service.refresh.assert_awaited_once()
+
+
+def test_refresh_failure(client, mock_auth_service):
+    """❌ Should return 401 if AuthService.refresh raises HTTPException."""
+
+    async def fail_refresh(req):
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.")
+
+    mock_auth_service.refresh.side_effect = fail_refresh
+
+    response = client.post("/auth/refresh", json={"refresh_token": "used"})
+
+    assert response.status_code == 401
+
+
+def test_revoke_success(client, mock_auth_service):
+    """✅ Should call AuthService.revoke and return 204."""
+    mock_auth_service.revoke.return_value = None
+
+    response = client.post("/auth/revoke", json={"token": "fake_jwt_token"})
+
+    assert response.status_code == 204
+    mock_auth_service.revoke.assert_awaited_once()
+
+
+def test_logout_all_success(client, mock_auth_service):
+    """✅ Should call AuthService.logout_all and return 204."""
+    mock_auth_service.logout_all.return_value = ("uuid-123", 2)
+
+    response = client.post("/auth/logout-all", json={"token": "fake_jwt_token"})
+
+    assert response.status_code == 204
+    mock_auth_service.logout_all.assert_awaited_once()
+    mock_auth_service.apply_token_version.assert_called_once_with("uuid-123", 2)
+
+
+def test_logout_all_failed_commit_keeps_tokens_valid(
+    client, mock_auth_service, mock_postgres_engine
+):
+    """❌ Should not apply the new token version if the commit fails."""
+    mock_auth_service.logout_all.return_value = ("uuid-123", 2)
+    session = asyncio.run(mock_postgres_engine.get_session())
+    session.commit.side_effect = SQLAlchemyError("connection lost")
+
+    response = client.post("/auth/logout-all", json={"token": "fake_jwt_token"})
+
+    assert response.status_code == 500
+    mock_auth_service.apply_token_version.assert_not_called()
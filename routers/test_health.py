@@ -0,0 +1,22 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import create_health_router
+
+
+def test_ready_reports_503_until_startup_finishes():
+    """✅ /live always answers; /ready follows the readiness event."""
+    ready = asyncio.Event()
+    app = FastAPI()
+    app.include_router(create_health_router(ready))
+    client = TestClient(app)
+
+    assert client.get("/live").status_code == 200
+    starting = client.get("/ready")
+    assert starting.status_code == 503
+    assert starting.json() == {"status": "starting"}
+
+    ready.set()
+    assert client.get("/ready").json() == {"status": "ready"}
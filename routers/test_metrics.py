@@ -0,0 +1,19 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import MetricsRegistry
+from routers import create_metrics_router
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    """✅ Should render the registry with the Prometheus content type."""
+    registry = MetricsRegistry()
+    registry.counter("logins_total", "Logins.").inc()
+    app = FastAPI()
+    app.include_router(create_metrics_router(registry))
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "logins_total 1.0" in response.text
@@ -0,0 +1,19 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import create_well_known_router
+from services import KeyRing, SigningKey
+
+
+def test_jwks_returns_public_keys_with_cache_headers():
+    """✅ Should serve the key ring's JWKS with Cache-Control."""
+    jwk = {"kty": "OKP", "crv": "Ed25519", "x": "abc", "kid": "k1", "alg": "EdDSA"}
+    ring = KeyRing([SigningKey("k1", "EdDSA", object(), object(), jwk)])
+    app = FastAPI()
+    app.include_router(create_well_known_router(ring, jwks_max_age=60))
+
+    response = TestClient(app).get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.json() == {"keys": [jwk]}
+    assert response.headers["Cache-Control"] == "public, max-age=60"
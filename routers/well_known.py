@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from services import KeyRing
+
+
+def create_well_known_router(key_ring: KeyRing, jwks_max_age: int = 300) -> APIRouter:
+    router = APIRouter(prefix="/.well-known", tags=["well-known"])
+    headers = {"Cache-Control": f"public, max-age={jwks_max_age}"}
+
+    @router.get("/jwks.json")
+    async def jwks() -> Response:
+        """Return the public signing keys as a JSON Web Key Set."""
+        return Response(
+            content=key_ring.jwks_json, media_type="application/json", headers=headers
+        )
+
+    return router
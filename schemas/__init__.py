@@ -1,7 +1,25 @@
-from .auth import LoginRequest, LoginResponse, RegisterRequest
+from .auth import (
+    LoginRequest,
+    LoginResponse,
+    LogoutAllRequest,
+    RefreshRequest,
+    RegisterRequest,
+    RevokeRequest,
+    VerifyBatchRequest,
+    VerifyBatchResponse,
+    VerifyRequest,
+    VerifyResponse,
+)
 
 __all__ = (
     "RegisterRequest",
     "LoginRequest",
     "LoginResponse",
+    "LogoutAllRequest",
+    "RefreshRequest",
+    "RevokeRequest",
+    "VerifyRequest",
+    "VerifyResponse",
+    "VerifyBatchRequest",
+    "VerifyBatchResponse",
 )
@@ -47,6 +47,7 @@ class RegisterRequest(BaseModel):
 class LoginRequest(BaseModel):
     username: str = Field(
         ...,
+        max_length=50,
         title="Username",
         description="Registered username.",
         examples=["johndoe"],
@@ -66,3 +67,92 @@ class LoginResponse(BaseModel):
         description="JWT token used for authenticated requests.",
         examples=["eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."],
     )
+    refresh_token: str | None = Field(
+        None,
+        title="Refresh Token",
+        description="Single-use token exchanged at /auth/refresh for a new pair.",
+        examples=["q8Jx2Zl6mT0cVw3sR9yKpA4bN7eHfUoD1iLgC5tMzXw"],
+    )
+    expires_in: int | None = Field(
+        None,
+        title="Expires In",
+        description="Access token lifetime in seconds.",
+        examples=[900],
+    )
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(
+        ...,
+        min_length=1,
+        max_length=256,
+        title="Refresh Token",
+        description="Refresh token returned by /auth/login or /auth/refresh.",
+        examples=["q8Jx2Zl6mT0cVw3sR9yKpA4bN7eHfUoD1iLgC5tMzXw"],
+    )
+
+
+class VerifyRequest(BaseModel):
+    token: str = Field(
+        ...,
+        title="JWT Access Token",
+        description="Token to introspect.",
+        examples=["eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."],
+    )
+
+
+class VerifyResponse(BaseModel):
+    active: bool = Field(
+        ...,
+        title="Active",
+        description="Whether the token is valid and not expired.",
+    )
+    sub: str | None = Field(
+        None,
+        title="Subject",
+        description="UUID of the user the token was issued to.",
+        examples=["3f2b8c1e-6d4a-4b7e-9a51-0c2d7e8f9a10"],
+    )
+    exp: int | None = Field(
+        None,
+        title="Expiration",
+        description="Expiration time as a UNIX timestamp.",
+        examples=[1735689600],
+    )
+
+
+class VerifyBatchRequest(BaseModel):
+    tokens: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        title="JWT Access Tokens",
+        description="Tokens to introspect in one call (up to 1000).",
+        examples=[["eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."]],
+    )
+
+
+class VerifyBatchResponse(BaseModel):
+    results: list[VerifyResponse] = Field(
+        ...,
+        title="Results",
+        description="Introspection results in the same order as the request.",
+    )
+
+
+class RevokeRequest(BaseModel):
+    token: str = Field(
+        ...,
+        title="JWT Access Token",
+        description="Token to revoke before it expires.",
+        examples=["eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."],
+    )
+
+
+class LogoutAllRequest(BaseModel):
+    token: str = Field(
+        ...,
+        title="JWT Access Token",
+        description="A valid token of the user whose tokens should all be revoked.",
+        examples=["eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."],
+    )
@@ -1,6 +1,15 @@
 from .auth import AuthService, auth_service
+from .keys import KeyRing, SigningKey
+from .revocation import RevocationList
+from .throttle import LoginThrottle
+from .token_versions import TokenVersionCache
 
 __all__ = (
     "AuthService",
+    "KeyRing",
+    "LoginThrottle",
+    "RevocationList",
+    "SigningKey",
+    "TokenVersionCache",
     "auth_service",
 )
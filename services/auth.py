@@ -1,11 +1,38 @@
+import asyncio
+import hashlib
+import logging
+import math
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 
-import bcrypt
 import jwt
 from fastapi import HTTPException, status
 
-from repositories import UserRepository
-from schemas import LoginRequest, LoginResponse, RegisterRequest
+from caches import MISSING, CacheStats, TTLCache
+from engines import HashingEngine, HashingQueueFullError, PostgresEngine
+from repositories import SessionRepository, UserRepository
+from repositories.models import UserRecord
+from schemas import (
+    LoginRequest,
+    LoginResponse,
+    LogoutAllRequest,
+    RefreshRequest,
+    RegisterRequest,
+    RevokeRequest,
+    VerifyBatchRequest,
+    VerifyBatchResponse,
+    VerifyRequest,
+    VerifyResponse,
+)
+from services.keys import KeyRing
+from services.revocation import RevocationList
+from services.singleflight import SingleFlight
+from services.throttle import LoginThrottle
+from services.token_versions import TokenVersionCache
+
+log = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -15,57 +42,341 @@ class AuthService:
         jwt_secret: str,
         jwt_exp: int = 60,
         jwt_algorithm: str = "HS256",
+        hashing_engine: HashingEngine | None = None,
+        verify_cache_size: int = 10_000,
+        key_ring: KeyRing | None = None,
+        session_repository: SessionRepository | None = None,
+        refresh_exp: int = 60 * 60 * 24 * 30,
+        revocation_list: RevocationList | None = None,
+        token_versions: TokenVersionCache | None = None,
+        login_throttle: LoginThrottle | None = None,
+        postgres_engine: PostgresEngine | None = None,
+        rehash_on_login: bool = True,
     ) -> None:
         self._repository = repository
-        self._jwt_secret = jwt_secret
+        self._hashing_engine = hashing_engine or HashingEngine()
+        self._key_ring = key_ring or KeyRing.from_secret(jwt_secret, jwt_algorithm)
         self._jwt_exp = jwt_exp
-        self._jwt_algorithm = jwt_algorithm
+        self._sessions = session_repository
+        self._refresh_exp = refresh_exp
+        self._revocations = revocation_list
+        self._token_versions = token_versions
+        self._throttle = login_throttle
+        # Rehashing runs after the response in its own session, so it needs
+        # the engine rather than the request's transaction.
+        self._postgres_engine = postgres_engine if rehash_on_login else None
+        self._background: set[asyncio.Task] = set()
+        self._login_flights: SingleFlight[tuple[str, bytes], UserRecord | None] = (
+            SingleFlight()
+        )
+        self._flight_key = secrets.token_bytes(32)
+        # Keyed by token digest; entries expire at the token's own exp claim.
+        self._verified: TTLCache[bytes, dict] = TTLCache(
+            max_size=verify_cache_size, ttl=0, clock=time.time
+        )
 
     async def register(self, req: RegisterRequest) -> None:
-        existing_user = await self._repository.get(username=req.username)
-        if existing_user:
+        password_hash = await self._hash_password(req.password)
+
+        user = await self._repository.create(
+            username=req.username,
+            password_hash=password_hash,
+        )
+
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="User already exists.",
             )
 
-        password_hash = bcrypt.hashpw(req.password.encode(), bcrypt.gensalt()).decode()
+        return None
 
-        user = await self._repository.upsert(
-            username=req.username,
-            password_hash=password_hash,
+    def check_login_throttle(
+        self, username: str, client_address: str | None = None
+    ) -> None:
+        """Take one login attempt from the throttle, or raise 429.
+
+        The route calls this before login admission and the transaction, so
+        throttled attempts never queue for a slot or a connection. login()
+        does not check again.
+        """
+        if self._throttle is None:
+            return None
+        retry_after = self._throttle.check(username, client_address)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        return None
+
+    async def login(
+        self, data: LoginRequest, client_address: str | None = None
+    ) -> LoginResponse:
+        # The attempt was already taken from the throttle by
+        # check_login_throttle; here only its outcome is recorded.
+
+        # Identical concurrent attempts (client retry storms) share one lookup
+        # and one hash check. The key holds a keyed digest, never the password.
+        password_digest = hashlib.blake2b(
+            data.password.encode(), key=self._flight_key, digest_size=16
+        ).digest()
+        user = await self._login_flights.do(
+            (data.username, password_digest),
+            lambda: self._authenticate(data.username, data.password),
         )
+        if not user:
+            if self._throttle is not None:
+                self._throttle.record_failure(data.username, client_address)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid username or password.",
+            )
 
+        if self._throttle is not None:
+            self._throttle.record_success(data.username)
+        return await self._issue_tokens(user.user_uuid, user.token_version)
+
+    async def _authenticate(self, username: str, password: str) -> UserRecord | None:
+        user = await self._repository.get_record(username=username)
         if not user:
+            return None
+
+        if not await self._check_password(password, user.password_hash):
+            return None
+
+        if self._postgres_engine is not None and self._hashing_engine.needs_rehash(
+            user.password_hash
+        ):
+            task = asyncio.create_task(self._rehash(user, password))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+        return user
+
+    async def _rehash(self, user: UserRecord, password: str) -> None:
+        """Move a verified password to the current hashing policy."""
+        try:
+            password_hash = await self._hashing_engine.hash_password(password)
+            async with self._postgres_engine.session_scope():
+                updated = await self._repository.update_password_hash(
+                    user_uuid=user.user_uuid,
+                    old_hash=user.password_hash,
+                    new_hash=password_hash,
+                )
+        except HashingQueueFullError:
+            # Not urgent: the next login tries again.
+            return None
+        except Exception as e:
+            log.warning(f"Failed to rehash password for {user.user_uuid}: {e}")
+            return None
+
+        if updated:
+            log.info("Rehashed password for %s", user.user_uuid)
+        return None
+
+    async def drain(self) -> None:
+        """Wait for background rehashes to finish (called on shutdown)."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        return None
+
+    async def refresh(self, req: RefreshRequest) -> LoginResponse:
+        """Exchange a refresh token for a new token pair without touching bcrypt."""
+        if self._sessions is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to register user.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Refresh tokens are not enabled.",
             )
 
+        refresh_token = secrets.token_urlsafe(32)
+        user_uuid = await self._sessions.rotate(
+            token_hash=self._digest(req.refresh_token),
+            new_token_hash=self._digest(refresh_token),
+            expires_at=self._refresh_expires_at(),
+        )
+        if user_uuid is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token.",
+            )
+
+        return LoginResponse(
+            token=self._encode_access_token(user_uuid, self._token_version(user_uuid)),
+            refresh_token=refresh_token,
+            expires_in=self._jwt_exp,
+        )
+
+    async def verify(self, req: VerifyRequest) -> VerifyResponse:
+        return self.introspect(req.token)
+
+    async def verify_batch(self, req: VerifyBatchRequest) -> VerifyBatchResponse:
+        # Duplicate tokens in one batch are decoded once and share the result.
+        results: dict[str, VerifyResponse] = {}
+        for token in req.tokens:
+            if token not in results:
+                results[token] = self.introspect(token)
+        return VerifyBatchResponse(results=[results[token] for token in req.tokens])
+
+    def verify_cache_stats(self) -> CacheStats:
+        return self._verified.stats()
+
+    def introspect(self, token: str) -> VerifyResponse:
+        claims = self._decode(token)
+        if claims is None or self._is_revoked(claims):
+            return VerifyResponse(active=False)
+        return VerifyResponse(active=True, sub=claims["sub"], exp=claims["exp"])
+
+    async def revoke(self, req: RevokeRequest) -> None:
+        if self._revocations is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Token revocation is not enabled.",
+            )
+
+        # Invalid, expired or jti-less tokens are already unusable: nothing to do.
+        claims = self._decode(req.token)
+        if claims is None or "jti" not in claims:
+            return None
+
+        await self._revocations.revoke(
+            claims["jti"], datetime.fromtimestamp(claims["exp"], timezone.utc)
+        )
         return None
 
-    async def login(self, data: LoginRequest) -> LoginResponse:
-        user = await self._repository.get(username=data.username)
-        if not user:
+    async def logout_all(self, req: LogoutAllRequest) -> tuple[str, int]:
+        """Invalidate every access and refresh token of the token's owner.
+
+        Returns the owner's uuid and new token version. The caller passes
+        them to apply_token_version() once the transaction has committed;
+        applying them earlier would reject valid tokens if the commit failed.
+        """
+        if self._token_versions is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Token versioning is not enabled.",
+            )
+
+        claims = self._decode(req.token)
+        if claims is None or self._is_revoked(claims):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid username or password.",
+                detail="Invalid or expired token.",
             )
 
-        if not bcrypt.checkpw(data.password.encode(), user["password_hash"].encode()):
+        user_uuid = uuid.UUID(claims["sub"])
+        version = await self._repository.bump_token_version(user_uuid=user_uuid)
+        if version is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid username or password.",
+                detail="Invalid or expired token.",
             )
+        if self._sessions is not None:
+            await self._sessions.revoke_all(user_uuid=user_uuid)
 
+        return claims["sub"], version
+
+    def apply_token_version(self, user_uuid: str, version: int) -> None:
+        """Reject this user's older tokens in this process from now on."""
+        if self._token_versions is not None:
+            self._token_versions.set(user_uuid, version)
+        return None
+
+    def _is_revoked(self, claims: dict) -> bool:
+        if self._revocations is not None and self._revocations.is_revoked(
+            claims.get("jti")
+        ):
+            return True
+        return self._token_versions is not None and claims.get(
+            "ver", 0
+        ) < self._token_versions.get(claims["sub"])
+
+    def _token_version(self, user_uuid: uuid.UUID) -> int:
+        if self._token_versions is None:
+            return 0
+        return self._token_versions.get(str(user_uuid))
+
+    def _decode(self, token: str) -> dict | None:
+        digest = hashlib.sha256(token.encode()).digest()
+        claims = self._verified.get(digest)
+        if claims is not MISSING:
+            return claims
+
+        try:
+            key = self._key_ring.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+            claims = jwt.decode(
+                token,
+                key.verifying_key,
+                algorithms=[key.algorithm],
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.InvalidTokenError:
+            return None
+
+        self._verified.set(digest, claims, expires_at=claims["exp"])
+        return claims
+
+    async def _issue_tokens(
+        self, user_uuid: uuid.UUID, token_version: int
+    ) -> LoginResponse:
+        if self._token_versions is not None:
+            # A cached user record may lag behind a bump seen by this process.
+            token_version = max(token_version, self._token_versions.get(str(user_uuid)))
+        token = self._encode_access_token(user_uuid, token_version)
+        if self._sessions is None:
+            return LoginResponse(token=token, expires_in=self._jwt_exp)
+
+        refresh_token = secrets.token_urlsafe(32)
+        await self._sessions.create(
+            user_uuid=user_uuid,
+            token_hash=self._digest(refresh_token),
+            expires_at=self._refresh_expires_at(),
+        )
+        return LoginResponse(
+            token=token, refresh_token=refresh_token, expires_in=self._jwt_exp
+        )
+
+    def _encode_access_token(self, user_uuid: uuid.UUID, token_version: int) -> str:
         payload = {
-            "sub": str(user["user_uuid"]),
-            "exp": datetime.now(timezone.utc) + timedelta(minutes=self._jwt_exp),
+            "sub": str(user_uuid),
+            "exp": datetime.now(timezone.utc) + timedelta(seconds=self._jwt_exp),
+            "jti": uuid.uuid4().hex,
+            "ver": token_version,
         }
+        key = self._key_ring.active
+        return jwt.encode(
+            payload, key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid}
+        )
 
-        token = jwt.encode(payload, self._jwt_secret, algorithm=self._jwt_algorithm)
+    def _refresh_expires_at(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self._refresh_exp)
 
-        return LoginResponse(token=token)
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    async def _hash_password(self, password: str) -> str:
+        try:
+            return await self._hashing_engine.hash_password(password)
+        except HashingQueueFullError:
+            raise self._overloaded()
+
+    async def _check_password(self, password: str, password_hash: str) -> bool:
+        try:
+            return await self._hashing_engine.check_password(password, password_hash)
+        except HashingQueueFullError:
+            raise self._overloaded()
+
+    @staticmethod
+    def _overloaded() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is overloaded, try again later.",
+            headers={"Retry-After": "1"},
+        )
 
 
 auth_service: AuthService | None = None
@@ -0,0 +1,107 @@
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# JWS algorithm for each EC curve (RFC 7518, section 3.4).
+EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    signing_key: Any
+    verifying_key: Any
+    jwk: dict | None = None
+
+
+def _load_pem_key(path: Path) -> SigningKey:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+    from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+    private_key = load_pem_private_key(path.read_bytes(), password=None)
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        algorithm, jwk_algorithm = "EdDSA", OKPAlgorithm
+    elif isinstance(private_key, rsa.RSAPrivateKey):
+        algorithm, jwk_algorithm = "RS256", RSAAlgorithm
+    elif isinstance(private_key, ec.EllipticCurvePrivateKey):
+        curve = private_key.curve.name
+        if curve not in EC_ALGORITHMS:
+            raise ValueError(f"Unsupported EC curve {curve} in {path}.")
+        algorithm, jwk_algorithm = EC_ALGORITHMS[curve], ECAlgorithm
+    else:
+        raise ValueError(f"Unsupported signing key type in {path}.")
+
+    kid = path.stem
+    public_key = private_key.public_key()
+    jwk = jwk_algorithm.to_jwk(public_key, as_dict=True)
+    jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+    return SigningKey(
+        kid=kid,
+        algorithm=algorithm,
+        signing_key=private_key,
+        verifying_key=public_key,
+        jwk=jwk,
+    )
+
+
+class KeyRing:
+    """JWT keys parsed once at startup: the active key signs, every key verifies.
+
+    Keeping the previous key in the ring (and in the JWKS) after switching the
+    active kid lets tokens it signed stay valid until they expire. With more
+    than one key the active kid must be named: adding a key to publish it
+    must not switch signing to it.
+    """
+
+    def __init__(self, keys: list[SigningKey], active_kid: str | None = None) -> None:
+        if not keys:
+            raise ValueError("Key ring requires at least one key.")
+        self._keys = {key.kid: key for key in keys}
+        if active_kid is None:
+            if len(keys) > 1:
+                raise ValueError(
+                    "Key ring with several keys requires an active kid "
+                    "(JWT_ACTIVE_KID)."
+                )
+            active_kid = keys[0].kid
+        if active_kid not in self._keys:
+            raise ValueError(f"Active kid {active_kid!r} is not in the key ring.")
+        self.active = self._keys[active_kid]
+        self.jwks = {"keys": [key.jwk for key in keys if key.jwk is not None]}
+        self.jwks_json = json.dumps(self.jwks, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str = "HS256") -> "KeyRing":
+        key = SigningKey(
+            kid="default",
+            algorithm=algorithm,
+            signing_key=secret,
+            verifying_key=secret,
+        )
+        return cls([key])
+
+    @classmethod
+    def from_pem_files(
+        cls, paths: list[Path], active_kid: str | None = None
+    ) -> "KeyRing":
+        keys = [_load_pem_key(Path(path)) for path in paths]
+        ring = cls(keys, active_kid)
+        log.info(
+            "Loaded %s signing key(s), active kid=%s (%s)",
+            len(keys),
+            ring.active.kid,
+            ring.active.algorithm,
+        )
+        return ring
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        """Return the key for a token's kid; tokens without a kid use the active key."""
+        if kid is None:
+            return self.active
+        return self._keys.get(kid)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from caches import BloomFilter
+from engines import PostgresEngine
+from repositories import RevocationRepository
+
+log = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """In-process view of the revoked-token table.
+
+    A Bloom filter answers the common "not revoked" case without touching the
+    exact set, and refresh() only pulls rows revoked since the previous sync.
+    Rows are re-read from ``overlap`` seconds before the cursor so that
+    transactions committing out of revoked_at order are not missed.
+    """
+
+    def __init__(
+        self,
+        repository: RevocationRepository,
+        engine: PostgresEngine,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        overlap: float = 5.0,
+        prune_interval: float = 3600.0,
+    ) -> None:
+        self._repository = repository
+        self._engine = engine
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._overlap = timedelta(seconds=overlap)
+        self._prune_interval = prune_interval
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: dict[str, float] = {}
+        self._cursor: datetime | None = None
+        self._pruned_at = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if jti is None or jti not in self._bloom:
+            return False
+        return jti in self._revoked
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if jti in self._revoked:
+            return None
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild()
+        return None
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        await self._repository.add(jti=jti, expires_at=expires_at)
+        self.add(jti, expires_at.timestamp())
+        return None
+
+    async def refresh(self) -> int:
+        revoked_after = self._cursor - self._overlap if self._cursor else None
+        async with self._engine.session_scope():
+            rows = await self._repository.list_since(revoked_after=revoked_after)
+
+        added = 0
+        for jti, expires_at, revoked_at in rows:
+            if jti not in self._revoked:
+                self.add(jti, expires_at.timestamp())
+                added += 1
+            if self._cursor is None or revoked_at > self._cursor:
+                self._cursor = revoked_at
+
+        if time.monotonic() - self._pruned_at >= self._prune_interval:
+            self._rebuild()
+        return added
+
+    def _rebuild(self) -> None:
+        """Drop expired entries and resize the filter to the live set."""
+        now = time.time()
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+        self._bloom = BloomFilter(
+            max(self._capacity, 2 * len(self._revoked)), self._error_rate
+        )
+        for jti in self._revoked:
+            self._bloom.add(jti)
+        self._pruned_at = time.monotonic()
+
+    async def start(self, interval: float) -> None:
+        await self.refresh()
+        log.info("Revocation list loaded: %s revoked token(s)", len(self._revoked))
+        self._task = asyncio.create_task(self._refresh_forever(interval))
+        return None
+
+    async def stop(self) -> None:
+        if self._task is None:
+            log.warning("stop() called but revocation list was not started.")
+            return None
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        return None
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                log.warning(f"Failed to refresh revocation list: {e}")
+
+    def __len__(self) -> int:
+        return len(self._revoked)
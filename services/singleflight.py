@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+R = TypeVar("R")
+
+
+class SingleFlight(Generic[K, R]):
+    """Coalesces concurrent calls with the same key onto one in-flight call.
+
+    The first caller runs ``func``; callers arriving while it is running await
+    the same result (or exception) instead of repeating the work. Nothing is
+    kept once the call finishes.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Future[R]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: K, func: Callable[[], Awaitable[R]]) -> R:
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # The leader was cancelled, not us: run the call ourselves.
+            return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark as retrieved: followers are optional.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,17 +1,44 @@
-from unittest.mock import AsyncMock, patch
+import asyncio
+import hashlib
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import jwt
 import pytest
 from fastapi import HTTPException
 
-from schemas import LoginRequest, LoginResponse, RegisterRequest
+from engines import (
+    HashingEngine,
+    HashingQueueFullError,
+    PasswordHashers,
+    PostgresEngine,
+    ScryptHasher,
+)
+from repositories.models import UserRecord
+from schemas import (
+    LoginRequest,
+    LoginResponse,
+    LogoutAllRequest,
+    RefreshRequest,
+    RegisterRequest,
+    RevokeRequest,
+    VerifyBatchRequest,
+    VerifyBatchResponse,
+    VerifyRequest,
+    VerifyResponse,
+)
+from services import LoginThrottle, RevocationList, TokenVersionCache
 from services.auth import AuthService
 
+# Shape of a cost-12 bcrypt hash; bcrypt itself is patched where it matters.
+BCRYPT_HASH = "$2b$12$" + "a" * 53
+
 
 @pytest.mark.asyncio
 async def test_register_success(monkeypatch):
     mock_repo = AsyncMock()
-    mock_repo.get.return_value = None
-    mock_repo.upsert.return_value = {"user_uuid": "123", "username": "alice"}
+    mock_repo.create.return_value = {"user_uuid": "123", "username": "alice"}
 
     auth_service = AuthService(mock_repo, jwt_secret="secret")
 
@@ -22,8 +49,8 @@ async def test_register_success(monkeypatch):
         result = await auth_service.register(req)
 
     assert result is None
-    mock_repo.get.assert_awaited_once_with(username="alice")
-    mock_repo.upsert.assert_awaited_once_with(
+    mock_repo.get.assert_not_awaited()
+    mock_repo.create.assert_awaited_once_with(
         username="alice", password_hash="hashed_pw"
     )
 
@@ -31,46 +58,27 @@ async def test_register_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_register_user_already_exists():
     mock_repo = AsyncMock()
-    mock_repo.get.return_value = {"user_uuid": "1", "username": "bob"}
+    mock_repo.create.return_value = None
 
     auth_service = AuthService(mock_repo, jwt_secret="secret")
 
     req = RegisterRequest(username="bob", password="StrongPass1!")
 
-    with pytest.raises(HTTPException) as exc:
-        await auth_service.register(req)
-
-    assert exc.value.status_code == 409
-    assert "exists" in exc.value.detail.lower()
-
-
-@pytest.mark.asyncio
-async def test_register_upsert_failed():
-    mock_repo = AsyncMock()
-    mock_repo.get.return_value = None
-    mock_repo.upsert.return_value = None
-
-    auth_service = AuthService(mock_repo, jwt_secret="secret")
-
-    req = RegisterRequest(username="charlie", password="ValidPass9!")
-
     with pytest.raises(HTTPException) as exc:
         with patch("bcrypt.hashpw", return_value=b"hashed_pw"):
             await auth_service.register(req)
 
-    assert exc.value.status_code == 500
-    assert "failed" in exc.value.detail.lower()
+    assert exc.value.status_code == 409
+    assert "exists" in exc.value.detail.lower()
+    mock_repo.upsert.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_login_success(monkeypatch):
     mock_repo = AsyncMock()
-    user_data = {
-        "user_uuid": "uuid-123",
-        "username": "alice",
-        "password_hash": "hashed_pw",
-    }
-    mock_repo.get.return_value = user_data
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
 
     auth_service = AuthService(mock_repo, jwt_secret="secret")
 
@@ -89,7 +97,7 @@ async def test_login_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_login_invalid_username():
     mock_repo = AsyncMock()
-    mock_repo.get.return_value = None
+    mock_repo.get_record.return_value = None
 
     auth_service = AuthService(mock_repo, jwt_secret="secret")
 
@@ -105,12 +113,9 @@ async def test_login_invalid_username():
 @pytest.mark.asyncio
 async def test_login_invalid_password(monkeypatch):
     mock_repo = AsyncMock()
-    user_data = {
-        "user_uuid": "uuid-123",
-        "username": "alice",
-        "password_hash": "hashed_pw",
-    }
-    mock_repo.get.return_value = user_data
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
 
     auth_service = AuthService(mock_repo, jwt_secret="secret")
 
@@ -122,3 +127,399 @@ async def test_login_invalid_password(monkeypatch):
 
     assert exc.value.status_code == 401
     assert "invalid" in exc.value.detail.lower()
+
+
+@pytest.mark.asyncio
+async def test_login_hashing_queue_full():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    hashing_engine = MagicMock(spec=HashingEngine)
+    hashing_engine.check_password = AsyncMock(side_effect=HashingQueueFullError())
+
+    auth_service = AuthService(
+        mock_repo, jwt_secret="secret", hashing_engine=hashing_engine
+    )
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.login(req)
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+    hashing_engine.check_password.assert_awaited_once_with("StrongPass1!", BCRYPT_HASH)
+
+
+def make_token(sub="uuid-123", exp_delta=3600, secret="secret"):
+    payload = {"sub": sub, "exp": int(time.time()) + exp_delta}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_verify_valid_token():
+    auth_service = AuthService(AsyncMock(), jwt_secret="secret")
+    token = make_token()
+
+    result = await auth_service.verify(VerifyRequest(token=token))
+
+    assert isinstance(result, VerifyResponse)
+    assert result.active is True
+    assert result.sub == "uuid-123"
+
+
+@pytest.mark.asyncio
+async def test_verify_uses_cache_for_repeated_tokens():
+    auth_service = AuthService(AsyncMock(), jwt_secret="secret")
+    token = make_token()
+
+    with patch("jwt.decode", wraps=jwt.decode) as decode:
+        await auth_service.verify(VerifyRequest(token=token))
+        await auth_service.verify(VerifyRequest(token=token))
+
+    decode.assert_called_once()
+    assert auth_service.verify_cache_stats().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_verify_expired_token():
+    auth_service = AuthService(AsyncMock(), jwt_secret="secret")
+    token = make_token(exp_delta=-10)
+
+    result = await auth_service.verify(VerifyRequest(token=token))
+
+    assert result.active is False
+    assert result.sub is None
+
+
+@pytest.mark.asyncio
+async def test_verify_wrong_signature():
+    auth_service = AuthService(AsyncMock(), jwt_secret="secret")
+    token = make_token(secret="other_secret")
+
+    result = await auth_service.verify(VerifyRequest(token=token))
+
+    assert result.active is False
+    assert auth_service.verify_cache_stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_verify_batch_preserves_order_and_dedupes():
+    auth_service = AuthService(AsyncMock(), jwt_secret="secret")
+    alice = make_token(sub="alice")
+    bob = make_token(sub="bob")
+
+    req = VerifyBatchRequest(tokens=[alice, "garbage", bob, alice])
+    with patch("jwt.decode", wraps=jwt.decode) as decode:
+        result = await auth_service.verify_batch(req)
+
+    assert isinstance(result, VerifyBatchResponse)
+    assert [r.active for r in result.results] == [True, False, True, True]
+    assert [r.sub for r in result.results] == ["alice", None, "bob", "alice"]
+    assert decode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_login_creates_refresh_session():
+    mock_repo = AsyncMock()
+    user_id = uuid.uuid4()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid=user_id, username="alice", password_hash=BCRYPT_HASH
+    )
+    mock_sessions = AsyncMock()
+
+    auth_service = AuthService(
+        mock_repo, jwt_secret="secret", jwt_exp=900, session_repository=mock_sessions
+    )
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+    with patch("bcrypt.checkpw", return_value=True):
+        result = await auth_service.login(req)
+
+    assert result.refresh_token
+    assert result.expires_in == 900
+    kwargs = mock_sessions.create.await_args.kwargs
+    assert kwargs["user_uuid"] == user_id
+    assert (
+        kwargs["token_hash"]
+        == hashlib.sha256(result.refresh_token.encode()).hexdigest()
+    )
+
+    claims = jwt.decode(result.token, "secret", algorithms=["HS256"])
+    assert 890 <= claims["exp"] - time.time() <= 900
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_session():
+    mock_repo = AsyncMock()
+    user_id = uuid.uuid4()
+    mock_sessions = AsyncMock()
+    mock_sessions.rotate.return_value = user_id
+
+    auth_service = AuthService(
+        mock_repo, jwt_secret="secret", session_repository=mock_sessions
+    )
+
+    with patch("bcrypt.checkpw") as checkpw:
+        result = await auth_service.refresh(RefreshRequest(refresh_token="old"))
+
+    checkpw.assert_not_called()
+    mock_repo.get_record.assert_not_awaited()
+    kwargs = mock_sessions.rotate.await_args.kwargs
+    assert kwargs["token_hash"] == hashlib.sha256(b"old").hexdigest()
+    assert (
+        kwargs["new_token_hash"]
+        == hashlib.sha256(result.refresh_token.encode()).hexdigest()
+    )
+    assert jwt.decode(result.token, "secret", algorithms=["HS256"])["sub"] == str(
+        user_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_invalid_token():
+    mock_sessions = AsyncMock()
+    mock_sessions.rotate.return_value = None
+
+    auth_service = AuthService(
+        AsyncMock(), jwt_secret="secret", session_repository=mock_sessions
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.refresh(RefreshRequest(refresh_token="used"))
+
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_inactive():
+    revocations = RevocationList(
+        AsyncMock(), MagicMock(spec=PostgresEngine), capacity=100
+    )
+    auth_service = AuthService(
+        AsyncMock(), jwt_secret="secret", revocation_list=revocations
+    )
+    token = jwt.encode(
+        {"sub": "uuid-123", "exp": int(time.time()) + 3600, "jti": "abc"},
+        "secret",
+        algorithm="HS256",
+    )
+
+    assert (await auth_service.verify(VerifyRequest(token=token))).active is True
+
+    await auth_service.revoke(RevokeRequest(token=token))
+
+    assert (await auth_service.verify(VerifyRequest(token=token))).active is False
+
+
+@pytest.mark.asyncio
+async def test_revoke_ignores_invalid_token():
+    revocations = MagicMock(spec=RevocationList)
+    auth_service = AuthService(
+        AsyncMock(), jwt_secret="secret", revocation_list=revocations
+    )
+
+    await auth_service.revoke(RevokeRequest(token="garbage"))
+
+    revocations.revoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_token_has_jti():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    auth_service = AuthService(mock_repo, jwt_secret="secret")
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+    with patch("bcrypt.checkpw", return_value=True):
+        first = await auth_service.login(req)
+        second = await auth_service.login(req)
+
+    first_jti = jwt.decode(first.token, "secret", algorithms=["HS256"])["jti"]
+    second_jti = jwt.decode(second.token, "secret", algorithms=["HS256"])["jti"]
+    assert first_jti != second_jti
+
+
+@pytest.mark.asyncio
+async def test_logout_all_invalidates_existing_tokens():
+    mock_repo = AsyncMock()
+    user_id = uuid.uuid4()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid=user_id, username="alice", password_hash=BCRYPT_HASH
+    )
+    mock_repo.bump_token_version.return_value = 1
+    mock_sessions = AsyncMock()
+    versions = TokenVersionCache(mock_repo, MagicMock(spec=PostgresEngine), max_age=900)
+    auth_service = AuthService(
+        mock_repo,
+        jwt_secret="secret",
+        session_repository=mock_sessions,
+        token_versions=versions,
+    )
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+    with patch("bcrypt.checkpw", return_value=True):
+        old = await auth_service.login(req)
+
+    bump = await auth_service.logout_all(LogoutAllRequest(token=old.token))
+
+    assert bump == (str(user_id), 1)
+    mock_repo.bump_token_version.assert_awaited_once_with(user_uuid=user_id)
+    mock_sessions.revoke_all.assert_awaited_once_with(user_uuid=user_id)
+    # Nothing changes locally until the caller applies the committed bump.
+    assert (await auth_service.verify(VerifyRequest(token=old.token))).active is True
+
+    auth_service.apply_token_version(*bump)
+    assert (await auth_service.verify(VerifyRequest(token=old.token))).active is False
+
+    with patch("bcrypt.checkpw", return_value=True):
+        new = await auth_service.login(req)
+
+    assert jwt.decode(new.token, "secret", algorithms=["HS256"])["ver"] == 1
+    assert (await auth_service.verify(VerifyRequest(token=new.token))).active is True
+
+
+@pytest.mark.asyncio
+async def test_logout_all_rejects_invalid_token():
+    mock_repo = AsyncMock()
+    versions = TokenVersionCache(mock_repo, MagicMock(spec=PostgresEngine), max_age=900)
+    auth_service = AuthService(mock_repo, jwt_secret="secret", token_versions=versions)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.logout_all(LogoutAllRequest(token="garbage"))
+
+    assert exc.value.status_code == 401
+    mock_repo.bump_token_version.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_logins_are_coalesced():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    hashing_engine = MagicMock(spec=HashingEngine)
+    release = asyncio.Event()
+
+    async def slow_check(password, password_hash):
+        await release.wait()
+        return True
+
+    hashing_engine.check_password = AsyncMock(side_effect=slow_check)
+    auth_service = AuthService(
+        mock_repo, jwt_secret="secret", hashing_engine=hashing_engine
+    )
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+    other = LoginRequest(username="alice", password="OtherPass1!")
+    tasks = [asyncio.create_task(auth_service.login(req)) for _ in range(5)]
+    tasks.append(asyncio.create_task(auth_service.login(other)))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks)
+
+    assert len({r.token for r in results}) == 6
+    assert mock_repo.get_record.await_count == 2
+    assert hashing_engine.check_password.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_login_throttled_before_lookup_and_hash():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    throttle = LoginThrottle(username_burst=100, lockout_threshold=2)
+    auth_service = AuthService(mock_repo, jwt_secret="secret", login_throttle=throttle)
+
+    req = LoginRequest(username="alice", password="WrongPass1!")
+
+    async def attempt():
+        auth_service.check_login_throttle(req.username, "10.0.0.1")
+        return await auth_service.login(req, client_address="10.0.0.1")
+
+    with patch("bcrypt.checkpw", return_value=False) as checkpw:
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc:
+                await attempt()
+            assert exc.value.status_code == 401
+
+        with pytest.raises(HTTPException) as exc:
+            await attempt()
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+    assert mock_repo.get_record.await_count == 2
+    assert checkpw.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_login_success_resets_throttle_failures():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    throttle = LoginThrottle(username_burst=100, lockout_threshold=2)
+    auth_service = AuthService(mock_repo, jwt_secret="secret", login_throttle=throttle)
+
+    req = LoginRequest(username="alice", password="StrongPass1!")
+
+    with patch("bcrypt.checkpw", side_effect=[False, True, False]):
+        with pytest.raises(HTTPException):
+            await auth_service.login(req)
+        await auth_service.login(req)
+        with pytest.raises(HTTPException) as exc:
+            await auth_service.login(req)
+
+    # The failure count restarted after the successful login.
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash_in_background():
+    old_hash = "$2b$04$" + "a" * 53
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=old_hash
+    )
+    mock_repo.update_password_hash.return_value = True
+    engine = MagicMock(spec=PostgresEngine)
+    hashing_engine = HashingEngine(hashers=PasswordHashers(ScryptHasher(log_n=4)))
+    auth_service = AuthService(
+        mock_repo,
+        jwt_secret="secret",
+        hashing_engine=hashing_engine,
+        postgres_engine=engine,
+    )
+
+    with patch("bcrypt.checkpw", return_value=True):
+        await auth_service.login(LoginRequest(username="alice", password="Pass1!ab"))
+    await auth_service.drain()
+
+    kwargs = mock_repo.update_password_hash.await_args.kwargs
+    assert kwargs["user_uuid"] == "uuid-123"
+    assert kwargs["old_hash"] == old_hash
+    assert kwargs["new_hash"].startswith("$scrypt$ln=4,")
+    assert await hashing_engine.check_password("Pass1!ab", kwargs["new_hash"])
+    await hashing_engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_login_does_not_rehash_current_hash():
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    auth_service = AuthService(
+        mock_repo, jwt_secret="secret", postgres_engine=MagicMock(spec=PostgresEngine)
+    )
+
+    with patch("bcrypt.checkpw", return_value=True):
+        await auth_service.login(LoginRequest(username="alice", password="Pass1!ab"))
+    await auth_service.drain()
+
+    mock_repo.update_password_hash.assert_not_awaited()
@@ -0,0 +1,154 @@
+from unittest.mock import AsyncMock
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from repositories.models import UserRecord
+from schemas import LoginRequest, VerifyRequest
+from services import AuthService, KeyRing
+
+# Shape of a cost-12 bcrypt hash; bcrypt itself is patched where it matters.
+BCRYPT_HASH = "$2b$12$" + "a" * 53
+
+
+def write_pem(path, private_key):
+    path.write_bytes(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def ed25519_pem(tmp_path):
+    return write_pem(tmp_path / "ed-1.pem", ed25519.Ed25519PrivateKey.generate())
+
+
+@pytest.fixture
+def rsa_pem(tmp_path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return write_pem(tmp_path / "rsa-1.pem", key)
+
+
+def test_from_secret_has_no_public_keys():
+    ring = KeyRing.from_secret("secret")
+
+    assert ring.active.algorithm == "HS256"
+    assert ring.get(None) is ring.active
+    assert ring.jwks == {"keys": []}
+
+
+def test_from_pem_files_detects_algorithms(ed25519_pem, rsa_pem):
+    ring = KeyRing.from_pem_files([ed25519_pem, rsa_pem], active_kid="rsa-1")
+
+    assert ring.active.kid == "rsa-1"
+    assert ring.get("ed-1").algorithm == "EdDSA"
+    assert ring.get("rsa-1").algorithm == "RS256"
+    assert ring.get("unknown") is None
+    assert [(k["kid"], k["alg"]) for k in ring.jwks["keys"]] == [
+        ("ed-1", "EdDSA"),
+        ("rsa-1", "RS256"),
+    ]
+    assert all("d" not in k for k in ring.jwks["keys"])
+
+
+def test_active_kid_selects_signing_key(ed25519_pem, rsa_pem):
+    ring = KeyRing.from_pem_files([ed25519_pem, rsa_pem], active_kid="ed-1")
+
+    assert ring.active.kid == "ed-1"
+
+
+@pytest.mark.parametrize(
+    "curve, algorithm",
+    [(ec.SECP256R1(), "ES256"), (ec.SECP384R1(), "ES384"), (ec.SECP521R1(), "ES512")],
+)
+def test_ec_algorithm_follows_curve(tmp_path, curve, algorithm):
+    path = write_pem(tmp_path / "ec-1.pem", ec.generate_private_key(curve))
+    ring = KeyRing.from_pem_files([path])
+
+    token = jwt.encode(
+        {"sub": "uuid-123"}, ring.active.signing_key, algorithm=ring.active.algorithm
+    )
+
+    assert ring.active.algorithm == algorithm
+    assert ring.jwks["keys"][0]["alg"] == algorithm
+    assert jwt.decode(token, ring.active.verifying_key, algorithms=[algorithm])
+
+
+def test_unsupported_ec_curve_is_rejected(tmp_path):
+    path = write_pem(tmp_path / "ec-1.pem", ec.generate_private_key(ec.SECP256K1()))
+
+    with pytest.raises(ValueError, match="secp256k1"):
+        KeyRing.from_pem_files([path])
+
+
+def test_single_key_is_active_without_kid(ed25519_pem):
+    ring = KeyRing.from_pem_files([ed25519_pem])
+
+    assert ring.active.kid == "ed-1"
+
+
+def test_several_keys_require_active_kid(ed25519_pem, rsa_pem):
+    # Publishing a new key must not silently switch signing to it.
+    with pytest.raises(ValueError, match="active kid"):
+        KeyRing.from_pem_files([ed25519_pem, rsa_pem])
+    with pytest.raises(ValueError, match="'missing'"):
+        KeyRing.from_pem_files([ed25519_pem, rsa_pem], active_kid="missing")
+
+
+@pytest.mark.asyncio
+async def test_login_signs_with_active_key_and_kid(ed25519_pem, monkeypatch):
+    ring = KeyRing.from_pem_files([ed25519_pem])
+    mock_repo = AsyncMock()
+    mock_repo.get_record.return_value = UserRecord(
+        user_uuid="uuid-123", username="alice", password_hash=BCRYPT_HASH
+    )
+    auth_service = AuthService(mock_repo, jwt_secret="unused", key_ring=ring)
+    monkeypatch.setattr("bcrypt.checkpw", lambda password, hashed: True)
+
+    result = await auth_service.login(
+        LoginRequest(username="alice", password="StrongPass1!")
+    )
+
+    assert jwt.get_unverified_header(result.token)["kid"] == "ed-1"
+    claims = jwt.decode(result.token, ring.active.verifying_key, algorithms=["EdDSA"])
+    assert claims["sub"] == "uuid-123"
+
+
+@pytest.mark.asyncio
+async def test_verify_accepts_tokens_from_rotated_out_key(ed25519_pem, rsa_pem):
+    old_ring = KeyRing.from_pem_files([ed25519_pem])
+    new_ring = KeyRing.from_pem_files([ed25519_pem, rsa_pem], active_kid="rsa-1")
+    old_key = old_ring.active
+    token = jwt.encode(
+        {"sub": "uuid-123", "exp": 4102444800},
+        old_key.signing_key,
+        algorithm=old_key.algorithm,
+        headers={"kid": old_key.kid},
+    )
+
+    auth_service = AuthService(AsyncMock(), jwt_secret="unused", key_ring=new_ring)
+    result = await auth_service.verify(VerifyRequest(token=token))
+
+    assert result.active is True
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_unknown_kid(ed25519_pem):
+    ring = KeyRing.from_pem_files([ed25519_pem])
+    token = jwt.encode(
+        {"sub": "uuid-123", "exp": 4102444800},
+        ring.active.signing_key,
+        algorithm="EdDSA",
+        headers={"kid": "retired"},
+    )
+
+    auth_service = AuthService(AsyncMock(), jwt_secret="unused", key_ring=ring)
+    result = await auth_service.verify(VerifyRequest(token=token))
+
+    assert result.active is False
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from engines import PostgresEngine
+from repositories import RevocationRepository
+from services import RevocationList
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock(spec=RevocationRepository)
+    repo.add = AsyncMock()
+    repo.list_since = AsyncMock(return_value=[])
+    return repo
+
+
+@pytest.fixture
+def revocation_list(mock_repo):
+    return RevocationList(mock_repo, MagicMock(spec=PostgresEngine), capacity=100)
+
+
+def future(seconds=3600):
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+def test_unknown_jti_is_not_revoked(revocation_list):
+    assert revocation_list.is_revoked("abc") is False
+    assert revocation_list.is_revoked(None) is False
+
+
+@pytest.mark.asyncio
+async def test_revoke_persists_and_applies_locally(revocation_list, mock_repo):
+    expires_at = future()
+
+    await revocation_list.revoke("abc", expires_at)
+
+    mock_repo.add.assert_awaited_once_with(jti="abc", expires_at=expires_at)
+    assert revocation_list.is_revoked("abc") is True
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental_with_overlap(revocation_list, mock_repo):
+    revoked_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    mock_repo.list_since.return_value = [("abc", future(), revoked_at)]
+
+    assert await revocation_list.refresh() == 1
+    mock_repo.list_since.assert_awaited_with(revoked_after=None)
+
+    assert await revocation_list.refresh() == 0
+    mock_repo.list_since.assert_awaited_with(
+        revoked_after=revoked_at - timedelta(seconds=5)
+    )
+    assert revocation_list.is_revoked("abc") is True
+
+
+def test_rebuild_drops_expired_entries(revocation_list):
+    revocation_list.add("expired", time.time() - 1)
+    revocation_list.add("live", time.time() + 3600)
+
+    revocation_list._rebuild()
+
+    assert len(revocation_list) == 1
+    assert revocation_list.is_revoked("live") is True
+    assert revocation_list.is_revoked("expired") is False
+
+
+def test_filter_grows_past_capacity(revocation_list):
+    for i in range(150):
+        revocation_list.add(f"jti-{i}", time.time() + 3600)
+
+    assert all(revocation_list.is_revoked(f"jti-{i}") for i in range(150))
+    assert revocation_list._bloom.capacity >= 150
+
+
+@pytest.mark.asyncio
+async def test_start_loads_and_stop_cancels(revocation_list, mock_repo):
+    await revocation_list.start(interval=60)
+    mock_repo.list_since.assert_awaited_once()
+
+    await revocation_list.stop()
+    assert revocation_list._task is None
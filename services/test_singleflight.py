@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.create_task(flights.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["result"] * 5
+    assert executions == 1
+    assert flights.shared == 4
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flights = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        flights.do("a", lambda: work(1)), flights.do("b", lambda: work(2))
+    )
+
+    assert results == [1, 2]
+    assert flights.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flights.do("key", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_follower_retries_when_leader_is_cancelled():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "ok"
+
+    leader = asyncio.create_task(flights.do("key", slow))
+    await started.wait()
+    follower = asyncio.create_task(flights.do("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_are_not_cached():
+    flights = SingleFlight()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+
+    await flights.do("key", work)
+    await flights.do("key", work)
+
+    assert executions == 2
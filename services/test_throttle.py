@@ -0,0 +1,96 @@
+from services.throttle import LoginThrottle
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_burst_then_throttled_until_refill():
+    clock = FakeClock()
+    throttle = LoginThrottle(username_burst=3, username_per_minute=60, clock=clock)
+
+    assert [throttle.check("alice") for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = throttle.check("alice")
+    assert retry_after == 1.0
+    assert throttle.throttled == 1
+
+    clock.now += 1
+    assert throttle.check("alice") == 0.0
+
+
+def test_usernames_are_limited_independently():
+    throttle = LoginThrottle(username_burst=1, clock=FakeClock())
+
+    assert throttle.check("alice") == 0.0
+    assert throttle.check("alice") > 0
+    assert throttle.check("bob") == 0.0
+
+
+def test_client_limit_spans_usernames():
+    throttle = LoginThrottle(client_burst=2, client_per_minute=6, clock=FakeClock())
+
+    assert throttle.check("alice", "10.0.0.1") == 0.0
+    assert throttle.check("bob", "10.0.0.1") == 0.0
+    assert throttle.check("carol", "10.0.0.1") == 10.0
+    assert throttle.check("carol", "10.0.0.2") == 0.0
+
+
+def test_lockout_grows_exponentially_and_is_capped():
+    clock = FakeClock()
+    throttle = LoginThrottle(
+        username_burst=100,
+        lockout_threshold=2,
+        lockout_base=1.0,
+        lockout_max=4.0,
+        clock=clock,
+    )
+
+    throttle.record_failure("alice")
+    assert throttle.check("alice") == 0.0
+
+    lockouts = []
+    for _ in range(4):
+        throttle.record_failure("alice")
+        lockouts.append(throttle.check("alice"))
+    assert lockouts == [1.0, 2.0, 4.0, 4.0]
+
+
+def test_success_clears_username_lockout():
+    clock = FakeClock()
+    throttle = LoginThrottle(lockout_threshold=1, clock=clock)
+
+    throttle.record_failure("alice", "10.0.0.1")
+    assert throttle.check("alice") > 0
+
+    throttle.record_success("alice")
+    assert throttle.check("alice") == 0.0
+    # The client address stays locked.
+    assert throttle.check("bob", "10.0.0.1") > 0
+
+
+def test_memory_is_bounded_by_lru_eviction():
+    throttle = LoginThrottle(username_burst=1, max_entries=2, clock=FakeClock())
+
+    throttle.check("alice")
+    throttle.check("bob")
+    throttle.check("alice")
+    throttle.check("carol")
+
+    assert len(throttle) == 2
+    # bob was least recently used and starts over with a full bucket.
+    assert throttle.check("bob") == 0.0
+    assert throttle.check("carol") > 0
+
+
+def test_long_usernames_are_stored_as_fixed_size_keys():
+    throttle = LoginThrottle(username_burst=1, clock=FakeClock())
+
+    throttle.check("a" * 10_000)
+
+    ((kind, key),) = throttle._buckets
+    assert kind == "u" and len(key) == 16
+    assert throttle.check("a" * 10_000) > 0
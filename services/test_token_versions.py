@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from engines import PostgresEngine
+from repositories import UserRepository
+from services import TokenVersionCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock(spec=UserRepository)
+    repo.list_token_versions = AsyncMock(return_value=[])
+    return repo
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def versions(mock_repo, clock):
+    return TokenVersionCache(
+        mock_repo, MagicMock(spec=PostgresEngine), max_age=60, overlap=5, clock=clock
+    )
+
+
+def _at(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def test_unknown_user_is_version_zero(versions):
+    assert versions.get("uuid-123") == 0
+
+
+def test_set_only_moves_forward(versions):
+    versions.set("uuid-123", 2)
+    versions.set("uuid-123", 1)
+
+    assert versions.get("uuid-123") == 2
+
+
+def test_bump_expires_with_the_tokens_it_revokes(versions, clock):
+    versions.set("uuid-123", 2)
+
+    clock.now += 64
+    assert versions.get("uuid-123") == 2
+    clock.now += 2
+    assert versions.get("uuid-123") == 0
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_loads_only_recent_bumps(versions, mock_repo, clock):
+    user_id = uuid.uuid4()
+    mock_repo.list_token_versions.return_value = [(user_id, 3, _at(clock.now - 10))]
+
+    assert await versions.refresh() == 1
+    assert versions.get(str(user_id)) == 3
+    mock_repo.list_token_versions.assert_awaited_once_with(
+        changed_after=_at(clock.now - 65)
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_continues_from_cursor_with_overlap(versions, mock_repo, clock):
+    changed_at = _at(clock.now - 1)
+    mock_repo.list_token_versions.return_value = [(uuid.uuid4(), 1, changed_at)]
+    await versions.refresh()
+
+    mock_repo.list_token_versions.return_value = []
+    await versions.refresh()
+
+    mock_repo.list_token_versions.assert_awaited_with(
+        changed_after=changed_at - timedelta(seconds=5)
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_drops_expired_bumps(versions, mock_repo, clock):
+    versions.set("uuid-123", 5)
+    clock.now += 100
+
+    await versions.refresh()
+
+    assert len(versions) == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_newer_local_bumps(versions, mock_repo, clock):
+    versions.set("uuid-123", 5)
+    mock_repo.list_token_versions.return_value = [("uuid-123", 4, _at(clock.now))]
+
+    await versions.refresh()
+
+    assert versions.get("uuid-123") == 5
+
+
+@pytest.mark.asyncio
+async def test_start_loads_and_stop_cancels(versions, mock_repo):
+    await versions.start(interval=60)
+    mock_repo.list_token_versions.assert_awaited_once()
+
+    await versions.stop()
+    assert versions._task is None
@@ -0,0 +1,113 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "failures", "locked_until")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated = now
+        self.failures = 0
+        self.locked_until = 0.0
+
+
+class LoginThrottle:
+    """Token-bucket rate limit with exponential lockout, keyed by username and
+    by client address.
+
+    Every attempt takes a token from both buckets. Failed attempts past
+    ``lockout_threshold`` lock the key for ``lockout_base * 2**n`` seconds
+    (capped at ``lockout_max``). At most ``max_entries`` keys are tracked; the
+    least recently used are evicted first. Keys are stored as fixed-size
+    digests, so an entry costs the same however long the username is.
+    """
+
+    def __init__(
+        self,
+        username_burst: int = 10,
+        username_per_minute: float = 10,
+        client_burst: int = 30,
+        client_per_minute: float = 60,
+        lockout_threshold: int = 5,
+        lockout_base: float = 1.0,
+        lockout_max: float = 900.0,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limits = {
+            "u": (username_burst, username_per_minute / 60),
+            "c": (client_burst, client_per_minute / 60),
+        }
+        self._lockout_threshold = lockout_threshold
+        self._lockout_base = lockout_base
+        self._lockout_max = lockout_max
+        self._max_entries = max_entries
+        self._clock = clock
+        self._buckets: OrderedDict[tuple[str, bytes], _Bucket] = OrderedDict()
+        self.throttled = 0
+
+    def check(self, username: str, client: str | None = None) -> float:
+        """Take one attempt; return 0 if allowed, else seconds until retry."""
+        now = self._clock()
+        buckets = [self._bucket("u", username, now)]
+        if client:
+            buckets.append(self._bucket("c", client, now))
+
+        retry_after = 0.0
+        for kind, bucket in zip(("u", "c"), buckets):
+            burst, rate = self._limits[kind]
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            if bucket.locked_until > now:
+                retry_after = max(retry_after, bucket.locked_until - now)
+            elif bucket.tokens < 1:
+                retry_after = max(retry_after, (1 - bucket.tokens) / rate)
+
+        if retry_after > 0:
+            self.throttled += 1
+            return retry_after
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return 0.0
+
+    def record_failure(self, username: str, client: str | None = None) -> None:
+        now = self._clock()
+        keys = [("u", username)] + ([("c", client)] if client else [])
+        for kind, key in keys:
+            bucket = self._bucket(kind, key, now)
+            bucket.failures += 1
+            excess = bucket.failures - self._lockout_threshold
+            if excess >= 0:
+                lockout = min(self._lockout_base * 2**excess, self._lockout_max)
+                bucket.locked_until = now + lockout
+        return None
+
+    def record_success(self, username: str) -> None:
+        bucket = self._buckets.get(("u", _digest(username)))
+        if bucket is not None:
+            bucket.failures = 0
+            bucket.locked_until = 0.0
+        return None
+
+    def _bucket(self, kind: str, key: str, now: float) -> _Bucket:
+        entry = (kind, _digest(key))
+        bucket = self._buckets.get(entry)
+        if bucket is None:
+            bucket = _Bucket(self._limits[kind][0], now)
+            self._buckets[entry] = bucket
+            if len(self._buckets) > self._max_entries:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(entry)
+        return bucket
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from engines import PostgresEngine
+from repositories import UserRepository
+
+log = logging.getLogger(__name__)
+
+
+class TokenVersionCache:
+    """In-process map of recent token version bumps, refreshed in bulk.
+
+    A bump only matters until the access tokens issued before it expire, so
+    each entry lives ``max_age`` seconds (the access token lifetime) from the
+    bump; everyone else is at version 0. refresh() only pulls bumps made
+    since the previous sync, re-reading ``overlap`` seconds before the cursor
+    so that transactions committing out of order are not missed. A bump made
+    by this process is applied immediately, others after the next refresh.
+    """
+
+    def __init__(
+        self,
+        repository: UserRepository,
+        engine: PostgresEngine,
+        max_age: float,
+        overlap: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._repository = repository
+        self._engine = engine
+        self._max_age = max_age
+        self._overlap = overlap
+        self._clock = clock
+        # user_uuid -> (version, expires_at on the clock)
+        self._versions: dict[str, tuple[int, float]] = {}
+        self._cursor: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    def get(self, user_uuid: str) -> int:
+        entry = self._versions.get(user_uuid)
+        if entry is None or entry[1] <= self._clock():
+            return 0
+        return entry[0]
+
+    def set(
+        self, user_uuid: str, version: int, changed_at: float | None = None
+    ) -> None:
+        """Record a bump made at ``changed_at`` (default: now)."""
+        if changed_at is None:
+            changed_at = self._clock()
+        expires_at = changed_at + self._max_age + self._overlap
+        current, current_expires_at = self._versions.get(user_uuid, (0, 0.0))
+        if version > current or (
+            version == current and expires_at > current_expires_at
+        ):
+            self._versions[user_uuid] = (version, expires_at)
+        return None
+
+    async def refresh(self) -> int:
+        if self._cursor is not None:
+            changed_after = self._cursor - timedelta(seconds=self._overlap)
+        else:
+            changed_after = datetime.fromtimestamp(
+                self._clock() - self._max_age - self._overlap, timezone.utc
+            )
+        async with self._engine.session_scope():
+            rows = await self._repository.list_token_versions(
+                changed_after=changed_after
+            )
+
+        for user_uuid, version, changed_at in rows:
+            self.set(str(user_uuid), version, changed_at.timestamp())
+            if self._cursor is None or changed_at > self._cursor:
+                self._cursor = changed_at
+
+        now = self._clock()
+        self._versions = {
+            user_uuid: entry
+            for user_uuid, entry in self._versions.items()
+            if entry[1] > now
+        }
+        return len(rows)
+
+    async def start(self, interval: float) -> None:
+        await self.refresh()
+        log.info("Token versions loaded: %s user(s)", len(self._versions))
+        self._task = asyncio.create_task(self._refresh_forever(interval))
+        return None
+
+    async def stop(self) -> None:
+        if self._task is None:
+            log.warning("stop() called but token version cache was not started.")
+            return None
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        return None
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                log.warning(f"Failed to refresh token versions: {e}")
+
+    def __len__(self) -> int:
+        return len(self._versions)
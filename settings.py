@@ -0,0 +1,146 @@
+from pathlib import Path
+from typing import Literal
+
+from pydantic import ConfigDict, computed_field, model_validator
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    model_config = ConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+    )
+
+    APP_TITLE: str = "Auth Service"
+    APP_HOST: str = "0.0.0.0"
+    APP_PORT: int = 8000
+    APP_UDS: str | None = None
+    APP_WORKERS: int = 1
+    APP_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Recycle a worker after this many requests (plus up to the jitter, so
+    # workers do not restart together); None keeps workers forever. Needs
+    # APP_WORKERS > 1: only the multi-worker supervisor restarts a worker.
+    APP_LIMIT_MAX_REQUESTS: int | None = None
+    APP_LIMIT_MAX_REQUESTS_JITTER: int = 0
+    APP_DEBUG: bool = False
+    APP_LOG_LEVEL: Literal[
+        "CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"
+    ] = "INFO"
+    APP_LOG_FORMAT: Literal["json", "text"] = "json"
+    # Share of successful requests that are logged; errors are always logged.
+    APP_LOG_SAMPLE_RATE: float = 1.0
+    APP_LOG_SLOW_REQUEST_MS: float = 500.0
+    APP_API_PREFIX: str = "/api/v1"
+    APP_VERSION: str = "1.0.0"
+
+    POSTGRES_USER: str = "test_user"
+    POSTGRES_PASSWORD: str = "test_password"
+    POSTGRES_DB: str = "test_db"
+    POSTGRES_HOST: str = "localhost"
+    POSTGRES_PORT: int = 5432
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_POOL_IDLE_CONS: int = 10
+    # Connections this service may hold per database server, across all
+    # workers; when set, it caps every worker's pool (see worker_pool_limits).
+    POSTGRES_MAX_CONNECTIONS: int | None = None
+    # Connections opened (and statements prepared) per server at startup;
+    # None warms the whole pool, 0 disables warmup.
+    POSTGRES_WARMUP_CONNECTIONS: int | None = None
+    # Reruns of a transaction after a serialization failure or deadlock.
+    POSTGRES_TRANSACTION_RETRIES: int = 2
+    # Read replicas as "host" or "host:port"; same user, password and database.
+    POSTGRES_REPLICA_HOSTS: list[str] = []
+    POSTGRES_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    POSTGRES_READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Ping the LISTEN connection this often; no answer within it = reconnect.
+    POSTGRES_LISTEN_PING_SECONDS: float = 30.0
+
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_NEGATIVE_TTL_SECONDS: float = 5.0
+
+    HASHING_MODE: Literal["thread", "process"] = "thread"
+    HASHING_WORKERS: int = 4
+    HASHING_QUEUE_SIZE: int = 128
+    HASHING_SCHEME: Literal["bcrypt", "argon2id", "scrypt"] = "bcrypt"
+    HASHING_BCRYPT_ROUNDS: int = 12
+    HASHING_ARGON2_TIME_COST: int = 3
+    HASHING_ARGON2_MEMORY_COST: int = 65536
+    HASHING_ARGON2_PARALLELISM: int = 4
+    HASHING_SCRYPT_LOG_N: int = 15
+    HASHING_SCRYPT_R: int = 8
+    HASHING_SCRYPT_P: int = 1
+    HASHING_REHASH_ON_LOGIN: bool = True
+    HASHING_CALIBRATE: bool = False
+    HASHING_CALIBRATION_TARGET_MS: float = 250.0
+    HASHING_CALIBRATION_SAMPLES: int = 5
+    HASHING_WARMUP: bool = True
+
+    ADMISSION_LOGIN_MAX_IN_FLIGHT: int = 16
+    ADMISSION_LOGIN_MAX_QUEUE: int = 64
+    ADMISSION_REGISTER_MAX_IN_FLIGHT: int = 8
+    ADMISSION_REGISTER_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_USERNAME_BURST: int = 10
+    LOGIN_THROTTLE_USERNAME_PER_MINUTE: float = 10
+    LOGIN_THROTTLE_CLIENT_BURST: int = 30
+    LOGIN_THROTTLE_CLIENT_PER_MINUTE: float = 60
+    LOGIN_THROTTLE_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_THROTTLE_LOCKOUT_BASE_SECONDS: float = 1.0
+    LOGIN_THROTTLE_LOCKOUT_MAX_SECONDS: float = 900.0
+    LOGIN_THROTTLE_MAX_ENTRIES: int = 100_000
+
+    JWT_SECRET: str = "test_secret"
+    JWT_EXPIRE_SECONDS: int = 60 * 15  # 15 minutes
+    REFRESH_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24 * 30  # 30 days
+    JWT_VERIFY_CACHE_SIZE: int = 10_000
+    JWT_ALGORITHM: str = "HS256"
+    JWT_REVOCATION_REFRESH_SECONDS: float = 5.0
+    JWT_REVOCATION_BLOOM_CAPACITY: int = 100_000
+    JWT_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    JWT_TOKEN_VERSION_REFRESH_SECONDS: float = 5.0
+    JWT_PRIVATE_KEY_FILES: list[Path] = []
+    JWT_ACTIVE_KID: str | None = None
+    JWT_JWKS_MAX_AGE_SECONDS: int = 300
+
+    METRICS_ENABLED: bool = True
+
+    CORS_ALLOW_ORIGINS: list[str] = ["*"]
+    CORS_ALLOW_METHODS: list[str] = ["*"]
+    CORS_ALLOW_HEADERS: list[str] = ["*"]
+    CORS_ALLOW_CREDENTIALS: bool = True
+
+    @model_validator(mode="after")
+    def check_worker_recycling(self) -> "Settings":
+        if self.APP_LIMIT_MAX_REQUESTS is not None and self.APP_WORKERS < 2:
+            raise ValueError(
+                "APP_LIMIT_MAX_REQUESTS needs APP_WORKERS > 1: a single server "
+                "exits at the limit and nothing restarts it."
+            )
+        return self
+
+    @computed_field(return_type=str)
+    @property
+    def DATABASE_DSN(self) -> str:
+        """Return formatted async DSN string for PostgreSQL."""
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+
+    @computed_field(return_type=list[str])
+    @property
+    def DATABASE_REPLICA_DSNS(self) -> list[str]:
+        """Return async DSN strings for the read replicas."""
+        dsns = []
+        for replica in self.POSTGRES_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            dsns.append(
+                f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{host}:{port or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            )
+        return dsns
@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app import warmup, worker_pool_limits
+from settings import Settings
+
+
+def test_worker_pool_limits_default_to_pool_settings():
+    settings = Settings(POSTGRES_POOL_SIZE=5, POSTGRES_POOL_IDLE_CONS=10)
+
+    assert worker_pool_limits(settings) == (5, 10)
+
+
+@pytest.mark.parametrize(
+    "budget, workers, expected",
+    [
+        (40, 4, (5, 4)),  # 10 per worker, 1 kept for LISTEN
+        (100, 2, (5, 10)),  # overflow still capped by POSTGRES_POOL_IDLE_CONS
+        (12, 4, (2, 0)),
+    ],
+)
+def test_worker_pool_limits_split_connection_budget(budget, workers, expected):
+    settings = Settings(
+        APP_WORKERS=workers,
+        POSTGRES_POOL_SIZE=5,
+        POSTGRES_POOL_IDLE_CONS=10,
+        POSTGRES_MAX_CONNECTIONS=budget,
+    )
+
+    assert worker_pool_limits(settings) == expected
+
+
+def test_worker_pool_limits_rejects_too_small_budget():
+    settings = Settings(APP_WORKERS=4, POSTGRES_MAX_CONNECTIONS=6)
+
+    with pytest.raises(ValueError):
+        worker_pool_limits(settings)
+
+
+@pytest.mark.asyncio
+async def test_warmup_uses_pool_size_and_survives_failures(caplog):
+    postgres_engine = AsyncMock()
+    postgres_engine.warmup.side_effect = ConnectionRefusedError("down")
+    hashing_engine = AsyncMock()
+
+    await warmup(Settings(), postgres_engine, hashing_engine, pool_size=4)
+
+    assert postgres_engine.warmup.await_args.args[0] == 4
+    hashing_engine.warmup.assert_awaited_once()
+    assert "PostgreSQL warmup failed: down" in caplog.text
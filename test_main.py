@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from main import (
+    ENV_FILE_VAR,
+    JsonFormatter,
+    QueueLogHandler,
+    StartupProfile,
+    run_uvicorn,
+)
+from settings import Settings
+
+ROOT = Path(__file__).parent
+
+# Not needed before serving; importing main must not pull them in.
+DEFERRED_MODULES = ("fastapi", "sqlalchemy", "uvicorn", "jwt", "bcrypt", "app")
+
+# Fresh interpreter: imports plus create_app, without the database. Locally
+# this is well under a second; the budget leaves room for slow CI hosts.
+COLD_START_BUDGET_SECONDS = 3.0
+
+
+def _run_python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return result.stdout
+
+
+def test_importing_main_defers_the_app_stack():
+    loaded = json.loads(
+        _run_python(
+            "import json, sys, main; "
+            f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+        )
+    )
+
+    assert loaded == []
+
+
+def test_cold_start_fits_budget():
+    phases = json.loads(
+        _run_python(
+            "import json, main; "
+            "profile = main.profile_startup(main.Settings(), lifespan=False); "
+            "print(json.dumps(profile.phases))"
+        )
+    )
+
+    names = [name for name, _ in phases]
+    assert names[-1] == "create_app"
+    assert "import fastapi" in names
+    total = sum(seconds for _, seconds in phases)
+    assert total < COLD_START_BUDGET_SECONDS, phases
+
+
+def test_startup_profile_reports_every_phase():
+    profile = StartupProfile()
+    with profile.phase("settings"):
+        pass
+    with profile.phase("create_app"):
+        pass
+
+    report = profile.report().splitlines()
+
+    assert [line.split()[0] for line in report] == ["settings", "create_app", "total"]
+
+
+def test_run_uvicorn_uses_app_factory_for_multiple_workers(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr("uvicorn.run", lambda app, **kw: calls.append((app, kw)))
+    monkeypatch.delenv(ENV_FILE_VAR, raising=False)
+    env_file = tmp_path / "prod.env"
+
+    run_uvicorn(Settings(APP_WORKERS=4, APP_LIMIT_MAX_REQUESTS=1000), env_file)
+
+    ((app, kwargs),) = calls
+    assert app == "main:create_app_from_env"
+    assert kwargs["factory"] is True
+    assert kwargs["workers"] == 4
+    assert kwargs["limit_max_requests"] == 1000
+    assert os.environ[ENV_FILE_VAR] == str(env_file.resolve())
+
+
+def test_worker_recycling_requires_multiple_workers():
+    with pytest.raises(ValidationError, match="APP_WORKERS > 1"):
+        Settings(APP_WORKERS=1, APP_LIMIT_MAX_REQUESTS=1000)
+
+
+def test_queue_handler_keeps_extra_fields_for_json_output():
+    log_queue = queue.SimpleQueue()
+    handler = QueueLogHandler(log_queue)
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord(
+            "auth", logging.ERROR, __file__, 1, "user=%s", ("alice",), sys.exc_info()
+        )
+    record.request_id = "abc"
+
+    handler.emit(record)
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+
+    assert entry["message"] == "user=alice"
+    assert entry["level"] == "ERROR"
+    assert entry["request_id"] == "abc"
+    assert "ValueError: bad" in entry["exc"]